@@ -0,0 +1,552 @@
+from sqlalchemy import delete, false, func, insert, literal, select, true, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from . import models, schemas
+from fastapi import HTTPException
+from .middleware import hash_password_async
+from .pagination import keyset, build_page
+
+# Versions asynchrones des contrôleurs de app/controllers.py (DB_MODE=async).
+# Mêmes noms, mêmes signatures, mêmes retours : seule la session change.
+
+async def _first(db: AsyncSession, stmt):
+    result = await db.execute(stmt)
+    return result.scalars().first()
+
+async def _all(db: AsyncSession, stmt):
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+def _supports_returning(db: AsyncSession) -> bool:
+    return getattr(db.bind.dialect, "full_returning", False) is True
+
+def _pk_clause(model, pk: dict):
+    return [getattr(model, key) == value for key, value in pk.items()]
+
+async def _update_by_pk(db: AsyncSession, model, pk: dict, values: dict):
+    """
+    Met à jour la ligne de clé `pk` en un seul UPDATE et renvoie l'objet à jour (None si absente).
+    """
+    if not values:
+        return await db.get(model, pk)
+
+    stmt = update(model).where(*_pk_clause(model, pk)).values(**values).execution_options(synchronize_session=False)
+    if _supports_returning(db):
+        row = (await db.execute(stmt.returning(*model.__table__.c))).first()
+        await db.commit()
+        return model(**row._mapping) if row is not None else None
+
+    db_obj = await db.get(model, pk)
+    if db_obj is None:
+        return None
+    await db.execute(stmt)
+    await db.commit()
+    for key, value in values.items():
+        set_committed_value(db_obj, key, value)
+    return db_obj
+
+async def _delete_by_pk(db: AsyncSession, model, pk: dict):
+    """
+    Supprime la ligne de clé `pk` en un seul DELETE et renvoie l'objet supprimé (None si absente).
+    """
+    stmt = delete(model).where(*_pk_clause(model, pk)).execution_options(synchronize_session=False)
+    if _supports_returning(db):
+        row = (await db.execute(stmt.returning(*model.__table__.c))).first()
+        await db.commit()
+        return model(**row._mapping) if row is not None else None
+
+    db_obj = await db.get(model, pk)
+    if db_obj is None:
+        return None
+    await db.execute(stmt)
+    await db.commit()
+    return db_obj
+
+# --------------------- Customer Controllers --------------------- #
+
+async def get_customers(db: AsyncSession, skip: int = 0, limit: int = None):
+    """
+    Récupère les clients (tous si aucune limite n'est donnée).
+    """
+    return await _all(db, select(models.Customer).order_by(models.Customer.id_customer).offset(skip).limit(limit))
+
+async def get_customers_page(db: AsyncSession, cursor: str = None, limit: int = 100):
+    """
+    Récupère une page de clients (pagination par curseur).
+    """
+    key = [models.Customer.id_customer]
+    return build_page(await _all(db, keyset(select(models.Customer), key, cursor, limit)), key, limit)
+
+async def stream_customers(db: AsyncSession, batch_size: int = 500):
+    """
+    Itère sur tous les clients par lots de `batch_size` sans tout charger en mémoire.
+    """
+    stmt = select(models.Customer).order_by(models.Customer.id_customer).execution_options(yield_per=batch_size)
+    async for customer in await db.stream_scalars(stmt):
+        yield customer
+
+async def get_customer_by_id(db: AsyncSession, customer_id: int):
+    """
+    Récupère un client par ID.
+    """
+    return await db.get(models.Customer, customer_id)
+
+async def get_customer_by_email(db: AsyncSession, email: str):
+    """
+    Récupère un client par email (utilisé pour le login).
+    """
+    return await _first(db, select(models.Customer).where(models.Customer.email == email))
+
+LOGIN_COLUMNS = (models.Customer.id_customer, models.Customer.email, models.Customer.customer_type,
+                 models.Customer.password_hash)
+
+async def get_login_credentials(db: AsyncSession, email: str):
+    """
+    Récupère id, email, type et hash du mot de passe d'un client (index unique sur email).
+    """
+    result = await db.execute(select(*LOGIN_COLUMNS).where(models.Customer.email == email))
+    return result.first()
+
+async def create_customer(db: AsyncSession, customer: schemas.CustomerCreate):
+    """
+    Create a new customer with a hashed password.
+    """
+    hashed_password = await hash_password_async(customer.password_hash)
+
+    db_customer = models.Customer(
+        name=customer.name,
+        created_at=customer.created_at,
+        username=customer.username,
+        first_name=customer.first_name,
+        last_name=customer.last_name,
+        phone=customer.phone,
+        email=customer.email,
+        password_hash=hashed_password,
+        last_login=customer.last_login,
+        customer_type=customer.customer_type,
+        failed_login_attempts=customer.failed_login_attempts,
+        preferred_contact_method=customer.preferred_contact_method,
+        opt_in_marketing=customer.opt_in_marketing,
+        loyalty_points=customer.loyalty_points,
+    )
+    db.add(db_customer)
+    await db.commit()
+    return db_customer
+
+async def bulk_create_customers(db: AsyncSession, rows: list):
+    """
+    Insère un lot de clients (mots de passe déjà hachés) en une transaction.
+    Renvoie les (position dans le lot, raison) des lignes refusées.
+    """
+    table = models.Customer.__table__
+    emails = [row["email"] for row in rows]
+    result = await db.execute(select(models.Customer.email).where(models.Customer.email.in_(emails)))
+    existing = set(result.scalars().all())
+    failed = [(position, "Email already registered") for position, row in enumerate(rows) if row["email"] in existing]
+    to_insert = [(position, row) for position, row in enumerate(rows) if row["email"] not in existing]
+    if not to_insert:
+        return failed
+
+    try:
+        await db.execute(table.insert(), [row for _, row in to_insert])
+        await db.commit()
+    except IntegrityError:
+        # Conflit apparu entre la vérification et l'insertion : ligne par ligne pour isoler les fautives
+        await db.rollback()
+        for position, row in to_insert:
+            try:
+                await db.execute(table.insert(), row)
+                await db.commit()
+            except IntegrityError as e:
+                await db.rollback()
+                failed.append((position, str(e.orig)))
+    return failed
+
+async def update_customer(db: AsyncSession, customer_id: int, customer_update: schemas.CustomerUpdate):
+    """
+    Met à jour les informations d'un client existant.
+    """
+    db_customer = await _update_by_pk(db, models.Customer, {"id_customer": customer_id}, customer_update.dict(exclude_unset=True))
+    if not db_customer:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return db_customer
+
+async def delete_customer(db: AsyncSession, customer_id: int):
+    """
+    Supprime un client par ID.
+    """
+    # Les liens vers les entreprises partent dans la même transaction
+    await db.execute(
+        delete(models.CustomerCompany)
+        .where(models.CustomerCompany.id_customer == customer_id)
+        .execution_options(synchronize_session=False)
+    )
+    return await _delete_by_pk(db, models.Customer, {"id_customer": customer_id})
+
+# --------------------- Company Controllers --------------------- #
+
+async def get_all_companies(db: AsyncSession, skip: int = 0, limit: int = None):
+    """
+    Récupère les entreprises (toutes si aucune limite n'est donnée).
+    """
+    return await _all(db, select(models.Company).order_by(models.Company.id_company).offset(skip).limit(limit))
+
+async def get_companies_page(db: AsyncSession, cursor: str = None, limit: int = 100):
+    """
+    Récupère une page d'entreprises (pagination par curseur).
+    """
+    key = [models.Company.id_company]
+    return build_page(await _all(db, keyset(select(models.Company), key, cursor, limit)), key, limit)
+
+async def stream_companies(db: AsyncSession, batch_size: int = 500):
+    """
+    Itère sur toutes les entreprises par lots de `batch_size`.
+    """
+    stmt = select(models.Company).order_by(models.Company.id_company).execution_options(yield_per=batch_size)
+    async for company in await db.stream_scalars(stmt):
+        yield company
+
+async def get_company_by_id(db: AsyncSession, company_id: int):
+    """
+    Récupère une entreprise par ID.
+    """
+    return await db.get(models.Company, company_id)
+
+async def create_company(db: AsyncSession, company: schemas.CompanyCreate):
+    """
+    Crée une nouvelle entreprise.
+    """
+    db_company = models.Company(
+        company_name=company.company_name,
+        siret=company.siret,
+        address=company.address,
+        postal_code=company.postal_code,
+        city=company.city,
+        phone=company.phone,
+        email=company.email
+    )
+    db.add(db_company)
+    await db.commit()
+    return db_company
+
+async def update_company(db: AsyncSession, company_id: int, company_update: schemas.CompanyUpdate):
+    """
+    Met à jour une entreprise existante.
+    """
+    db_company = await _update_by_pk(db, models.Company, {"id_company": company_id}, company_update.dict(exclude_unset=True))
+    if not db_company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    return db_company
+
+async def delete_company(db: AsyncSession, company_id: int):
+    """
+    Supprime une entreprise par ID.
+    """
+    await db.execute(
+        delete(models.CustomerCompany)
+        .where(models.CustomerCompany.id_company == company_id)
+        .execution_options(synchronize_session=False)
+    )
+    return await _delete_by_pk(db, models.Company, {"id_company": company_id})
+
+# --------------------- Feedback Controllers --------------------- #
+
+async def get_feedbacks(db: AsyncSession, skip: int = 0, limit: int = 10):
+    return await _all(db, select(models.Feedback).offset(skip).limit(limit))
+
+async def get_feedbacks_page(db: AsyncSession, cursor: str = None, limit: int = 10):
+    key = [models.Feedback.id_feedback]
+    return build_page(await _all(db, keyset(select(models.Feedback), key, cursor, limit)), key, limit)
+
+async def get_customer_feedbacks_page(db: AsyncSession, customer_id: int, cursor: str = None, limit: int = 10):
+    """
+    Récupère une page des feedbacks d'un client, les plus récents d'abord.
+    """
+    key = [models.Feedback.id_feedback]
+    stmt = select(models.Feedback).where(models.Feedback.id_customer == customer_id)
+    return build_page(await _all(db, keyset(stmt, key, cursor, limit, descending=True)), key, limit)
+
+async def get_customer_profile(db: AsyncSession, customer_id: int, recent: int = 5):
+    """
+    Récupère un client avec ses adresses, ses entreprises et ses dernières notifications et feedbacks.
+    Le chargement paresseux étant interdit en asynchrone, les relations sont chargées d'avance (selectinload).
+    """
+    customer = await _first(db, select(models.Customer)
+                            .options(selectinload(models.Customer.addresses), selectinload(models.Customer.companies))
+                            .where(models.Customer.id_customer == customer_id))
+    if customer is None:
+        return None
+    notifications = await _all(db, select(models.Notification).where(models.Notification.id_customer == customer_id)
+                               .order_by(models.Notification.id_notification.desc()).limit(recent))
+    feedbacks = await _all(db, select(models.Feedback).where(models.Feedback.id_customer == customer_id)
+                           .order_by(models.Feedback.id_feedback.desc()).limit(recent))
+    return {
+        "customer": customer,
+        "addresses": customer.addresses,
+        "companies": customer.companies,
+        "recent_notifications": notifications,
+        "recent_feedbacks": feedbacks,
+    }
+
+async def get_feedback_by_id(db: AsyncSession, feedback_id: int):
+    return await db.get(models.Feedback, feedback_id)
+
+async def create_feedback(db: AsyncSession, feedback: schemas.FeedbackCreate):
+    db_feedback = models.Feedback(**feedback.dict())
+    db.add(db_feedback)
+    await db.commit()
+    return db_feedback
+
+async def update_feedback(db: AsyncSession, feedback_id: int, feedback_update: schemas.FeedbackUpdate):
+    return await _update_by_pk(db, models.Feedback, {"id_feedback": feedback_id}, feedback_update.dict(exclude_unset=True))
+
+async def delete_feedback(db: AsyncSession, feedback_id: int):
+    return await _delete_by_pk(db, models.Feedback, {"id_feedback": feedback_id})
+
+# --------------------- Notification Controllers --------------------- #
+
+async def get_notifications(db: AsyncSession, skip: int = 0, limit: int = 10):
+    return await _all(db, select(models.Notification).offset(skip).limit(limit))
+
+async def get_notifications_page(db: AsyncSession, cursor: str = None, limit: int = 10):
+    key = [models.Notification.id_notification]
+    return build_page(await _all(db, keyset(select(models.Notification), key, cursor, limit)), key, limit)
+
+async def get_customer_notifications_page(db: AsyncSession, customer_id: int, cursor: str = None, limit: int = 10, unread_only: bool = False):
+    """
+    Récupère une page des notifications d'un client, les plus récentes d'abord.
+    """
+    key = [models.Notification.id_notification]
+    stmt = select(models.Notification).where(models.Notification.id_customer == customer_id)
+    if unread_only:
+        stmt = stmt.where(models.Notification.is_read == false())
+    return build_page(await _all(db, keyset(stmt, key, cursor, limit, descending=True)), key, limit)
+
+async def count_unread_notifications(db: AsyncSession, customer_id: int):
+    """
+    Compte les notifications non lues d'un client, sans quitter l'index (id_customer, is_read).
+    """
+    result = await db.execute(select(func.count(models.Notification.id_notification)).where(
+        models.Notification.id_customer == customer_id,
+        models.Notification.is_read == false()
+    ))
+    return result.scalar()
+
+async def get_notification_by_id(db: AsyncSession, notification_id: int):
+    return await db.get(models.Notification, notification_id)
+
+async def create_notification(db: AsyncSession, notification: schemas.NotificationCreate):
+    db_notification = models.Notification(
+        message=notification.message,
+        date_created=notification.date_created,
+        is_read=notification.is_read,
+        type=notification.type,
+        id_customer=notification.id_customer
+    )
+    db.add(db_notification)
+    await db.commit()
+    return db_notification
+
+async def update_notification(db: AsyncSession, notification_id: int, notification_update: schemas.NotificationUpdate):
+    return await _update_by_pk(
+        db, models.Notification, {"id_notification": notification_id}, notification_update.dict(exclude_unset=True)
+    )
+
+async def delete_notification(db: AsyncSession, notification_id: int):
+    return await _delete_by_pk(db, models.Notification, {"id_notification": notification_id})
+
+async def create_notifications(db: AsyncSession, notifications: list):
+    """
+    Crée plusieurs notifications en un seul INSERT multi-lignes.
+    """
+    if not notifications:
+        return 0
+    rows = [notification.dict() for notification in notifications]
+    await db.execute(insert(models.Notification).values(rows))
+    await db.commit()
+    return len(rows)
+
+async def create_campaign_notifications(db: AsyncSession, campaign: schemas.NotificationCampaign):
+    """
+    Notifie tous les clients (ou ceux ayant accepté le marketing) en un seul INSERT ... SELECT.
+    """
+    recipients = select(
+        literal(campaign.message), literal(campaign.date_created), false(), literal(campaign.type),
+        models.Customer.id_customer,
+    )
+    if campaign.opted_in_only:
+        recipients = recipients.where(models.Customer.opt_in_marketing == true())
+    result = await db.execute(insert(models.Notification).from_select(
+        ["message", "date_created", "is_read", "type", "id_customer"], recipients
+    ))
+    await db.commit()
+    return result.rowcount
+
+async def mark_notifications_read(db: AsyncSession, notification_ids: list = None, customer_id: int = None):
+    """
+    Marque comme lues des notifications (par IDs et/ou par client) en un seul UPDATE.
+    """
+    stmt = update(models.Notification).where(models.Notification.is_read == false())
+    if notification_ids is not None:
+        stmt = stmt.where(models.Notification.id_notification.in_(notification_ids))
+    if customer_id is not None:
+        stmt = stmt.where(models.Notification.id_customer == customer_id)
+    result = await db.execute(stmt.values(is_read=True).execution_options(synchronize_session=False))
+    await db.commit()
+    return result.rowcount
+
+async def delete_notifications(db: AsyncSession, notification_ids: list):
+    """
+    Supprime plusieurs notifications en un seul DELETE.
+    """
+    result = await db.execute(
+        delete(models.Notification)
+        .where(models.Notification.id_notification.in_(notification_ids))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+# --------------------- Address Controllers --------------------- #
+
+async def get_addresses(db: AsyncSession, skip: int = 0, limit: int = 10):
+    """
+    Récupère toutes les adresses.
+    """
+    return await _all(db, select(models.Address).offset(skip).limit(limit))
+
+async def get_addresses_page(db: AsyncSession, cursor: str = None, limit: int = 10):
+    """
+    Récupère une page d'adresses (pagination par curseur).
+    """
+    key = [models.Address.id_address]
+    return build_page(await _all(db, keyset(select(models.Address), key, cursor, limit)), key, limit)
+
+async def get_customer_addresses_page(db: AsyncSession, customer_id: int, cursor: str = None, limit: int = 10):
+    """
+    Récupère une page des adresses d'un client.
+    """
+    key = [models.Address.id_address]
+    stmt = select(models.Address).where(models.Address.id_customer == customer_id)
+    return build_page(await _all(db, keyset(stmt, key, cursor, limit)), key, limit)
+
+async def get_address_by_id(db: AsyncSession, address_id: int):
+    """
+    Récupère une adresse par ID.
+    """
+    return await db.get(models.Address, address_id)
+
+async def create_address(db: AsyncSession, address: schemas.AddressCreate):
+    """
+    Crée une nouvelle adresse.
+    """
+    db_address = models.Address(**address.dict())
+    db.add(db_address)
+    await db.commit()
+    return db_address
+
+async def update_address(db: AsyncSession, address_id: int, address_update: schemas.AddressUpdate):
+    """
+    Met à jour une adresse existante.
+    """
+    db_address = await _update_by_pk(db, models.Address, {"id_address": address_id}, address_update.dict(exclude_unset=True))
+    if not db_address:
+        raise HTTPException(status_code=404, detail="Address not found")
+    return db_address
+
+async def delete_address(db: AsyncSession, address_id: int):
+    """
+    Supprime une adresse par ID.
+    """
+    return await _delete_by_pk(db, models.Address, {"id_address": address_id})
+
+# --------------------- LoginLog Controllers --------------------- #
+
+async def get_login_logs(db: AsyncSession, skip: int = 0, limit: int = 10):
+    return await _all(db, select(models.LoginLog).offset(skip).limit(limit))
+
+async def get_login_logs_page(db: AsyncSession, cursor: str = None, limit: int = 10):
+    key = [models.LoginLog.id_log]
+    return build_page(await _all(db, keyset(select(models.LoginLog), key, cursor, limit)), key, limit)
+
+async def get_customer_login_logs_page(db: AsyncSession, customer_id: int, cursor: str = None, limit: int = 10):
+    # Dernières connexions d'abord, lues dans l'index (id_customer, login_time)
+    key = [models.LoginLog.login_time, models.LoginLog.id_log]
+    stmt = select(models.LoginLog).where(models.LoginLog.id_customer == customer_id)
+    return build_page(await _all(db, keyset(stmt, key, cursor, limit, descending=True)), key, limit)
+
+async def get_login_log_by_id(db: AsyncSession, log_id: int):
+    return await db.get(models.LoginLog, log_id)
+
+async def create_login_log(db: AsyncSession, login_log: schemas.LoginLogCreate):
+    db_login_log = models.LoginLog(**login_log.dict())
+    db.add(db_login_log)
+    await db.commit()
+    return db_login_log
+
+async def update_login_log(db: AsyncSession, log_id: int, login_log_update: schemas.LoginLogUpdate):
+    db_login_log = await _update_by_pk(db, models.LoginLog, {"id_log": log_id}, login_log_update.dict(exclude_unset=True))
+    if not db_login_log:
+        raise HTTPException(status_code=404, detail="Login log not found")
+    return db_login_log
+
+async def delete_login_log(db: AsyncSession, log_id: int):
+    return await _delete_by_pk(db, models.LoginLog, {"id_log": log_id})
+
+# --------------------- CustomerCompany Controllers --------------------- #
+
+async def get_customer_companies(db: AsyncSession, skip: int = 0, limit: int = 10):
+    """
+    Récupère toutes les relations entre clients et entreprises.
+    """
+    return await _all(db, select(models.CustomerCompany).offset(skip).limit(limit))
+
+async def get_customer_companies_page(db: AsyncSession, cursor: str = None, limit: int = 10):
+    """
+    Récupère une page de relations clients / entreprises (pagination par curseur).
+    """
+    key = [models.CustomerCompany.id_customer, models.CustomerCompany.id_company]
+    return build_page(await _all(db, keyset(select(models.CustomerCompany), key, cursor, limit)), key, limit)
+
+async def get_customer_company_by_ids(db: AsyncSession, customer_id: int, company_id: int):
+    """
+    Récupère une relation spécifique entre un client et une entreprise.
+    """
+    return await db.get(models.CustomerCompany, {"id_customer": customer_id, "id_company": company_id})
+
+async def create_customer_company(db: AsyncSession, customer_company: schemas.CustomerCompanyCreate):
+    """
+    Crée une nouvelle relation entre un client et une entreprise.
+    """
+    db_customer_company = models.CustomerCompany(
+        id_customer=customer_company.id_customer,
+        id_company=customer_company.id_company
+    )
+    db.add(db_customer_company)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Clé primaire déjà présente : la contrainte remplace le SELECT de vérification
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="CustomerCompany relation already exists")
+    return db_customer_company
+
+async def update_customer_company(db: AsyncSession, customer_id: int, company_id: int, customer_company_update: schemas.CustomerCompanyUpdate):
+    """
+    Met à jour une relation existante entre un client et une entreprise.
+    """
+    db_customer_company = await _update_by_pk(
+        db, models.CustomerCompany, {"id_customer": customer_id, "id_company": company_id},
+        {"id_customer": customer_company_update.id_customer, "id_company": customer_company_update.id_company},
+    )
+    if not db_customer_company:
+        raise HTTPException(status_code=404, detail="CustomerCompany not found")
+    return db_customer_company
+
+async def delete_customer_company(db: AsyncSession, customer_id: int, company_id: int):
+    """
+    Supprime une relation entre un client et une entreprise.
+    """
+    return await _delete_by_pk(db, models.CustomerCompany, {"id_customer": customer_id, "id_company": company_id})
@@ -0,0 +1,122 @@
+import asyncio
+import json
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from . import schemas
+from .database import run_db, BULK_INSERT_BATCH_SIZE
+from .middleware import hash_password, password_pool
+
+# Import groupé de clients : validation ligne à ligne, hachage bcrypt en parallèle
+# sur le pool dédié, puis insertion par lots (un executemany et un commit par lot).
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+async def iter_json_array(request: Request):
+    """
+    Itère sur les éléments d'un corps JSON qui doit être un tableau.
+    """
+    try:
+        records = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body is not valid JSON")
+    if not isinstance(records, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of customers")
+    for record in records:
+        yield record
+
+
+async def iter_ndjson(request: Request):
+    """
+    Itère sur les lignes d'un corps NDJSON au fil de l'upload, sans le charger en entier.
+    Une ligne illisible est renvoyée telle quelle (str) pour être signalée en erreur.
+    """
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+    if buffer.strip():
+        yield _parse_line(buffer)
+
+
+def _parse_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return line.decode("utf-8", errors="replace")
+
+
+def iter_upload(request: Request):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_CONTENT_TYPES:
+        return iter_ndjson(request)
+    return iter_json_array(request)
+
+
+async def _hash_passwords(customers: list) -> list:
+    # Au plus `workers` hachages en file à la fois : l'import ne prend pas les
+    # places de la file d'attente réservées aux connexions (503)
+    semaphore = asyncio.Semaphore(password_pool.workers)
+
+    async def hash_one(customer):
+        async with semaphore:
+            return await password_pool.run(hash_password, customer.password_hash)
+
+    return await asyncio.gather(*(hash_one(customer) for customer in customers))
+
+
+async def _insert_batch(db, crud, batch: list, errors: list) -> int:
+    indexes = [index for index, _ in batch]
+    customers = [customer for _, customer in batch]
+    hashes = await _hash_passwords(customers)
+    rows = []
+    for customer, hashed_password in zip(customers, hashes):
+        row = customer.dict()
+        row["password_hash"] = hashed_password
+        rows.append(row)
+
+    failed = await run_db(crud.bulk_create_customers, db, rows)
+    errors.extend({"index": indexes[position], "detail": detail} for position, detail in failed)
+    return len(rows) - len(failed)
+
+
+async def import_customers(db, crud, records, batch_size: int = None) -> dict:
+    """
+    Valide, hache et insère les clients de `records` (itérable asynchrone) par lots de `batch_size`.
+    Les lignes invalides ou en doublon sont rapportées avec leur index sans bloquer les autres.
+    """
+    batch_size = batch_size or BULK_INSERT_BATCH_SIZE
+    inserted = 0
+    errors = []
+    batch = []
+    seen_emails = set()
+    index = -1
+
+    async for record in records:
+        index += 1
+        if not isinstance(record, dict):
+            errors.append({"index": index, "detail": "Row is not a JSON object"})
+            continue
+        try:
+            customer = schemas.CustomerCreate.parse_obj(record)
+        except ValidationError as e:
+            errors.append({"index": index, "detail": json.loads(e.json())})
+            continue
+        if customer.email in seen_emails:
+            errors.append({"index": index, "detail": "Duplicate email in upload"})
+            continue
+        seen_emails.add(customer.email)
+
+        batch.append((index, customer))
+        if len(batch) >= batch_size:
+            inserted += await _insert_batch(db, crud, batch, errors)
+            batch = []
+
+    if batch:
+        inserted += await _insert_batch(db, crud, batch, errors)
+
+    errors.sort(key=lambda error: error["index"])
+    return {"inserted": inserted, "failed": len(errors), "errors": errors}
@@ -1,27 +1,110 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, false, func, insert, literal, select, true, update
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.exc import IntegrityError
 from . import models, schemas
 from fastapi import HTTPException
-from .middleware import hash_password
+from .middleware import hash_password, password_pool
+from .pagination import keyset, build_page
+
+# Écritures en une ou deux requêtes : la session ne recharge rien après commit
+# (expire_on_commit=False) et les get_*_by_id passent par la carte d'identité,
+# si bien que l'objet lu par le contrôle d'existence de l'endpoint est réutilisé.
+
+def _supports_returning(db: Session) -> bool:
+    return getattr(db.get_bind().dialect, "full_returning", False) is True
+
+def _pk_clause(model, pk: dict):
+    return [getattr(model, key) == value for key, value in pk.items()]
+
+def _update_by_pk(db: Session, model, pk: dict, values: dict):
+    """
+    Met à jour la ligne de clé `pk` en un seul UPDATE et renvoie l'objet à jour (None si absente).
+    Avec RETURNING la ligne revient avec l'UPDATE ; sinon (MySQL) l'objet de la session est fusionné en mémoire.
+    """
+    if not values:
+        return db.get(model, pk)
+
+    stmt = update(model).where(*_pk_clause(model, pk)).values(**values).execution_options(synchronize_session=False)
+    if _supports_returning(db):
+        row = db.execute(stmt.returning(*model.__table__.c)).first()
+        db.commit()
+        return model(**row._mapping) if row is not None else None
+
+    db_obj = db.get(model, pk)
+    if db_obj is None:
+        return None
+    db.execute(stmt)
+    db.commit()
+    for key, value in values.items():
+        set_committed_value(db_obj, key, value)
+    return db_obj
+
+def _delete_by_pk(db: Session, model, pk: dict):
+    """
+    Supprime la ligne de clé `pk` en un seul DELETE et renvoie l'objet supprimé (None si absente).
+    """
+    stmt = delete(model).where(*_pk_clause(model, pk)).execution_options(synchronize_session=False)
+    if _supports_returning(db):
+        row = db.execute(stmt.returning(*model.__table__.c)).first()
+        db.commit()
+        return model(**row._mapping) if row is not None else None
+
+    db_obj = db.get(model, pk)
+    if db_obj is None:
+        return None
+    db.execute(stmt)
+    db.commit()
+    return db_obj
 
 # --------------------- Customer Controllers --------------------- #
 
-def get_customers(db: Session):
+def get_customers(db: Session, skip: int = 0, limit: int = None):
     """
-    Récupère tous les clients.
+    Récupère les clients (tous si aucune limite n'est donnée).
     """
-    return db.query(models.Customer).all()
+    return db.query(models.Customer).order_by(models.Customer.id_customer).offset(skip).limit(limit).all()
+
+def get_customers_page(db: Session, cursor: str = None, limit: int = 100):
+    """
+    Récupère une page de clients (pagination par curseur).
+    """
+    key = [models.Customer.id_customer]
+    return build_page(keyset(db.query(models.Customer), key, cursor, limit).all(), key, limit)
+
+def stream_customers(db: Session, batch_size: int = 500):
+    """
+    Itère sur tous les clients par lots de `batch_size` sans tout charger en mémoire.
+    """
+    return db.query(models.Customer).order_by(models.Customer.id_customer).yield_per(batch_size)
 
 def get_customer_by_id(db: Session, customer_id: int):
     """
     Récupère un client par ID.
     """
-    return db.query(models.Customer).filter(models.Customer.id_customer == customer_id).first()
+    return db.get(models.Customer, customer_id)
+
+def get_customer_by_email(db: Session, email: str):
+    """
+    Récupère un client par email (utilisé pour le login).
+    """
+    return db.query(models.Customer).filter(models.Customer.email == email).first()
+
+# Colonnes lues par /login : ni l'entité complète, ni la carte d'identité
+LOGIN_COLUMNS = (models.Customer.id_customer, models.Customer.email, models.Customer.customer_type,
+                 models.Customer.password_hash)
+
+def get_login_credentials(db: Session, email: str):
+    """
+    Récupère id, email, type et hash du mot de passe d'un client (index unique sur email).
+    """
+    return db.execute(select(*LOGIN_COLUMNS).where(models.Customer.email == email)).first()
 
 def create_customer(db: Session, customer: schemas.CustomerCreate):
     """
     Create a new customer with a hashed password.
     """
-    hashed_password = hash_password(customer.password_hash)  
+    hashed_password = password_pool.run_sync(hash_password, customer.password_hash)
 
     db_customer = models.Customer(
         name=customer.name,
@@ -41,49 +124,83 @@ def create_customer(db: Session, customer: schemas.CustomerCreate):
     )
     db.add(db_customer)
     db.commit()
-    db.refresh(db_customer)
     return db_customer
 
+def bulk_create_customers(db: Session, rows: list):
+    """
+    Insère un lot de clients (mots de passe déjà hachés) en une transaction.
+    Renvoie les (position dans le lot, raison) des lignes refusées.
+    """
+    table = models.Customer.__table__
+    emails = [row["email"] for row in rows]
+    existing = {email for (email,) in db.query(models.Customer.email).filter(models.Customer.email.in_(emails))}
+    failed = [(position, "Email already registered") for position, row in enumerate(rows) if row["email"] in existing]
+    to_insert = [(position, row) for position, row in enumerate(rows) if row["email"] not in existing]
+    if not to_insert:
+        return failed
+
+    try:
+        db.execute(table.insert(), [row for _, row in to_insert])
+        db.commit()
+    except IntegrityError:
+        # Conflit apparu entre la vérification et l'insertion : ligne par ligne pour isoler les fautives
+        db.rollback()
+        for position, row in to_insert:
+            try:
+                db.execute(table.insert(), row)
+                db.commit()
+            except IntegrityError as e:
+                db.rollback()
+                failed.append((position, str(e.orig)))
+    return failed
+
 def update_customer(db: Session, customer_id: int, customer_update: schemas.CustomerUpdate):
     """
     Met à jour les informations d'un client existant.
     """
-    db_customer = get_customer_by_id(db, customer_id)
+    db_customer = _update_by_pk(db, models.Customer, {"id_customer": customer_id}, customer_update.dict(exclude_unset=True))
     if not db_customer:
         raise HTTPException(status_code=404, detail="Customer not found")
-
-    for key, value in customer_update.dict(exclude_unset=True).items():
-        setattr(db_customer, key, value)
-
-    db.commit()
-    db.refresh(db_customer)
     return db_customer
 
 def delete_customer(db: Session, customer_id: int):
     """
     Supprime un client par ID.
     """
-    db_customer = get_customer_by_id(db, customer_id)
-    if not db_customer:
-        return None
-
-    db.delete(db_customer)
-    db.commit()
-    return db_customer
+    # Les liens vers les entreprises partent dans la même transaction
+    db.execute(
+        delete(models.CustomerCompany)
+        .where(models.CustomerCompany.id_customer == customer_id)
+        .execution_options(synchronize_session=False)
+    )
+    return _delete_by_pk(db, models.Customer, {"id_customer": customer_id})
 
 # --------------------- Company Controllers --------------------- #
 
-def get_all_companies(db: Session):
+def get_all_companies(db: Session, skip: int = 0, limit: int = None):
+    """
+    Récupère les entreprises (toutes si aucune limite n'est donnée).
+    """
+    return db.query(models.Company).order_by(models.Company.id_company).offset(skip).limit(limit).all()
+
+def get_companies_page(db: Session, cursor: str = None, limit: int = 100):
+    """
+    Récupère une page d'entreprises (pagination par curseur).
+    """
+    key = [models.Company.id_company]
+    return build_page(keyset(db.query(models.Company), key, cursor, limit).all(), key, limit)
+
+def stream_companies(db: Session, batch_size: int = 500):
     """
-    Récupère toutes les entreprises.
+    Itère sur toutes les entreprises par lots de `batch_size`.
     """
-    return db.query(models.Company).all()
+    return db.query(models.Company).order_by(models.Company.id_company).yield_per(batch_size)
 
 def get_company_by_id(db: Session, company_id: int):
     """
     Récupère une entreprise par ID.
     """
-    return db.query(models.Company).filter(models.Company.id_company == company_id).first()
+    return db.get(models.Company, company_id)
 
 def create_company(db: Session, company: schemas.CompanyCreate):
     """
@@ -100,74 +217,120 @@ def create_company(db: Session, company: schemas.CompanyCreate):
     )
     db.add(db_company)
     db.commit()
-    db.refresh(db_company)
     return db_company
 
 def update_company(db: Session, company_id: int, company_update: schemas.CompanyUpdate):
     """
     Met à jour une entreprise existante.
     """
-    db_company = get_company_by_id(db, company_id)
+    db_company = _update_by_pk(db, models.Company, {"id_company": company_id}, company_update.dict(exclude_unset=True))
     if not db_company:
         raise HTTPException(status_code=404, detail="Company not found")
-
-    for key, value in company_update.dict(exclude_unset=True).items():
-        setattr(db_company, key, value)
-
-    db.commit()
-    db.refresh(db_company)
     return db_company
 
 def delete_company(db: Session, company_id: int):
     """
     Supprime une entreprise par ID.
     """
-    db_company = get_company_by_id(db, company_id)
-    if not db_company:
-        return None
-
-    db.delete(db_company)
-    db.commit()
-    return db_company
+    db.execute(
+        delete(models.CustomerCompany)
+        .where(models.CustomerCompany.id_company == company_id)
+        .execution_options(synchronize_session=False)
+    )
+    return _delete_by_pk(db, models.Company, {"id_company": company_id})
 
 # --------------------- Feedback Controllers --------------------- #
 
 def get_feedbacks(db: Session, skip: int = 0, limit: int = 10):
     return db.query(models.Feedback).offset(skip).limit(limit).all()
 
+def get_feedbacks_page(db: Session, cursor: str = None, limit: int = 10):
+    key = [models.Feedback.id_feedback]
+    return build_page(keyset(db.query(models.Feedback), key, cursor, limit).all(), key, limit)
+
+def get_customer_feedbacks_page(db: Session, customer_id: int, cursor: str = None, limit: int = 10):
+    """
+    Récupère une page des feedbacks d'un client, les plus récents d'abord.
+    """
+    key = [models.Feedback.id_feedback]
+    query = db.query(models.Feedback).filter(models.Feedback.id_customer == customer_id)
+    return build_page(keyset(query, key, cursor, limit, descending=True).all(), key, limit)
+
+def get_customer_profile(db: Session, customer_id: int, recent: int = 5):
+    """
+    Récupère un client avec ses adresses, ses entreprises et ses dernières notifications et feedbacks.
+    Nombre de requêtes fixe (5), quel que soit le volume : pas de chargement paresseux par ligne.
+    """
+    customer = (
+        db.query(models.Customer)
+        .options(selectinload(models.Customer.addresses), selectinload(models.Customer.companies))
+        .filter(models.Customer.id_customer == customer_id)
+        .first()
+    )
+    if customer is None:
+        return None
+    # Les "dernières" lignes se bornent en SQL (LIMIT) plutôt que de charger toute la relation
+    notifications = (
+        db.query(models.Notification).filter(models.Notification.id_customer == customer_id)
+        .order_by(models.Notification.id_notification.desc()).limit(recent).all()
+    )
+    feedbacks = (
+        db.query(models.Feedback).filter(models.Feedback.id_customer == customer_id)
+        .order_by(models.Feedback.id_feedback.desc()).limit(recent).all()
+    )
+    return {
+        "customer": customer,
+        "addresses": customer.addresses,
+        "companies": customer.companies,
+        "recent_notifications": notifications,
+        "recent_feedbacks": feedbacks,
+    }
+
 def get_feedback_by_id(db: Session, feedback_id: int):
-    return db.query(models.Feedback).filter(models.Feedback.id_feedback == feedback_id).first()
+    return db.get(models.Feedback, feedback_id)
 
 def create_feedback(db: Session, feedback: schemas.FeedbackCreate):
     db_feedback = models.Feedback(**feedback.dict())
     db.add(db_feedback)
     db.commit()
-    db.refresh(db_feedback)
     return db_feedback
 
 def update_feedback(db: Session, feedback_id: int, feedback_update: schemas.FeedbackUpdate):
-    db_feedback = db.query(models.Feedback).filter(models.Feedback.id_feedback == feedback_id).first()
-    if db_feedback:
-        for key, value in feedback_update.dict(exclude_unset=True).items():
-            setattr(db_feedback, key, value)
-        db.commit()
-        db.refresh(db_feedback)
-    return db_feedback
+    return _update_by_pk(db, models.Feedback, {"id_feedback": feedback_id}, feedback_update.dict(exclude_unset=True))
 
 def delete_feedback(db: Session, feedback_id: int):
-    db_feedback = db.query(models.Feedback).filter(models.Feedback.id_feedback == feedback_id).first()
-    if db_feedback:
-        db.delete(db_feedback)
-        db.commit()
-    return db_feedback
+    return _delete_by_pk(db, models.Feedback, {"id_feedback": feedback_id})
 
 # --------------------- Notification Controllers --------------------- #
 
 def get_notifications(db: Session, skip: int = 0, limit: int = 10):
     return db.query(models.Notification).offset(skip).limit(limit).all()
 
+def get_notifications_page(db: Session, cursor: str = None, limit: int = 10):
+    key = [models.Notification.id_notification]
+    return build_page(keyset(db.query(models.Notification), key, cursor, limit).all(), key, limit)
+
+def get_customer_notifications_page(db: Session, customer_id: int, cursor: str = None, limit: int = 10, unread_only: bool = False):
+    """
+    Récupère une page des notifications d'un client, les plus récentes d'abord.
+    """
+    key = [models.Notification.id_notification]
+    query = db.query(models.Notification).filter(models.Notification.id_customer == customer_id)
+    if unread_only:
+        query = query.filter(models.Notification.is_read == false())
+    return build_page(keyset(query, key, cursor, limit, descending=True).all(), key, limit)
+
+def count_unread_notifications(db: Session, customer_id: int):
+    """
+    Compte les notifications non lues d'un client, sans quitter l'index (id_customer, is_read).
+    """
+    return db.query(func.count(models.Notification.id_notification)).filter(
+        models.Notification.id_customer == customer_id,
+        models.Notification.is_read == false()
+    ).scalar()
+
 def get_notification_by_id(db: Session, notification_id: int):
-    return db.query(models.Notification).filter(models.Notification.id_notification == notification_id).first()
+    return db.get(models.Notification, notification_id)
 
 def create_notification(db: Session, notification: schemas.NotificationCreate):
     db_notification = models.Notification(
@@ -179,24 +342,67 @@ def create_notification(db: Session, notification: schemas.NotificationCreate):
     )
     db.add(db_notification)
     db.commit()
-    db.refresh(db_notification)
     return db_notification
 
 def update_notification(db: Session, notification_id: int, notification_update: schemas.NotificationUpdate):
-    db_notification = db.query(models.Notification).filter(models.Notification.id_notification == notification_id).first()
-    if db_notification:
-        for key, value in notification_update.dict(exclude_unset=True).items():
-            setattr(db_notification, key, value)
-        db.commit()
-        db.refresh(db_notification)
-    return db_notification
+    return _update_by_pk(
+        db, models.Notification, {"id_notification": notification_id}, notification_update.dict(exclude_unset=True)
+    )
 
 def delete_notification(db: Session, notification_id: int):
-    db_notification = db.query(models.Notification).filter(models.Notification.id_notification == notification_id).first()
-    if db_notification:
-        db.delete(db_notification)
-        db.commit()
-    return db_notification
+    return _delete_by_pk(db, models.Notification, {"id_notification": notification_id})
+
+def create_notifications(db: Session, notifications: list):
+    """
+    Crée plusieurs notifications en un seul INSERT multi-lignes.
+    """
+    if not notifications:
+        return 0
+    rows = [notification.dict() for notification in notifications]
+    db.execute(insert(models.Notification).values(rows))
+    db.commit()
+    return len(rows)
+
+def create_campaign_notifications(db: Session, campaign: schemas.NotificationCampaign):
+    """
+    Notifie tous les clients (ou ceux ayant accepté le marketing) en un seul INSERT ... SELECT.
+    """
+    recipients = select(
+        literal(campaign.message), literal(campaign.date_created), false(), literal(campaign.type),
+        models.Customer.id_customer,
+    )
+    if campaign.opted_in_only:
+        recipients = recipients.where(models.Customer.opt_in_marketing == true())
+    result = db.execute(insert(models.Notification).from_select(
+        ["message", "date_created", "is_read", "type", "id_customer"], recipients
+    ))
+    db.commit()
+    return result.rowcount
+
+def mark_notifications_read(db: Session, notification_ids: list = None, customer_id: int = None):
+    """
+    Marque comme lues des notifications (par IDs et/ou par client) en un seul UPDATE.
+    """
+    stmt = update(models.Notification).where(models.Notification.is_read == false())
+    if notification_ids is not None:
+        stmt = stmt.where(models.Notification.id_notification.in_(notification_ids))
+    if customer_id is not None:
+        stmt = stmt.where(models.Notification.id_customer == customer_id)
+    result = db.execute(stmt.values(is_read=True).execution_options(synchronize_session=False))
+    db.commit()
+    return result.rowcount
+
+def delete_notifications(db: Session, notification_ids: list):
+    """
+    Supprime plusieurs notifications en un seul DELETE.
+    """
+    result = db.execute(
+        delete(models.Notification)
+        .where(models.Notification.id_notification.in_(notification_ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
 
 # --------------------- Address Controllers --------------------- #
 
@@ -206,11 +412,26 @@ def get_addresses(db: Session, skip: int = 0, limit: int = 10):
     """
     return db.query(models.Address).offset(skip).limit(limit).all()
 
+def get_addresses_page(db: Session, cursor: str = None, limit: int = 10):
+    """
+    Récupère une page d'adresses (pagination par curseur).
+    """
+    key = [models.Address.id_address]
+    return build_page(keyset(db.query(models.Address), key, cursor, limit).all(), key, limit)
+
+def get_customer_addresses_page(db: Session, customer_id: int, cursor: str = None, limit: int = 10):
+    """
+    Récupère une page des adresses d'un client.
+    """
+    key = [models.Address.id_address]
+    query = db.query(models.Address).filter(models.Address.id_customer == customer_id)
+    return build_page(keyset(query, key, cursor, limit).all(), key, limit)
+
 def get_address_by_id(db: Session, address_id: int):
     """
     Récupère une adresse par ID.
     """
-    return db.query(models.Address).filter(models.Address.id_address == address_id).first()
+    return db.get(models.Address, address_id)
 
 def create_address(db: Session, address: schemas.AddressCreate):
     """
@@ -219,71 +440,55 @@ def create_address(db: Session, address: schemas.AddressCreate):
     db_address = models.Address(**address.dict())
     db.add(db_address)
     db.commit()
-    db.refresh(db_address)
     return db_address
 
 def update_address(db: Session, address_id: int, address_update: schemas.AddressUpdate):
     """
     Met à jour une adresse existante.
     """
-    db_address = get_address_by_id(db, address_id)
+    db_address = _update_by_pk(db, models.Address, {"id_address": address_id}, address_update.dict(exclude_unset=True))
     if not db_address:
         raise HTTPException(status_code=404, detail="Address not found")
-
-    for key, value in address_update.dict(exclude_unset=True).items():
-        setattr(db_address, key, value)
-
-    db.commit()
-    db.refresh(db_address)
     return db_address
 
 def delete_address(db: Session, address_id: int):
     """
     Supprime une adresse par ID.
     """
-    db_address = get_address_by_id(db, address_id)
-    if not db_address:
-        return None
-
-    db.delete(db_address)
-    db.commit()
-    return db_address
+    return _delete_by_pk(db, models.Address, {"id_address": address_id})
 
 # --------------------- LoginLog Controllers --------------------- #
 
 def get_login_logs(db: Session, skip: int = 0, limit: int = 10):
     return db.query(models.LoginLog).offset(skip).limit(limit).all()
 
+def get_login_logs_page(db: Session, cursor: str = None, limit: int = 10):
+    key = [models.LoginLog.id_log]
+    return build_page(keyset(db.query(models.LoginLog), key, cursor, limit).all(), key, limit)
+
+def get_customer_login_logs_page(db: Session, customer_id: int, cursor: str = None, limit: int = 10):
+    # Dernières connexions d'abord, lues dans l'index (id_customer, login_time)
+    key = [models.LoginLog.login_time, models.LoginLog.id_log]
+    query = db.query(models.LoginLog).filter(models.LoginLog.id_customer == customer_id)
+    return build_page(keyset(query, key, cursor, limit, descending=True).all(), key, limit)
+
 def get_login_log_by_id(db: Session, log_id: int):
-    return db.query(models.LoginLog).filter(models.LoginLog.id_log == log_id).first()
+    return db.get(models.LoginLog, log_id)
 
 def create_login_log(db: Session, login_log: schemas.LoginLogCreate):
     db_login_log = models.LoginLog(**login_log.dict())
     db.add(db_login_log)
     db.commit()
-    db.refresh(db_login_log)
     return db_login_log
 
 def update_login_log(db: Session, log_id: int, login_log_update: schemas.LoginLogUpdate):
-    db_login_log = db.query(models.LoginLog).filter(models.LoginLog.id_log == log_id).first()
+    db_login_log = _update_by_pk(db, models.LoginLog, {"id_log": log_id}, login_log_update.dict(exclude_unset=True))
     if not db_login_log:
         raise HTTPException(status_code=404, detail="Login log not found")
-
-    for key, value in login_log_update.dict(exclude_unset=True).items():
-        setattr(db_login_log, key, value)
-
-    db.commit()
-    db.refresh(db_login_log)
     return db_login_log
 
 def delete_login_log(db: Session, log_id: int):
-    db_login_log = db.query(models.LoginLog).filter(models.LoginLog.id_log == log_id).first()
-    if not db_login_log:
-        return None
-
-    db.delete(db_login_log)
-    db.commit()
-    return db_login_log
+    return _delete_by_pk(db, models.LoginLog, {"id_log": log_id})
 
 # --------------------- CustomerCompany Controllers --------------------- #
 
@@ -293,69 +498,50 @@ def get_customer_companies(db: Session, skip: int = 0, limit: int = 10):
     """
     return db.query(models.CustomerCompany).offset(skip).limit(limit).all()
 
+def get_customer_companies_page(db: Session, cursor: str = None, limit: int = 10):
+    """
+    Récupère une page de relations clients / entreprises (pagination par curseur).
+    """
+    key = [models.CustomerCompany.id_customer, models.CustomerCompany.id_company]
+    return build_page(keyset(db.query(models.CustomerCompany), key, cursor, limit).all(), key, limit)
+
 def get_customer_company_by_ids(db: Session, customer_id: int, company_id: int):
     """
     Récupère une relation spécifique entre un client et une entreprise.
     """
-    return db.query(models.CustomerCompany).filter(
-        models.CustomerCompany.id_customer == customer_id,
-        models.CustomerCompany.id_company == company_id
-    ).first()
+    return db.get(models.CustomerCompany, {"id_customer": customer_id, "id_company": company_id})
 
 def create_customer_company(db: Session, customer_company: schemas.CustomerCompanyCreate):
     """
     Crée une nouvelle relation entre un client et une entreprise.
     """
-    # Vérifier si la relation existe déjà
-    existing_relation = db.query(models.CustomerCompany).filter(
-        models.CustomerCompany.id_customer == customer_company.id_customer,
-        models.CustomerCompany.id_company == customer_company.id_company
-    ).first()
-    
-    if existing_relation:
-        raise HTTPException(status_code=400, detail="CustomerCompany relation already exists")
-
     db_customer_company = models.CustomerCompany(
         id_customer=customer_company.id_customer,
         id_company=customer_company.id_company
     )
     db.add(db_customer_company)
-    db.commit()
-    db.refresh(db_customer_company)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Clé primaire déjà présente : la contrainte remplace le SELECT de vérification
+        db.rollback()
+        raise HTTPException(status_code=400, detail="CustomerCompany relation already exists")
     return db_customer_company
 
 def update_customer_company(db: Session, customer_id: int, company_id: int, customer_company_update: schemas.CustomerCompanyUpdate):
     """
     Met à jour une relation existante entre un client et une entreprise.
     """
-    db_customer_company = db.query(models.CustomerCompany).filter(
-        models.CustomerCompany.id_customer == customer_id,
-        models.CustomerCompany.id_company == company_id
-    ).first()
-    
+    db_customer_company = _update_by_pk(
+        db, models.CustomerCompany, {"id_customer": customer_id, "id_company": company_id},
+        {"id_customer": customer_company_update.id_customer, "id_company": customer_company_update.id_company},
+    )
     if not db_customer_company:
         raise HTTPException(status_code=404, detail="CustomerCompany not found")
-
-    # Update foreign keys if needed
-    db_customer_company.id_customer = customer_company_update.id_customer
-    db_customer_company.id_company = customer_company_update.id_company
-
-    db.commit()
-    db.refresh(db_customer_company)
     return db_customer_company
 
 def delete_customer_company(db: Session, customer_id: int, company_id: int):
     """
     Supprime une relation entre un client et une entreprise.
     """
-    db_customer_company = db.query(models.CustomerCompany).filter(
-        models.CustomerCompany.id_customer == customer_id,
-        models.CustomerCompany.id_company == company_id
-    ).first()
-    
-    if not db_customer_company:
-        return None
-
-    db.delete(db_customer_company)
-    db.commit()
-    return db_customer_company
\ No newline at end of file
+    return _delete_by_pk(db, models.CustomerCompany, {"id_customer": customer_id, "id_company": company_id})
\ No newline at end of file
@@ -1,8 +1,12 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from starlette.concurrency import run_in_threadpool
+import inspect
 import os
+import time
 from dotenv import load_dotenv
 
 # Charger les variables d'environnement
@@ -10,13 +14,173 @@ load_dotenv()
 
 DATABASE_URL = os.getenv('DATABASE_URL')
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Mode d'accès à la base : "sync" (Session dans le threadpool) ou "async" (AsyncSession)
+DB_MODE = os.getenv('DB_MODE', 'sync').lower()
+USE_ASYNC_DB = DB_MODE == 'async'
+
+# Drivers asynchrones équivalents aux drivers synchrones de DATABASE_URL
+ASYNC_DRIVERS = {
+    'mysql': 'mysql+aiomysql',
+    'mysql+mysqlconnector': 'mysql+aiomysql',
+    'mysql+pymysql': 'mysql+aiomysql',
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Convertit une URL SQLAlchemy synchrone en URL utilisant un driver asynchrone.
+    """
+    scheme, sep, rest = url.partition('://')
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+# Configuration du pool de connexions (par réplique)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+# MySQL coupe les connexions inactives (wait_timeout) : on les recycle avant
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+# LIFO garde un petit noyau de connexions chaudes et laisse expirer le reste ; FIFO les fait tourner
+DB_POOL_USE_LIFO = os.getenv('DB_POOL_ORDER', 'fifo').lower() == 'lifo'
+
+
+# Taille des lots lus (yield_per) par les réponses NDJSON en streaming
+STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', '500'))
+# Lignes insérées par transaction lors des imports groupés (POST /customers/bulk)
+BULK_INSERT_BATCH_SIZE = int(os.getenv('BULK_INSERT_BATCH_SIZE', '1000'))
+# Lignes max. par opération groupée sur les notifications (une seule requête SQL chacune)
+MAX_NOTIFICATION_BATCH = int(os.getenv('MAX_NOTIFICATION_BATCH', '1000'))
+
+
+class PoolStats:
+    """
+    Compteurs d'attente du pool : une attente = un checkout alors que toutes
+    les connexions (pool + overflow) sont déjà prises.
+    """
+
+    def __init__(self):
+        self.waits = 0
+        self.wait_time = 0.0
+        self.timeouts = 0
+
+
+class InstrumentedPoolMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        saturated = self._max_overflow > -1 and self._overflow >= self._max_overflow and self.checkedin() == 0
+        if not saturated:
+            return super()._do_get()
+
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.waits += 1
+            self.stats.wait_time += time.perf_counter() - start
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, poolclass=InstrumentedQueuePool) -> dict:
+    """
+    Options create_engine() issues de l'environnement.
+    SQLite garde ses pools par défaut (SingletonThreadPool / NullPool).
+    """
+    if url.startswith('sqlite'):
+        # SQLite refuse par défaut qu'une connexion change de thread (threadpool FastAPI)
+        return {"connect_args": {"check_same_thread": False}}
+
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_use_lifo": DB_POOL_USE_LIFO,
+    }
+
+
+def pool_status(engine) -> dict:
+    """
+    Photographie du pool d'un engine : connexions prises, overflow, attentes.
+    """
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+        })
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update({
+            "waits": stats.waits,
+            "wait_time_ms": round(stats.wait_time * 1000, 2),
+            "timeouts": stats.timeouts,
+        })
+    return status
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+# expire_on_commit=False : les objets écrits restent lisibles après commit sans SELECT de relecture
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
+async_engine = None
+AsyncSessionLocal = None
+
+if USE_ASYNC_DB:
+    from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+    ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL') or to_async_url(DATABASE_URL)
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncQueuePool)
+    )
+    AsyncSessionLocal = sessionmaker(
+        bind=async_engine, class_=AsyncSession, autocommit=False, autoflush=False, expire_on_commit=False
+    )
+
+
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+get_db = get_async_db if USE_ASYNC_DB else get_sync_db
+
+
+async def run_db(controller, *args, **kwargs):
+    """
+    Exécute un contrôleur sans bloquer la boucle d'événements :
+    les contrôleurs async sont attendus, les contrôleurs sync passent par le threadpool.
+    """
+    if inspect.iscoroutinefunction(controller):
+        return await controller(*args, **kwargs)
+    return await run_in_threadpool(controller, *args, **kwargs)
@@ -0,0 +1,198 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+# Charger les variables d'environnement
+load_dotenv()
+
+# Niveau global, et niveaux par module : "app.messaging=DEBUG,sqlalchemy.engine=INFO"
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+# json (une ligne JSON par enregistrement) ou text
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()
+# Enregistrements en attente d'écriture au plus ; au-delà ils sont perdus et comptés, jamais bloquants
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+# Part des lignes DEBUG gardées, par message (1 = toutes, 0.01 = une sur cent)
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '1'))
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Attributs standards d'un LogRecord : tout le reste vient de `extra=` et part dans le JSON
+_RECORD_ATTRIBUTES = set(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """
+    "app.messaging=DEBUG,sqlalchemy.engine=INFO" -> {"app.messaging": 10, "sqlalchemy.engine": 20}
+    """
+    levels = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, level = item.partition("=")
+        if not level or not isinstance(logging.getLevelName(level.strip().upper()), int):
+            raise ValueError(f"Invalid LOG_LEVELS entry '{item.strip()}', expected module=LEVEL")
+        levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return levels
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Une ligne JSON par enregistrement ; les champs passés dans `extra=` sont ajoutés tels quels.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Ne garde qu'une ligne sur N par message pour les niveaux <= `level` (DEBUG par défaut).
+    Le compteur est par gabarit (`logger.debug("... %s", x)`), la première occurrence est toujours gardée.
+    Au plus `max_templates` compteurs, les moins récents sont oubliés : un message en f-string,
+    différent à chaque appel, ne fait pas grossir la mémoire.
+    """
+
+    def __init__(self, rate: float, level: int = logging.DEBUG, max_templates: int = 1000):
+        super().__init__()
+        self.level = level
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self.max_templates = max_templates
+        self._counts: "OrderedDict[tuple, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.level or self.every == 1:
+            return True
+        if not self.every:
+            return False
+        key = (record.name, record.msg)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+            self._counts.move_to_end(key)
+            if len(self._counts) > self.max_templates:
+                self._counts.popitem(last=False)
+        if count % self.every:
+            return False
+        record.sample_rate = 1 / self.every
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Dépose les enregistrements dans une file bornée lue par un QueueListener (thread dédié) :
+    le formatage JSON et l'écriture sur le flux ne se font jamais dans la boucle d'événements.
+    File pleine : l'enregistrement est perdu et compté plutôt que d'attendre.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Seule l'interpolation du message se fait ici : les arguments pourraient changer d'ici l'écriture
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StderrHandler(logging.StreamHandler):
+    """
+    Écrit sur le sys.stderr courant, qui peut être remplacé après la configuration (pytest, uvicorn).
+    """
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+
+def configure_logging(level: str = LOG_LEVEL, levels: str = LOG_LEVELS, fmt: str = LOG_FORMAT,
+                      sample_rate: float = LOG_DEBUG_SAMPLE_RATE, queue_size: int = LOG_QUEUE_SIZE,
+                      handler: Optional[logging.Handler] = None) -> QueueListener:
+    """
+    Installe le handler asynchrone sur le logger racine et démarre le thread d'écriture.
+    Idempotent : un nouvel appel remplace la configuration précédente.
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+
+    handler = handler or StderrHandler()
+    handler.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+    log_queue = queue.Queue(queue_size)
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    _queue_handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(level.upper())
+    for name, module_level in parse_levels(levels).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """
+    Écrit les enregistrements encore en file puis arrête le thread d'écriture.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+def stats() -> dict:
+    if _queue_handler is None:
+        return {"configured": False}
+    return {"configured": True, "pending": _queue_handler.queue.qsize(), "dropped": _queue_handler.dropped}
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import bindparam, func
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from . import models
+from .database import USE_ASYNC_DB, SessionLocal, AsyncSessionLocal
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Écritures du login (Login_Logs, last_login, failed_login_attempts) regroupées toutes les N ms ;
+# 0 les écrit pendant la requête, comme avant
+LOGIN_EVENTS_FLUSH_INTERVAL_MS = int(os.getenv('LOGIN_EVENTS_FLUSH_INTERVAL_MS', '500'))
+# Vidage anticipé dès M événements en attente ; c'est aussi la taille max. d'un lot écrit
+LOGIN_EVENTS_BATCH_SIZE = int(os.getenv('LOGIN_EVENTS_BATCH_SIZE', '500'))
+# Événements gardés en mémoire au plus (base lente ou indisponible) ; au-delà ils sont perdus et comptés
+LOGIN_EVENTS_MAX_PENDING = int(os.getenv('LOGIN_EVENTS_MAX_PENDING', '10000'))
+
+
+class LoginEvent:
+    """
+    Tentative de connexion sur un compte existant, à écrire en base plus tard.
+    """
+    __slots__ = ("id_customer", "success", "time", "ip_address", "user_agent")
+
+    def __init__(self, id_customer: int, success: bool, ip_address: Optional[str] = None,
+                 user_agent: Optional[str] = None, time: Optional[datetime] = None):
+        self.id_customer = id_customer
+        self.success = success
+        self.time = time or datetime.utcnow()
+        self.ip_address = ip_address
+        # Login_Logs.user_agent est un VARCHAR(255)
+        self.user_agent = user_agent[:255] if user_agent else user_agent
+
+
+def write_login_events(db: Session, events: List[LoginEvent]):
+    """
+    Écrit un lot d'événements en une transaction : un INSERT multi-lignes des Login_Logs
+    et au plus deux UPDATE (executemany) des clients, quel que soit le nombre d'événements.
+    """
+    customers = models.Customer.__table__
+    logs = []
+    # Client connecté dans le lot : last_login et échecs depuis sa dernière connexion réussie
+    succeeded = {}
+    # Client sans connexion réussie dans le lot : échecs à ajouter au compteur
+    failed = {}
+    for event in events:
+        if event.success:
+            logs.append({"login_time": event.time, "ip_address": event.ip_address,
+                         "user_agent": event.user_agent, "id_customer": event.id_customer})
+            succeeded[event.id_customer] = {"b_id": event.id_customer, "b_last_login": event.time, "b_failed": 0}
+            failed.pop(event.id_customer, None)
+        elif event.id_customer in succeeded:
+            succeeded[event.id_customer]["b_failed"] += 1
+        else:
+            failed[event.id_customer] = failed.get(event.id_customer, 0) + 1
+
+    if logs:
+        # INSERT ... VALUES (...), (...) : une seule requête, là où executemany en envoie une par ligne
+        db.execute(models.LoginLog.__table__.insert().values(logs))
+    if succeeded:
+        db.execute(
+            customers.update()
+            .where(customers.c.id_customer == bindparam("b_id"))
+            .values(last_login=bindparam("b_last_login"), failed_login_attempts=bindparam("b_failed")),
+            list(succeeded.values()),
+        )
+    if failed:
+        db.execute(
+            customers.update()
+            .where(customers.c.id_customer == bindparam("b_id"))
+            .values(failed_login_attempts=func.coalesce(customers.c.failed_login_attempts, 0) + bindparam("b_failed")),
+            [{"b_id": id_customer, "b_failed": count} for id_customer, count in failed.items()],
+        )
+    db.commit()
+
+
+def _write_with_sync_session(events: List[LoginEvent]):
+    db = SessionLocal()
+    try:
+        write_login_events(db, events)
+    finally:
+        db.close()
+
+
+async def write_to_database(events: List[LoginEvent]):
+    """
+    Écrit un lot avec une session dédiée (la session de la requête est déjà fermée).
+    """
+    if USE_ASYNC_DB:
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(write_login_events, events)
+    else:
+        await run_in_threadpool(_write_with_sync_session, events)
+
+
+class LoginEventBuffer:
+    """
+    Tampon write-behind des événements de login : la requête /login n'attend plus
+    l'écriture, une tâche de fond vide le tampon toutes les `flush_interval` secondes
+    ou dès `batch_size` événements. Au-delà de `max_pending` en attente, les nouveaux
+    événements sont abandonnés (mémoire bornée si la base ne suit plus).
+    """
+
+    def __init__(self, flush_interval: float, batch_size: int = LOGIN_EVENTS_BATCH_SIZE,
+                 max_pending: int = LOGIN_EVENTS_MAX_PENDING,
+                 writer: Callable[[List[LoginEvent]], Awaitable[None]] = write_to_database):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.writer = writer
+        self._events: List[LoginEvent] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self.early_flushes = 0
+
+    async def record(self, event: LoginEvent):
+        if self.flush_interval <= 0:
+            await self.writer([event])
+            self.recorded += 1
+            self.written += 1
+            return
+        if len(self._events) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._events.append(event)
+        self.recorded += 1
+        if len(self._events) >= self.batch_size and self._wakeup is not None and not self._wakeup.is_set():
+            self.early_flushes += 1
+            self._wakeup.set()
+
+    async def flush(self):
+        """
+        Écrit les événements en attente par lots de `batch_size` au plus.
+        """
+        while self._events:
+            events = self._events[:self.batch_size]
+            del self._events[:self.batch_size]
+            self.flushes += 1
+            try:
+                await self.writer(events)
+                self.written += len(events)
+            except Exception as e:
+                self.failed += len(events)
+                logger.error("Failed to write %s login events: %s", len(events), e)
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def start(self):
+        if self.flush_interval > 0 and self._task is None:
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Arrête la tâche de fond après un dernier vidage (écriture en cours comprise).
+        """
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._wakeup = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._events),
+            "max_pending": self.max_pending,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": round(self.flush_interval * 1000),
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "early_flushes": self.early_flushes,
+        }
+
+
+login_events = LoginEventBuffer(LOGIN_EVENTS_FLUSH_INTERVAL_MS / 1000)
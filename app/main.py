@@ -1,10 +1,30 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+import hmac
+import logging
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
-from app import models, schemas, controllers
-from .database import get_db
-from typing import List
-from .middleware import verify_password, create_access_token, get_current_customer, is_admin, is_customer_or_admin
-from .messaging.service import fetch_customer_orders, fetch_order_products
+from app import models, schemas, controllers, async_controllers
+from .database import get_db, run_db, USE_ASYNC_DB, engine, async_engine, pool_status
+from .database import SessionLocal, AsyncSessionLocal, STREAM_BATCH_SIZE, MAX_NOTIFICATION_BATCH
+from typing import List, Optional, Union
+from .middleware import verify_password_async, password_pool, token_cache, create_access_token, get_current_customer, is_admin, is_customer_or_admin, oauth2_scheme
+from .bulk_import import import_customers, iter_upload
+from .pagination import MAX_PAGE_SIZE
+from .messaging.consumer import ServiceError
+from .messaging.service import fetch_customer_orders, fetch_order_products, fetch_orders_products, MAX_BATCH_ORDERS
+from .messaging.connection import broker
+from .messaging.rpc import rpc_client
+from .messaging.cache import response_cache
+from .messaging.invalidation import start_cache_invalidation_listener
+from .sql_stats import SQLStatementCountMiddleware, SQL_STATEMENT_COUNTING, SQL_LAZYLOAD_GUARD
+from .sql_stats import enable_statement_counting, enable_lazyload_guard
+from .login_events import LoginEvent, login_events
+from .metrics import MetricsMiddleware, METRICS_ENABLED, METRICS_TOKEN, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .metrics import enable_db_timing, render as render_metrics
+from .logging_config import configure_logging
+from .tracing import TracingMiddleware, TRACING_ENABLED, configure_tracing, enable_sql_tracing
+
+logger = logging.getLogger(__name__)
 
 
 # Initialisation de l'application FastAPI
@@ -15,29 +35,215 @@ app = FastAPI(
     version="0.0.2",
 )
 
+# Détection des N+1 (opt-in) : requêtes SQL comptées par requête HTTP, chargements paresseux interdits
+app.add_middleware(SQLStatementCountMiddleware)
+if SQL_STATEMENT_COUNTING:
+    enable_statement_counting()
+if SQL_LAZYLOAD_GUARD:
+    enable_lazyload_guard()
+# Métriques Prometheus par route (GET /metrics), temps SQL compris
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    enable_db_timing()
+# Spans HTTP, SQL et AMQP (opt-in) ; ajouté en dernier, le middleware englobe tous les autres
+if TRACING_ENABLED:
+    configure_tracing()
+    app.add_middleware(TracingMiddleware)
+    enable_sql_tracing()
+
+@app.on_event("startup")
+async def start_logging():
+    """
+    Journalisation JSON asynchrone (file + thread d'écriture), niveaux par module depuis LOG_LEVELS.
+    Au démarrage et non à l'import : importer app.main (tests, benchmarks) laisse le logger racine intact.
+    """
+    configure_logging()
+
+
+@app.on_event("startup")
+async def open_broker_connection():
+    """
+    Ouvre la connexion RabbitMQ partagée par toutes les requêtes, la file de réponse RPC
+    et l'abonnement aux invalidations du cache.
+    """
+    await broker.start()
+    await rpc_client.start()
+    await start_cache_invalidation_listener()
+
+
+@app.on_event("startup")
+async def start_login_events():
+    await login_events.start()
+
+
+@app.on_event("shutdown")
+async def close_broker_connection():
+    await broker.close()
+
+
+@app.on_event("shutdown")
+async def stop_login_events():
+    # Les derniers logins en tampon sont écrits avant l'arrêt
+    await login_events.stop()
+
+
+# Contrôleurs utilisés selon DB_MODE (voir app/database.py)
+crud = async_controllers if USE_ASYNC_DB else controllers
+
+
+def ndjson_response(stream_controller, schema, batch_size: int = None):
+    """
+    Réponse NDJSON (une ligne JSON par ligne de table) lue par lots de `batch_size` (STREAM_BATCH_SIZE par défaut).
+    Le générateur ouvre sa propre session : celle de get_db est fermée avant la fin du streaming.
+    """
+    batch_size = batch_size or STREAM_BATCH_SIZE
+
+    def encode(rows):
+        return "".join(
+            schema.parse_obj({field: getattr(row, field) for field in schema.__fields__}).json() + "\n"
+            for row in rows
+        )
+
+    if USE_ASYNC_DB:
+        async def lines():
+            async with AsyncSessionLocal() as db:
+                batch = []
+                async for row in stream_controller(db, batch_size):
+                    batch.append(row)
+                    if len(batch) >= batch_size:
+                        yield encode(batch)
+                        batch = []
+                if batch:
+                    yield encode(batch)
+    else:
+        # Générateur synchrone : Starlette l'itère dans le threadpool
+        def lines():
+            db = SessionLocal()
+            try:
+                batch = []
+                for row in stream_controller(db, batch_size):
+                    batch.append(row)
+                    if len(batch) >= batch_size:
+                        yield encode(batch)
+                        batch = []
+                if batch:
+                    yield encode(batch)
+            finally:
+                db.close()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 # ---------------------- Login Endpoints ---------------------- #
 @app.post("/login")
-async def login(login_data: schemas.LoginRequest, db: Session = Depends(get_db)):
-    customer = db.query(models.Customer).filter(models.Customer.email == login_data.email).first()
-
-    if not customer or not verify_password(login_data.password, customer.password_hash):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+async def login(login_data: schemas.LoginRequest, request: Request, db: Session = Depends(get_db)):
+    customer = await run_db(crud.get_login_credentials, db, login_data.email)
+    unauthorized = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid email or password",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    if not customer:
+        raise unauthorized
+    if not await verify_password_async(login_data.password, customer.password_hash):
+        await login_events.record(LoginEvent(customer.id_customer, success=False))
+        raise unauthorized
 
     access_token = create_access_token(data={
         "id_customer": customer.id_customer,
         "email": customer.email,
         "customer_type": customer.customer_type 
     })
-
-    print(f"Login successful. Generated token payload: customer_type={customer.customer_type}")
+    # Login_Logs, last_login et failed_login_attempts sont écrits en différé (app/login_events.py)
+    await login_events.record(LoginEvent(
+        customer.id_customer, success=True,
+        ip_address=request.client.host if request.client else None,
+        user_agent=request.headers.get("user-agent"),
+    ))
+
+    logger.debug("Login successful for customer %s (customer_type=%s)", customer.id_customer, customer.customer_type)
     
     return {"access_token": access_token, "token_type": "bearer"}
 
 
+# ---------------------- Internal Endpoints ---------------------- #
+
+@app.get("/internal/pool", tags=["Internal"])
+async def read_pool_stats(current_customer: dict = Depends(get_current_customer)):
+    """
+    Statistiques du pool de connexions (saturation, overflow, attentes).
+    """
+    is_admin(current_customer)
+    stats = {"mode": "async" if USE_ASYNC_DB else "sync", "sync": pool_status(engine)}
+    if async_engine is not None:
+        stats["async"] = pool_status(async_engine.sync_engine)
+    return stats
+
+
+@app.get("/internal/password-hashing", tags=["Internal"])
+async def read_password_hashing_stats(current_customer: dict = Depends(get_current_customer)):
+    """
+    Occupation du pool bcrypt (calculs en cours, en attente, refusés en 503).
+    """
+    is_admin(current_customer)
+    return password_pool.stats()
+
+
+@app.get("/internal/token-cache", tags=["Internal"])
+async def read_token_cache_stats(current_customer: dict = Depends(get_current_customer)):
+    """
+    Efficacité du cache des jetons vérifiés (hits, misses, taille).
+    """
+    is_admin(current_customer)
+    return token_cache.stats()
+
+
+@app.get("/internal/broker", tags=["Internal"])
+async def read_broker_stats(current_customer: dict = Depends(get_current_customer)):
+    """
+    État de la connexion RabbitMQ partagée, de son pool de canaux et du client RPC.
+    """
+    is_admin(current_customer)
+    return {**broker.stats(), "rpc": rpc_client.stats()}
+
+
+@app.get("/internal/response-cache", tags=["Internal"])
+async def read_response_cache_stats(current_customer: dict = Depends(get_current_customer)):
+    """
+    Efficacité du cache des réponses Order / Product (hits, misses, taille).
+    """
+    is_admin(current_customer)
+    return response_cache.stats()
+
+
+def authorize_metrics_scrape(token: str = Depends(oauth2_scheme)):
+    """
+    Accès à /metrics : jeton du scraper (METRICS_TOKEN) ou JWT d'un admin, comme /internal.
+    """
+    if METRICS_TOKEN and hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        return
+    is_admin(get_current_customer(token))
+
+
+if METRICS_ENABLED:
+    @app.get("/metrics", tags=["Internal"], include_in_schema=False, dependencies=[Depends(authorize_metrics_scrape)])
+    async def read_metrics():
+        """
+        Métriques au format texte Prometheus : requêtes et latence par route, temps SQL, RPC, bcrypt.
+        """
+        return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/internal/login-events", tags=["Internal"])
+async def read_login_events_stats(current_customer: dict = Depends(get_current_customer)):
+    """
+    Tampon des écritures du login : en attente, écrits, abandonnés (tampon plein) ou en échec.
+    """
+    is_admin(current_customer)
+    return login_events.stats()
+
+
 # @app.get("/test_db_connection/")
 # def test_db_connection(db: Session = Depends(get_db)):
 #     try:
@@ -50,15 +256,22 @@ async def login(login_data: schemas.LoginRequest, db: Session = Depends(get_db))
 
 # ---------------------- Customers Endpoints ---------------------- #
 
-@app.get("/customers/", response_model=List[schemas.Customer], tags=["Customers"])
-async def read_customers(db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+@app.get("/customers/", response_model=Union[List[schemas.Customer], schemas.CustomerPage], tags=["Customers"])
+async def read_customers(skip: int = 0, limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, stream: bool = False, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
     """
-    Récupère la liste des clients.
+    Récupère la liste des clients : complète, paginée (skip/limit ou cursor) ou en NDJSON (stream=true).
     """
     is_admin(current_customer)
     try:
-        customers = controllers.get_customers(db)
+        if stream:
+            return ndjson_response(crud.stream_customers, schemas.Customer)
+        if cursor is not None:
+            return await run_db(crud.get_customers_page, db, cursor=cursor, limit=limit or MAX_PAGE_SIZE)
+
+        customers = await run_db(crud.get_customers, db, skip=skip, limit=limit)
         return customers
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="An error occurred while fetching customers")
 
@@ -70,7 +283,7 @@ async def read_customer(customer_id: int, db: Session = Depends(get_db), current
     """
     is_customer_or_admin(current_customer, customer_id)
     try:
-        customer = controllers.get_customer_by_id(db, customer_id)
+        customer = await run_db(crud.get_customer_by_id, db, customer_id)
         if customer is None:
             raise HTTPException(status_code=404, detail="Customer not found")
         return customer
@@ -86,12 +299,29 @@ async def create_customer(customer: schemas.CustomerCreate, db: Session = Depend
     Crée un nouveau client.
     """
     try:
-        new_customer = controllers.create_customer(db, customer)
+        new_customer = await run_db(crud.create_customer, db, customer)
         return new_customer
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="An error occurred while creating the customer")
 
 
+@app.post("/customers/bulk", response_model=schemas.BulkImportResult, tags=["Customers"])
+async def bulk_create_customers(request: Request, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+    """
+    Importe des clients en masse : tableau JSON ou NDJSON (`Content-Type: application/x-ndjson`).
+    Les lignes refusées sont listées avec leur index, les autres sont insérées.
+    """
+    is_admin(current_customer)
+    try:
+        return await import_customers(db, crud, iter_upload(request))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="An error occurred while importing customers")
+
+
 @app.patch("/customers/{customer_id}", response_model=schemas.Customer, tags=["Customers"])
 async def update_customer(customer_id: int, customer_update: schemas.CustomerUpdate, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
     """
@@ -99,7 +329,7 @@ async def update_customer(customer_id: int, customer_update: schemas.CustomerUpd
     """
     is_customer_or_admin(current_customer, customer_id)
     try:
-        updated_customer = controllers.update_customer(db, customer_id, customer_update)
+        updated_customer = await run_db(crud.update_customer, db, customer_id, customer_update)
         if updated_customer is None:
             raise HTTPException(status_code=404, detail="Customer not found")
         return updated_customer
@@ -116,7 +346,7 @@ async def delete_customer(customer_id: int, db: Session = Depends(get_db), curre
     """
     is_customer_or_admin(current_customer, customer_id)
     try:
-        deleted_customer = controllers.delete_customer(db, customer_id)
+        deleted_customer = await run_db(crud.delete_customer, db, customer_id)
         if deleted_customer is None:
             raise HTTPException(status_code=404, detail="Customer not found")
         return {"message": f"Customer with id {customer_id} was successfully deleted"}
@@ -126,18 +356,118 @@ async def delete_customer(customer_id: int, db: Session = Depends(get_db), curre
         raise HTTPException(status_code=500, detail="An error occurred while deleting the customer")
 
 
+# ---------------------- Customer Resources Endpoints ---------------------- #
+# Ressources d'un client : filtre indexé sur id_customer et pagination par curseur,
+# plutôt que de parcourir les listes globales côté client.
+
+@app.get("/customers/{customer_id}/profile", response_model=schemas.CustomerProfile, tags=["Customers"])
+async def read_customer_profile(customer_id: int, recent: int = Query(5, ge=1, le=MAX_PAGE_SIZE), db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+    """
+    Récupère le profil complet d'un client (adresses, entreprises, dernières notifications et feedbacks) en un appel.
+    """
+    is_customer_or_admin(current_customer, customer_id)
+    try:
+        profile = await run_db(crud.get_customer_profile, db, customer_id, recent=recent)
+        if profile is None:
+            raise HTTPException(status_code=404, detail="Customer not found")
+        return profile
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="An error occurred while retrieving the customer's profile")
+
+
+@app.get("/customers/{customer_id}/notifications", response_model=schemas.CustomerNotificationPage, tags=["Notifications"])
+async def read_customer_notifications(customer_id: int, cursor: Optional[str] = None, limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE), unread_only: bool = False, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+    """
+    Récupère les notifications d'un client (les plus récentes d'abord) et le nombre de non lues.
+    """
+    is_customer_or_admin(current_customer, customer_id)
+    try:
+        page = await run_db(crud.get_customer_notifications_page, db, customer_id, cursor=cursor, limit=limit, unread_only=unread_only)
+        page["unread_count"] = await run_db(crud.count_unread_notifications, db, customer_id)
+        return page
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="An error occurred while retrieving the customer's notifications")
+
+
+@app.get("/customers/{customer_id}/notifications/unread-count", response_model=schemas.UnreadCount, tags=["Notifications"])
+async def read_customer_unread_count(customer_id: int, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+    """
+    Nombre de notifications non lues d'un client (badge), compté en SQL.
+    """
+    is_customer_or_admin(current_customer, customer_id)
+    try:
+        return {"unread_count": await run_db(crud.count_unread_notifications, db, customer_id)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="An error occurred while counting the customer's notifications")
+
+
+@app.get("/customers/{customer_id}/addresses", response_model=schemas.AddressPage, tags=["Addresses"])
+async def read_customer_addresses(customer_id: int, cursor: Optional[str] = None, limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE), db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+    """
+    Récupère les adresses d'un client.
+    """
+    is_customer_or_admin(current_customer, customer_id)
+    try:
+        return await run_db(crud.get_customer_addresses_page, db, customer_id, cursor=cursor, limit=limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="An error occurred while retrieving the customer's addresses")
+
+
+@app.get("/customers/{customer_id}/feedbacks", response_model=schemas.FeedbackPage, tags=["Feedbacks"])
+async def read_customer_feedbacks(customer_id: int, cursor: Optional[str] = None, limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE), db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+    """
+    Récupère les feedbacks d'un client, les plus récents d'abord.
+    """
+    is_customer_or_admin(current_customer, customer_id)
+    try:
+        return await run_db(crud.get_customer_feedbacks_page, db, customer_id, cursor=cursor, limit=limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="An error occurred while retrieving the customer's feedbacks")
+
+
+@app.get("/customers/{customer_id}/login-logs", response_model=schemas.LoginLogPage, tags=["LoginLogs"])
+async def read_customer_login_logs(customer_id: int, cursor: Optional[str] = None, limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE), db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+    """
+    Récupère l'historique de connexion d'un client, les plus récentes d'abord.
+    """
+    is_customer_or_admin(current_customer, customer_id)
+    try:
+        return await run_db(crud.get_customer_login_logs_page, db, customer_id, cursor=cursor, limit=limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="An error occurred while retrieving the customer's login logs")
+
+
 # ---------------------- Company Endpoints ---------------------- #
 
-@app.get("/companies/", response_model=List[schemas.Company], tags=["Companies"])
-async def read_companies(db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+@app.get("/companies/", response_model=Union[List[schemas.Company], schemas.CompanyPage], tags=["Companies"])
+async def read_companies(skip: int = 0, limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, stream: bool = False, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
     """
-    Récupère la liste des entreprises.
+    Récupère la liste des entreprises : complète, paginée (skip/limit ou cursor) ou en NDJSON (stream=true).
     """
     is_admin(current_customer)
     
     try:
-        companies = controllers.get_all_companies(db)
+        if stream:
+            return ndjson_response(crud.stream_companies, schemas.Company)
+        if cursor is not None:
+            return await run_db(crud.get_companies_page, db, cursor=cursor, limit=limit or MAX_PAGE_SIZE)
+
+        companies = await run_db(crud.get_all_companies, db, skip=skip, limit=limit)
         return companies
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="An error occurred while fetching the companies")
 
@@ -149,7 +479,7 @@ async def read_company(company_id: int, db: Session = Depends(get_db), current_c
     """
     try:
         if is_customer_or_admin(current_customer, current_customer["id_customer"]): 
-            company = controllers.get_company_by_id(db, company_id)
+            company = await run_db(crud.get_company_by_id, db, company_id)
             if not company:
                 raise HTTPException(status_code=404, detail="Company not found")
             return company
@@ -158,7 +488,7 @@ async def read_company(company_id: int, db: Session = Depends(get_db), current_c
         # if not customer_company:
         #     raise HTTPException(status_code=403, detail="You are not authorized to access this company")
         
-        company = controllers.get_company_by_id(db, company_id)
+        company = await run_db(crud.get_company_by_id, db, company_id)
         if not company:
             raise HTTPException(status_code=404, detail="Company not found")
         
@@ -177,7 +507,7 @@ async def create_company(company: schemas.CompanyCreate, db: Session = Depends(g
     """
     is_customer_or_admin(current_customer, current_customer["id_customer"])
     try:
-        new_company = controllers.create_company(db, company)
+        new_company = await run_db(crud.create_company, db, company)
         if not new_company:
             raise HTTPException(status_code=400, detail="Company could not be created")
         
@@ -186,7 +516,7 @@ async def create_company(company: schemas.CompanyCreate, db: Session = Depends(g
     except HTTPException:
         raise 
     except Exception as e:
-        print(f"Error creating company: {str(e)}")
+        logger.error("Error creating company: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while creating the company")
 
 
@@ -197,11 +527,11 @@ async def update_company(company_id: int, company_update: schemas.CompanyUpdate,
     """
     try:
         if is_customer_or_admin(current_customer, current_customer["id_customer"]):
-            customer_company = controllers.get_customer_company_by_ids(db, current_customer["id_customer"], company_id)
+            customer_company = await run_db(crud.get_customer_company_by_ids, db, current_customer["id_customer"], company_id)
             if not customer_company:
                 raise HTTPException(status_code=403, detail="You are not authorized to update this company")
 
-        updated_company = controllers.update_company(db, company_id, company_update)
+        updated_company = await run_db(crud.update_company, db, company_id, company_update)
         if not updated_company:
             raise HTTPException(status_code=404, detail="Company not found")
         
@@ -210,7 +540,7 @@ async def update_company(company_id: int, company_update: schemas.CompanyUpdate,
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error updating company: {str(e)}")
+        logger.error("Error updating company: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while updating the company")
 
 
@@ -221,11 +551,11 @@ async def delete_company(company_id: int, db: Session = Depends(get_db), current
     """
     try:
         if is_customer_or_admin(current_customer, current_customer["id_customer"]):
-            customer_company = controllers.get_customer_company_by_ids(db, current_customer["id_customer"], company_id)
+            customer_company = await run_db(crud.get_customer_company_by_ids, db, current_customer["id_customer"], company_id)
             if not customer_company:
                 raise HTTPException(status_code=403, detail="You are not authorized to delete this company")
         
-        deleted_company = controllers.delete_company(db, company_id)
+        deleted_company = await run_db(crud.delete_company, db, company_id)
         if not deleted_company:
             raise HTTPException(status_code=404, detail="Company not found")
         
@@ -239,14 +569,18 @@ async def delete_company(company_id: int, db: Session = Depends(get_db), current
 
 # ---------------------- Feedback Endpoints ---------------------- #
 
-@app.get("/feedbacks/", response_model=List[schemas.Feedback], tags=["Feedbacks"])
-async def read_feedbacks(skip: int = 0, limit: int = 10, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+@app.get("/feedbacks/", response_model=Union[List[schemas.Feedback], schemas.FeedbackPage], tags=["Feedbacks"])
+async def read_feedbacks(skip: int = 0, limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
     """
     Récupère la liste des feedbacks.
     """
     try:
         is_admin(current_customer)
-        feedbacks = controllers.get_feedbacks(db, skip=skip, limit=limit)
+        if cursor is not None:
+            # Pagination par curseur : ?cursor= pour la première page, puis next_cursor
+            return await run_db(crud.get_feedbacks_page, db, cursor=cursor, limit=limit)
+
+        feedbacks = await run_db(crud.get_feedbacks, db, skip=skip, limit=limit)
         
         if not feedbacks:
             raise HTTPException(status_code=404, detail="No feedbacks found")
@@ -265,7 +599,7 @@ async def read_feedback(feedback_id: int, db: Session = Depends(get_db), current
     Récupère un feedback par ID.
     """
     try:
-        feedback = controllers.get_feedback_by_id(db, feedback_id)
+        feedback = await run_db(crud.get_feedback_by_id, db, feedback_id)
         if not feedback:
             raise HTTPException(status_code=404, detail="Feedback not found")
         
@@ -290,13 +624,13 @@ async def create_feedback(feedback: schemas.FeedbackCreate, db: Session = Depend
             raise HTTPException(status_code=401, detail="You must be authenticated to create feedback.")
         
         feedback.id_customer = current_customer["id_customer"]
-        created_feedback = controllers.create_feedback(db, feedback)
+        created_feedback = await run_db(crud.create_feedback, db, feedback)
         return created_feedback
     
     except HTTPException as http_exc:
         raise http_exc  
     except Exception as e:
-        print(f"Error creating feedback: {e}")
+        logger.error("Error creating feedback: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while creating the feedback")
     
 
@@ -306,7 +640,7 @@ async def update_feedback(feedback_id: int, feedback_update: schemas.FeedbackUpd
     Met à jour un feedback existant.
     """
     try:
-        feedback = controllers.get_feedback_by_id(db, feedback_id)
+        feedback = await run_db(crud.get_feedback_by_id, db, feedback_id)
         
         if not feedback:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Feedback not found")
@@ -314,13 +648,13 @@ async def update_feedback(feedback_id: int, feedback_update: schemas.FeedbackUpd
         if feedback.id_customer != current_customer["id_customer"] and current_customer["customer_type"] != 1:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to update this feedback")
 
-        updated_feedback =  controllers.update_feedback(db, feedback_id, feedback_update)
+        updated_feedback =  await run_db(crud.update_feedback, db, feedback_id, feedback_update)
         return updated_feedback
     
     except HTTPException as http_exc:
         raise http_exc  
     except Exception as e:
-        print(f"Error updating feedback: {e}")
+        logger.error("Error updating feedback: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while updating the feedback")
 
 
@@ -330,7 +664,7 @@ async def delete_feedback(feedback_id: int, db: Session = Depends(get_db), curre
     Supprime un feedback par ID.
     """
     try:
-        feedback = controllers.get_feedback_by_id(db, feedback_id)
+        feedback = await run_db(crud.get_feedback_by_id, db, feedback_id)
 
         if not feedback:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Feedback not found")
@@ -338,26 +672,29 @@ async def delete_feedback(feedback_id: int, db: Session = Depends(get_db), curre
         if feedback.id_customer != current_customer["id_customer"] and current_customer["customer_type"] != 1:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to delete this feedback")
 
-        controllers.delete_feedback(db, feedback_id)
+        await run_db(crud.delete_feedback, db, feedback_id)
         return {"detail": f"Feedback with ID {feedback_id} has been successfully deleted"}
 
     except HTTPException as http_exc:
         raise http_exc  
     except Exception as e:
-        print(f"Error deleting feedback: {e}")
+        logger.error("Error deleting feedback: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while deleting the feedback")
 
 
 # ---------------------- Notifications Endpoints ---------------------- #
 
-@app.get("/notifications/", response_model=List[schemas.Notification], tags=["Notifications"])
-async def read_notifications(skip: int = 0, limit: int = 10, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+@app.get("/notifications/", response_model=Union[List[schemas.Notification], schemas.NotificationPage], tags=["Notifications"])
+async def read_notifications(skip: int = 0, limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
     """
     Récupère toutes les notifications.
     """
     try:
         is_admin(current_customer)
-        notifications = controllers.get_notifications(db, skip=skip, limit=limit)
+        if cursor is not None:
+            return await run_db(crud.get_notifications_page, db, cursor=cursor, limit=limit)
+
+        notifications = await run_db(crud.get_notifications, db, skip=skip, limit=limit)
 
         if not notifications:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No notifications found")
@@ -367,7 +704,7 @@ async def read_notifications(skip: int = 0, limit: int = 10, db: Session = Depen
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error retrieving notifications: {e}")
+        logger.error("Error retrieving notifications: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while retrieving notifications")
 
 
@@ -377,7 +714,7 @@ async def read_notification(notification_id: int, db: Session = Depends(get_db),
     Récupère une notification par ID.
     """
     try:
-        notification = controllers.get_notification_by_id(db, notification_id)
+        notification = await run_db(crud.get_notification_by_id, db, notification_id)
 
         if not notification:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found")
@@ -390,7 +727,7 @@ async def read_notification(notification_id: int, db: Session = Depends(get_db),
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error retrieving notification: {e}")
+        logger.error("Error retrieving notification: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while retrieving the notification")
 
 
@@ -403,34 +740,120 @@ async def create_notification(notification: schemas.NotificationCreate, db: Sess
         if not current_customer:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="You must be logged in to create a notification")
 
-        new_notification = controllers.create_notification(db, notification)
+        new_notification = await run_db(crud.create_notification, db, notification)
         return new_notification
 
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error creating notification: {e}")
+        logger.error("Error creating notification: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while creating the notification")
 
 
+def check_notification_batch(size: int):
+    if size > MAX_NOTIFICATION_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_NOTIFICATION_BATCH} notifications per request")
+
+
+@app.post("/notifications/bulk", tags=["Notifications"])
+async def create_notifications(payload: schemas.NotificationBulkCreate, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+    """
+    Crée plusieurs notifications en une seule requête SQL.
+    """
+    try:
+        is_admin(current_customer)
+        check_notification_batch(len(payload.notifications))
+        created = await run_db(crud.create_notifications, db, payload.notifications)
+        return {"created": created}
+
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.error("Error creating notifications: %s", e)
+        raise HTTPException(status_code=500, detail="An error occurred while creating the notifications")
+
+
+@app.post("/notifications/campaign", tags=["Notifications"])
+async def create_campaign_notifications(campaign: schemas.NotificationCampaign, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+    """
+    Envoie une notification à tous les clients (par défaut ceux ayant accepté le marketing).
+    """
+    try:
+        is_admin(current_customer)
+        created = await run_db(crud.create_campaign_notifications, db, campaign)
+        return {"created": created}
+
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.error("Error creating campaign notifications: %s", e)
+        raise HTTPException(status_code=500, detail="An error occurred while creating the notifications")
+
+
+@app.post("/notifications/mark-read", tags=["Notifications"])
+async def mark_notifications_read(payload: schemas.NotificationMarkRead, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+    """
+    Marque comme lues des notifications, par liste d'IDs et/ou par client.
+    Un client ne peut marquer que ses propres notifications.
+    """
+    try:
+        if payload.notification_ids is None and payload.id_customer is None:
+            raise HTTPException(status_code=400, detail="Provide notification_ids or id_customer")
+        if payload.notification_ids is not None:
+            check_notification_batch(len(payload.notification_ids))
+
+        customer_id = payload.id_customer
+        if current_customer["customer_type"] != 1:
+            if customer_id is not None and customer_id != current_customer["id_customer"]:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to update these notifications")
+            customer_id = current_customer["id_customer"]
+
+        updated = await run_db(crud.mark_notifications_read, db, payload.notification_ids, customer_id)
+        return {"updated": updated}
+
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.error("Error marking notifications as read: %s", e)
+        raise HTTPException(status_code=500, detail="An error occurred while updating the notifications")
+
+
+@app.post("/notifications/bulk-delete", tags=["Notifications"])
+async def delete_notifications(payload: schemas.NotificationIds, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+    """
+    Supprime plusieurs notifications en une seule requête SQL.
+    """
+    try:
+        is_admin(current_customer)
+        check_notification_batch(len(payload.notification_ids))
+        deleted = await run_db(crud.delete_notifications, db, payload.notification_ids)
+        return {"deleted": deleted}
+
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.error("Error deleting notifications: %s", e)
+        raise HTTPException(status_code=500, detail="An error occurred while deleting the notifications")
+
+
 @app.patch("/notifications/{notification_id}", response_model=schemas.Notification, tags=["Notifications"])
 async def update_notification(notification_id: int, notification_update: schemas.NotificationUpdate, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
     """
     Met à jour une notification par ID.
     """
     try:
-        notification = controllers.get_notification_by_id(db, notification_id)
+        notification = await run_db(crud.get_notification_by_id, db, notification_id)
         if not notification:
             raise HTTPException(status_code=404, detail="Notification not found")
         
         is_admin(current_customer)
-        updated_notification = controllers.update_notification(db, notification_id, notification_update)
+        updated_notification = await run_db(crud.update_notification, db, notification_id, notification_update)
         return updated_notification
 
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error updating notification: {e}")
+        logger.error("Error updating notification: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while updating the notification")
 
 
@@ -440,32 +863,35 @@ async def delete_notification(notification_id: int, db: Session = Depends(get_db
     Supprime une notification par ID.
     """
     try:
-        notification = controllers.get_notification_by_id(db, notification_id)
+        notification = await run_db(crud.get_notification_by_id, db, notification_id)
         if not notification:
             raise HTTPException(status_code=404, detail="Notification not found")
 
         is_admin(current_customer)
-        controllers.delete_notification(db, notification_id)
+        await run_db(crud.delete_notification, db, notification_id)
         return {"message": f"Company with id {notification_id} was successfully deleted"}
 
     except HTTPException as http_exc:
         raise http_exc
 
     except Exception as e:
-        print(f"Error deleting notification: {e}")
+        logger.error("Error deleting notification: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while deleting the notification")
 
 
 # ---------------------- Addresses Endpoints ---------------------- #
 
-@app.get("/addresses/", response_model=List[schemas.Address], tags=["Addresses"])
-async def get_addresses(skip: int = 0, limit: int = 10, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+@app.get("/addresses/", response_model=Union[List[schemas.Address], schemas.AddressPage], tags=["Addresses"])
+async def get_addresses(skip: int = 0, limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
     """
     Récupère toutes les adresses.
     """
     try:
         is_admin(current_customer)
-        addresses = controllers.get_addresses(db, skip=skip, limit=limit)
+        if cursor is not None:
+            return await run_db(crud.get_addresses_page, db, cursor=cursor, limit=limit)
+
+        addresses = await run_db(crud.get_addresses, db, skip=skip, limit=limit)
 
         if not addresses:
             raise HTTPException(status_code=404, detail="No addresses found")
@@ -474,7 +900,7 @@ async def get_addresses(skip: int = 0, limit: int = 10, db: Session = Depends(ge
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error retrieving addresses: {e}")
+        logger.error("Error retrieving addresses: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while retrieving addresses")
     
 
@@ -484,7 +910,7 @@ async def get_address(address_id: int, db: Session = Depends(get_db), current_cu
     Récupère une adresse par ID.
     """
     try:
-        address = controllers.get_address_by_id(db, address_id)
+        address = await run_db(crud.get_address_by_id, db, address_id)
         if not address:
             raise HTTPException(status_code=404, detail="Address not found")
 
@@ -499,7 +925,7 @@ async def get_address(address_id: int, db: Session = Depends(get_db), current_cu
         raise http_exc
 
     except Exception as e:
-        print(f"Error retrieving address with id {address_id}: {e}")
+        logger.error("Error retrieving address with id %s: %s", address_id, e)
         raise HTTPException(status_code=500, detail="An error occurred while retrieving the address")
 
 
@@ -516,14 +942,14 @@ async def create_address(address: schemas.AddressCreate, db: Session = Depends(g
             )
     
         address.id_customer = current_customer["id_customer"]
-        new_address = controllers.create_address(db, address)
+        new_address = await run_db(crud.create_address, db, address)
         
         return new_address
 
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error creating address: {e}")
+        logger.error("Error creating address: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while creating the address")
 
 
@@ -533,21 +959,21 @@ async def update_address(address_id: int, address_update: schemas.AddressUpdate,
     Met à jour une adresse par ID.
     """
     try:
-        address = controllers.get_address_by_id(db, address_id)
+        address = await run_db(crud.get_address_by_id, db, address_id)
         if not address:
             raise HTTPException(status_code=404, detail="Address not found")
 
         if current_customer["customer_type"] != 1 and address.id_customer != current_customer["id_customer"]:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to update this address")
 
-        updated_address = controllers.update_address(db, address_id, address_update)
+        updated_address = await run_db(crud.update_address, db, address_id, address_update)
         return updated_address
 
     except HTTPException as http_exc:
         raise http_exc
 
     except Exception as e:
-        print(f"Error updating address: {e}")
+        logger.error("Error updating address: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while updating the address")
 
 
@@ -557,34 +983,37 @@ async def delete_address(address_id: int, db: Session = Depends(get_db), current
     Supprime une adresse par ID.
     """
     try:
-        address = controllers.get_address_by_id(db, address_id)
+        address = await run_db(crud.get_address_by_id, db, address_id)
         if not address:
             raise HTTPException(status_code=404, detail="Address not found")
 
         if current_customer["customer_type"] != 1 and address.id_customer != current_customer["id_customer"]:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You are not authorized to delete this address")
 
-        controllers.delete_address(db, address_id)
+        await run_db(crud.delete_address, db, address_id)
         return {"detail": f"Address with id {address_id} was successfully deleted"}
 
     except HTTPException as http_exc:
         raise http_exc
 
     except Exception as e:
-        print(f"Error deleting address: {e}")
+        logger.error("Error deleting address: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while deleting the address")
 
 
 # ---------------------- LoginLog Endpoints ---------------------- #
 
-@app.get("/login-logs/", response_model=List[schemas.LoginLog], tags=["LoginLogs"])
-async def read_login_logs(skip: int = 0, limit: int = 10, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+@app.get("/login-logs/", response_model=Union[List[schemas.LoginLog], schemas.LoginLogPage], tags=["LoginLogs"])
+async def read_login_logs(skip: int = 0, limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
     """
     Récupère les login logs.
     """
     try:
         is_admin(current_customer)
-        login_logs = controllers.get_login_logs(db, skip=skip, limit=limit)
+        if cursor is not None:
+            return await run_db(crud.get_login_logs_page, db, cursor=cursor, limit=limit)
+
+        login_logs = await run_db(crud.get_login_logs, db, skip=skip, limit=limit)
 
         if not login_logs:
             raise HTTPException(status_code=404, detail="No login logs found")
@@ -594,7 +1023,7 @@ async def read_login_logs(skip: int = 0, limit: int = 10, db: Session = Depends(
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error retrieving login logs: {e}")
+        logger.error("Error retrieving login logs: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while retrieving login logs")
 
 
@@ -604,7 +1033,7 @@ async def read_login_log(log_id: int, db: Session = Depends(get_db), current_cus
     Récupère les login log par ID.
     """
     try:
-        log = controllers.get_login_log_by_id(db, log_id)
+        log = await run_db(crud.get_login_log_by_id, db, log_id)
         
         if not log:
             raise HTTPException(status_code=404, detail="Login log not found")
@@ -615,7 +1044,7 @@ async def read_login_log(log_id: int, db: Session = Depends(get_db), current_cus
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error retrieving login log: {e}")
+        logger.error("Error retrieving login log: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while retrieving the login log")
 
 
@@ -626,13 +1055,13 @@ async def create_login_log(login_log: schemas.LoginLogCreate, db: Session = Depe
     """
     try:
         is_admin(current_customer)
-        new_log = controllers.create_login_log(db, login_log)
+        new_log = await run_db(crud.create_login_log, db, login_log)
         return new_log
 
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error creating login log: {e}")
+        logger.error("Error creating login log: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while creating the login log")
 
 
@@ -642,19 +1071,19 @@ async def update_login_log(log_id: int, login_log: schemas.LoginLogUpdate, db: S
     Met à jour un login log par ID.
     """
     try:
-        log = controllers.get_login_log_by_id(db, log_id)
+        log = await run_db(crud.get_login_log_by_id, db, log_id)
         if not log:
             raise HTTPException(status_code=404, detail="Login log not found")
         
         is_admin(current_customer)
-        updated_log = controllers.update_login_log(db, log_id, login_log)
+        updated_log = await run_db(crud.update_login_log, db, log_id, login_log)
         return updated_log
 
     except HTTPException as http_exc:
         raise http_exc
     
     except Exception as e:
-        print(f"Error updating login log: {e}")
+        logger.error("Error updating login log: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while updating the login log")
     
 
@@ -664,31 +1093,34 @@ async def delete_login_log(log_id: int, db: Session = Depends(get_db), current_c
     Supprime un login log par ID.
     """
     try:
-        log = controllers.get_login_log_by_id(db, log_id)
+        log = await run_db(crud.get_login_log_by_id, db, log_id)
         if not log:
             raise HTTPException(status_code=404, detail="Login log not found")
 
         is_admin(current_customer)
-        controllers.delete_login_log(db, log_id)
+        await run_db(crud.delete_login_log, db, log_id)
         return {"message": f"Login log with id {log_id} was successfully deleted"}
 
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error deleting login log: {e}")
+        logger.error("Error deleting login log: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while deleting the login log")
 
 
 # ---------------------- CustomerCompany Endpoints ---------------------- #
 
-@app.get("/customer-companies/", response_model=List[schemas.CustomerCompany], tags=["CustomerCompanies"])
-async def read_customer_companies(skip: int = 0, limit: int = 10, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
+@app.get("/customer-companies/", response_model=Union[List[schemas.CustomerCompany], schemas.CustomerCompanyPage], tags=["CustomerCompanies"])
+async def read_customer_companies(skip: int = 0, limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, db: Session = Depends(get_db), current_customer: dict = Depends(get_current_customer)):
     """
     Récupère toutes les relations entre clients et entreprises.
     """
     try:
         is_admin(current_customer)
-        customer_companies = controllers.get_customer_companies(db, skip=skip, limit=limit)
+        if cursor is not None:
+            return await run_db(crud.get_customer_companies_page, db, cursor=cursor, limit=limit)
+
+        customer_companies = await run_db(crud.get_customer_companies, db, skip=skip, limit=limit)
 
         if not customer_companies:
             raise HTTPException(status_code=404, detail="No customer-company relationships found")
@@ -698,7 +1130,7 @@ async def read_customer_companies(skip: int = 0, limit: int = 10, db: Session =
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error retrieving customer-companies: {e}")
+        logger.error("Error retrieving customer-companies: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while retrieving customer-company relationships")
 
 
@@ -709,7 +1141,7 @@ async def read_customer_company(customer_id: int, company_id: int, db: Session =
     """
     try:
         is_admin(current_customer)
-        customer_company = controllers.get_customer_company_by_ids(db, customer_id, company_id)
+        customer_company = await run_db(crud.get_customer_company_by_ids, db, customer_id, company_id)
 
         if not customer_company:
             raise HTTPException(status_code=404, detail="CustomerCompany relationship not found")
@@ -718,7 +1150,7 @@ async def read_customer_company(customer_id: int, company_id: int, db: Session =
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        print(f"Error retrieving customer-company relationship: {e}")
+        logger.error("Error retrieving customer-company relationship: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while retrieving the customer-company relationship")
 
 
@@ -729,14 +1161,14 @@ async def create_customer_company(customer_company: schemas.CustomerCompanyCreat
     """
     try:
         is_admin(current_customer)
-        new_customer_company = controllers.create_customer_company(db, customer_company)
+        new_customer_company = await run_db(crud.create_customer_company, db, customer_company)
         return new_customer_company
 
     except HTTPException as http_exc:
         raise http_exc
 
     except Exception as e:
-        print(f"Error creating customer-company relationship: {e}")
+        logger.error("Error creating customer-company relationship: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while creating the customer-company relationship")
 
 
@@ -747,18 +1179,18 @@ async def delete_customer_company(customer_id: int, company_id: int, db: Session
     """
     try:
         is_customer_or_admin(current_customer, customer_id)
-        customer_company = controllers.get_customer_company_by_ids(db, customer_id, company_id)
+        customer_company = await run_db(crud.get_customer_company_by_ids, db, customer_id, company_id)
         if not customer_company:
             raise HTTPException(status_code=404, detail="CustomerCompany not found")
 
-        controllers.delete_customer_company(db, customer_id, company_id)
+        await run_db(crud.delete_customer_company, db, customer_id, company_id)
         return {"detail": f"Company with id {company_id} belonging to {customer_id} was successfully deleted"}
 
     except HTTPException as http_exc:
         raise http_exc
 
     except Exception as e:
-        print(f"Error deleting customer-company relationship: {e}")
+        logger.error("Error deleting customer-company relationship: %s", e)
         raise HTTPException(status_code=500, detail="An error occurred while deleting the customer-company relationship")
     
 
@@ -768,27 +1200,62 @@ async def get_customer_orders(customer_id: int):
     """API endpoint to get a customer's orders."""
     try:
         orders = await fetch_customer_orders(customer_id)
-        print(orders)
+        logger.debug("Orders for customer %s: %s", customer_id, orders)
         if orders:
             return {"customer_id": customer_id, "orders": orders}
         else:
             raise HTTPException(status_code=404, detail="No orders found for this customer")
     except TimeoutError:
         raise HTTPException(status_code=504, detail="Request to order service timed out")
+    except ServiceError as e:
+        raise HTTPException(status_code=502, detail=f"Order service error: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch customer orders: {str(e)}")
     
 
+def parse_order_ids(order_ids: List[str]) -> List[int]:
+    """
+    Accepte `order_ids=1,2,3` comme `order_ids=1&order_ids=2` ; dédoublonne en gardant l'ordre.
+    """
+    try:
+        ids = [int(value) for raw in order_ids for value in raw.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="order_ids must be a comma-separated list of integers")
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="order_ids must not be empty")
+    if len(ids) > MAX_BATCH_ORDERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ORDERS} orders per request")
+    return ids
+
+
+@app.get("/customers/{customer_id}/orders/products", tags=["CustomerOrdersProducts"])
+async def get_customer_orders_products(customer_id: int, order_ids: List[str] = Query(...)):
+    """Fetch products for several orders of a customer in one call."""
+    ids = parse_order_ids(order_ids)
+    try:
+        result = await fetch_orders_products(customer_id, ids)
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Request timed out.")
+    except ServiceError as e:
+        raise HTTPException(status_code=502, detail=f"Service error: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch products for orders: {str(e)}")
+    return {"customer_id": customer_id, **result}
+
+
 @app.get("/customers/{customer_id}/orders/{order_id}/products", tags=["CustomerOrdersProducts"])
 async def get_customer_order_products(customer_id: int, order_id: int):
     """Fetch products for a specific order of a customer."""
     try:
         products = await fetch_order_products(customer_id, order_id)
-        print(f"Response products: {products}")
+        logger.debug("Products for customer %s, order %s: %s", customer_id, order_id, products)
         if not products:
             raise HTTPException(status_code=404, detail="No products found for this order.")
         return {"customer_id": customer_id, "order_id": order_id, "products": products}
     except TimeoutError:
         raise HTTPException(status_code=504, detail="Request timed out.")
+    except ServiceError as e:
+        raise HTTPException(status_code=502, detail=f"Service error: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch products for order: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Cache des réponses des services Order / Product : "memory", "redis" ou "none"
+RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'memory').lower()
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '10000'))
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+# Les commandes changent souvent, les fiches produit rarement
+ORDERS_CACHE_TTL = float(os.getenv('ORDERS_CACHE_TTL', '30'))
+PRODUCTS_CACHE_TTL = float(os.getenv('PRODUCTS_CACHE_TTL', '300'))
+
+
+class MemoryCache:
+    """
+    Cache LRU en mémoire du processus, avec une durée de vie par entrée.
+    """
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    async def get_many(self, keys: list) -> dict:
+        """
+        Renvoie {clé: valeur} pour les clés présentes et non expirées.
+        """
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[0]
+                elif entry is not None:
+                    del self._entries[key]
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    async def set_many(self, values: dict, ttl: float):
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            for key, value in values.items():
+                self._entries[key] = (value, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    async def delete_many(self, keys: list):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    async def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": "memory", "size": len(self._entries), "maxsize": self.maxsize,
+                    "hits": self.hits, "misses": self.misses}
+
+
+class RedisCache:
+    """
+    Cache partagé entre répliques dans Redis (ou un serveur compatible).
+    Dépendance optionnelle : `redis`, dans requirements-optional.txt.
+    """
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = "api_client:", client=None):
+        if client is None:
+            import redis.asyncio as redis
+
+            client = redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    async def get_many(self, keys: list) -> dict:
+        if not keys:
+            return {}
+        raw_values = await self.client.mget([self.prefix + key for key in keys])
+        found = {key: json.loads(raw) for key, raw in zip(keys, raw_values) if raw is not None}
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    async def set_many(self, values: dict, ttl: float):
+        if not values:
+            return
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000))
+            await pipe.execute()
+
+    async def delete_many(self, keys: list):
+        if keys:
+            await self.client.delete(*[self.prefix + key for key in keys])
+
+    async def clear(self):
+        keys = [key async for key in self.client.scan_iter(match=self.prefix + "*")]
+        if keys:
+            await self.client.delete(*keys)
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "hits": self.hits, "misses": self.misses}
+
+
+class NullCache:
+    """
+    Cache désactivé (RESPONSE_CACHE_BACKEND=none).
+    """
+
+    async def get_many(self, keys: list) -> dict:
+        return {}
+
+    async def set_many(self, values: dict, ttl: float):
+        pass
+
+    async def delete_many(self, keys: list):
+        pass
+
+    async def clear(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": "none"}
+
+
+def build_cache(backend: str = RESPONSE_CACHE_BACKEND):
+    if backend == 'redis':
+        return RedisCache()
+    if backend == 'none':
+        return NullCache()
+    if backend != 'memory':
+        logger.warning("Unknown RESPONSE_CACHE_BACKEND '%s', using in-memory cache", backend)
+    return MemoryCache()
+
+
+def orders_key(customer_id) -> str:
+    return f"orders:{customer_id}"
+
+
+def product_key(product_id) -> str:
+    return f"product:{product_id}"
+
+
+def product_id_of(product: dict):
+    """Identifiant d'une fiche renvoyée par le service Product, quel que soit son nom de champ."""
+    if isinstance(product, dict):
+        for field in ('id_product', 'id', 'productId', 'product_id'):
+            if product.get(field) is not None:
+                return product[field]
+    return None
+
+
+response_cache = build_cache()
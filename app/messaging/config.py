@@ -5,6 +5,8 @@ import time
 import aio_pika
 import asyncio
 from dotenv import load_dotenv
+from opentelemetry.trace import SpanKind
+from ..tracing import start_span
 
 load_dotenv()
 
@@ -17,17 +19,18 @@ BROKER_VIRTUAL_HOST = os.getenv('BROKER_VIRTUAL_HOST')
 RETRY_DELAY = 5 
 MAX_RETRIES = 5
 
-logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 async def establish_rabbitmq_connection():
     try:
-        connection = await aio_pika.connect_robust(
-            f"amqp://{BROKER_USER}:{BROKER_PASSWORD}@{BROKER_HOST}/"
-        )
-        logging.info("Connected to RabbitMQ")
+        with start_span("amqp connect", SpanKind.CLIENT, attributes={"server.address": str(BROKER_HOST)}):
+            connection = await aio_pika.connect_robust(
+                f"amqp://{BROKER_USER}:{BROKER_PASSWORD}@{BROKER_HOST}/"
+            )
+        logger.info("Connected to RabbitMQ")
         return connection
     except Exception as e:
-        logging.error(f"Failed to establish RabbitMQ connection: {str(e)}")
+        logger.error("Failed to establish RabbitMQ connection: %s", e)
         raise
 
 def get_rabbitmq_connection(retries=5, delay=5):
@@ -38,12 +41,12 @@ def get_rabbitmq_connection(retries=5, delay=5):
             connection = pika.BlockingConnection(
                 pika.ConnectionParameters(host=BROKER_HOST, port=BROKER_PORT, virtual_host=BROKER_VIRTUAL_HOST, credentials=credentials)
             )
-            logging.info("Connected to RabbitMQ")
+            logger.info("Connected to RabbitMQ")
             return connection
         except pika.exceptions.AMQPConnectionError as e:
-            logging.error(f"Failed to connect to RabbitMQ: {e}. Retrying in {delay} seconds... (Attempt {attempt + 1}/{retries})")
+            logger.error("Failed to connect to RabbitMQ: %s. Retrying in %s seconds... (Attempt %s/%s)", e, delay, attempt + 1, retries)
             time.sleep(delay)
         except Exception as e:
-            logging.error(f"Unexpected error: {e}")
-    logging.error("Max retries reached. RabbitMQ connection failed.")
+            logger.error("Unexpected error: %s", e)
+    logger.error("Max retries reached. RabbitMQ connection failed.")
     return None
\ No newline at end of file
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+
+from .config import establish_rabbitmq_connection
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Canaux AMQP ouverts au plus en même temps sur la connexion partagée
+BROKER_CHANNEL_POOL_SIZE = int(os.getenv('BROKER_CHANNEL_POOL_SIZE', '10'))
+BROKER_CONNECT_TIMEOUT = float(os.getenv('BROKER_CONNECT_TIMEOUT', '5'))
+# Intervalle (s) de vérification de la connexion en arrière-plan, 0 pour désactiver
+BROKER_HEALTHCHECK_INTERVAL = float(os.getenv('BROKER_HEALTHCHECK_INTERVAL', '10'))
+# "rabbitmq", ou "memory" : broker en mémoire et services Order / Product simulés (app/messaging/fake_broker.py)
+BROKER_BACKEND = os.getenv('BROKER_BACKEND', 'rabbitmq').lower()
+
+
+class BrokerConnection:
+    """
+    Connexion RabbitMQ unique par processus, ouverte au démarrage de l'API,
+    et pool de canaux réutilisés d'une requête HTTP à l'autre.
+    Une connexion ou un canal fermé est remplacé au prochain usage ; les abonnements
+    enregistrés par on_connect sont refaits sur chaque nouvelle connexion.
+    """
+
+    def __init__(self, connect=establish_rabbitmq_connection, pool_size: int = BROKER_CHANNEL_POOL_SIZE,
+                 connect_timeout: float = BROKER_CONNECT_TIMEOUT,
+                 healthcheck_interval: float = BROKER_HEALTHCHECK_INTERVAL):
+        self._connect = connect
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.healthcheck_interval = healthcheck_interval
+        self.connection = None
+        self._idle = asyncio.Queue()
+        self._slots = asyncio.Semaphore(pool_size)
+        self._lock = asyncio.Lock()
+        self._monitor = None
+        self._on_connect = []
+        self.connects = 0
+        self.reconnects = 0
+        self.channels_opened = 0
+        self.channels_discarded = 0
+
+    @property
+    def is_connected(self) -> bool:
+        return self.connection is not None and not self.connection.is_closed
+
+    async def start(self):
+        """
+        Ouvre la connexion au démarrage ; si le broker est injoignable, l'API
+        démarre quand même et la connexion sera retentée au premier usage.
+        """
+        try:
+            await self.get_connection()
+        except Exception as e:
+            logger.warning("RabbitMQ unavailable at startup, will retry on demand: %s", e)
+        if self.healthcheck_interval > 0 and self._monitor is None:
+            self._monitor = asyncio.create_task(self._watch())
+
+    async def close(self):
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        if self.is_connected:
+            await self.connection.close()
+            logger.info("RabbitMQ connection closed.")
+        self.connection = None
+
+    def on_connect(self, callback):
+        """
+        Enregistre une coroutine `callback()` appelée après chaque nouvelle connexion :
+        les files exclusives et consommateurs de l'ancienne connexion ont disparu avec elle.
+        """
+        self._on_connect.append(callback)
+
+    async def get_connection(self):
+        """
+        Renvoie la connexion partagée, en la (re)créant si elle est fermée.
+        """
+        if self.is_connected:
+            return self.connection
+
+        connected = False
+        async with self._lock:
+            if not self.is_connected:
+                if self.connection is not None:
+                    self.reconnects += 1
+                    # Les canaux de l'ancienne connexion sont inutilisables
+                    while not self._idle.empty():
+                        self._idle.get_nowait()
+                        self.channels_discarded += 1
+                self.connection = await asyncio.wait_for(self._connect(), timeout=self.connect_timeout)
+                self.connects += 1
+                connected = True
+        # Hors du verrou : les callbacks ouvrent des canaux sur la nouvelle connexion
+        if connected:
+            for callback in self._on_connect:
+                try:
+                    await callback()
+                except Exception as e:
+                    logger.error("RabbitMQ on_connect callback %s failed: %s", getattr(callback, '__name__', callback), e)
+        return self.connection
+
+    async def _take_channel(self):
+        # Vérifie la connexion à chaque emprunt : une reconnexion vide le pool
+        connection = await self.get_connection()
+        while not self._idle.empty():
+            channel = self._idle.get_nowait()
+            if not channel.is_closed:
+                return channel
+            self.channels_discarded += 1
+
+        channel = await connection.channel()
+        self.channels_opened += 1
+        return channel
+
+    @asynccontextmanager
+    async def channel(self):
+        """
+        Prête un canal du pool ; il y retourne à la sortie s'il est encore ouvert.
+        """
+        async with self._slots:
+            channel = await self._take_channel()
+            try:
+                yield channel
+            finally:
+                if channel.is_closed:
+                    self.channels_discarded += 1
+                else:
+                    self._idle.put_nowait(channel)
+
+    async def health_check(self) -> bool:
+        """
+        Vérifie la connexion et la rouvre si besoin ; False si le broker est injoignable.
+        """
+        try:
+            await self.get_connection()
+            return True
+        except Exception as e:
+            logger.error("RabbitMQ health check failed: %s", e)
+            return False
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.healthcheck_interval)
+            await self.health_check()
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.is_connected,
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "pool_size": self.pool_size,
+            "idle_channels": self._idle.qsize(),
+            "channels_opened": self.channels_opened,
+            "channels_discarded": self.channels_discarded,
+        }
+
+
+
+def build_connect(backend: str = BROKER_BACKEND):
+    """
+    Fonction d'ouverture de connexion du backend choisi.
+    """
+    if backend == 'memory':
+        from .fake_broker import build_fake_broker
+        return build_fake_broker().connect
+    if backend != 'rabbitmq':
+        logger.warning("Unknown BROKER_BACKEND '%s', using RabbitMQ", backend)
+    return establish_rabbitmq_connection
+
+
+broker = BrokerConnection(connect=build_connect())
@@ -1,71 +1,37 @@
-import aio_pika
 import json
 import logging
-import asyncio
 
-async def handle_order_response(message, response_future, correlation_id):
-    try:
-        if message.correlation_id == correlation_id:
-            body = message.body.decode('utf-8')
-            logging.info(f"Received message: {body}")
-            
-            try:
-                response_data = json.loads(body)
-                logging.info(f"Parsed response data: {response_data}")
-
-                if isinstance(response_data, str):
-                    response_data = json.loads(response_data)
+logger = logging.getLogger(__name__)
 
-                if isinstance(response_data, dict):
-                    response_future.set_result(response_data.get('orders', []))
-                else:
-                    logging.error("Response data is not a dictionary")
-                    response_future.set_result([])
 
-            except json.JSONDecodeError as e:
-                logging.error(f"Failed to parse JSON: {e}")
-                response_future.set_result([])
+class ServiceError(Exception):
+    """Raised when a service answers with an explicit error (`{"error": ...}`) instead of data."""
 
-        await message.ack()
-    except Exception as e:
-        logging.error(f"Error in processing message: {str(e)}")
-        response_future.set_result([])
 
-
-async def handle_response(message, response_future, correlation_id, expected_key=None):
-    """Handles the incoming response from RabbitMQ."""
+def decode_response(body: bytes, expected_key=None):
+    """Decodes a service response: the list under `expected_key`, a bare list, or [] if malformed.
+    Raises ServiceError for an error response, so it is not mistaken for an empty result."""
     try:
-        if message.correlation_id != correlation_id:
-            logging.warning("Correlation ID mismatch. Ignoring message.")
-            await message.reject(requeue=False)
-            return
-        
-        body = message.body.decode('utf-8')
-        logging.info(f"Received raw message body: {body}")
-
-        try:
-            response_data = json.loads(body)
-            logging.info(f"Parsed response data: {response_data}")
-
-            if isinstance(response_data, dict):
-                if expected_key and expected_key in response_data:
-                    response_future.set_result(response_data[expected_key])
-                else:
-                    logging.error(f"Key '{expected_key}' not found in response: {response_data}")
-                    response_future.set_result([]) 
-            elif isinstance(response_data, list):
-                response_future.set_result(response_data)
-            else:
-                logging.error(f"Unexpected response format: {response_data}")
-                response_future.set_result([])
-
-        except json.JSONDecodeError as e:
-            logging.error(f"JSON decoding failed: {e}")
-            response_future.set_result([])
-
-        await message.ack() 
-
-    except Exception as e:
-        logging.error(f"Error in response callback: {e}")
-        response_future.set_result([])
-        await message.reject(requeue=False)
\ No newline at end of file
+        response_data = json.loads(body)
+        logger.debug("Parsed response data: %s", response_data)
+
+        # The Order service sometimes JSON-encodes its payload twice
+        if isinstance(response_data, str):
+            response_data = json.loads(response_data)
+
+    except json.JSONDecodeError as e:
+        logger.error("JSON decoding failed: %s", e)
+        return []
+
+    if isinstance(response_data, dict):
+        if expected_key and expected_key in response_data:
+            return response_data[expected_key]
+        if "error" in response_data:
+            raise ServiceError(str(response_data["error"]))
+        logger.error("Key '%s' not found in response: %s", expected_key, response_data)
+        return []
+    elif isinstance(response_data, list):
+        return response_data
+
+    logger.error("Unexpected response format: %s", response_data)
+    return []
@@ -0,0 +1,305 @@
+"""
+Broker AMQP en mémoire, pour travailler sur la messagerie sans RabbitMQ (CI sans réseau, benchmarks).
+
+Il imite la partie d'aio_pika utilisée par `app.messaging` (connexion, canal, file de réponse
+exclusive, exchange par défaut, exchanges topic et bindings) et simule les allers-retours
+réseau : `connect_latency` pour la poignée de main TCP + AMQP, `rtt` pour chaque commande
+(ouverture de canal, déclaration de file, consommation...).
+Les services Order / Product sont remplacés par des `responders` par routing key, avec une
+latence et des pannes injectées (requête sans réponse, réponse en erreur) tirées d'un
+générateur aléatoire à graine fixe : deux exécutions identiques échouent aux mêmes requêtes.
+
+Sélection dans l'API : BROKER_BACKEND=memory (voir app/messaging/connection.py).
+"""
+import asyncio
+import itertools
+import json
+import os
+import random
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Temps de traitement simulé des services Order / Product, et variation aléatoire ajoutée
+FAKE_BROKER_LATENCY_MS = float(os.getenv('FAKE_BROKER_LATENCY_MS', '1'))
+FAKE_BROKER_JITTER_MS = float(os.getenv('FAKE_BROKER_JITTER_MS', '0'))
+# Aller-retour simulé par commande AMQP
+FAKE_BROKER_RTT_MS = float(os.getenv('FAKE_BROKER_RTT_MS', '0.5'))
+# Part des requêtes restées sans réponse (l'appelant expire) et des réponses en erreur
+FAKE_BROKER_FAILURE_RATE = float(os.getenv('FAKE_BROKER_FAILURE_RATE', '0'))
+FAKE_BROKER_ERROR_RATE = float(os.getenv('FAKE_BROKER_ERROR_RATE', '0'))
+FAKE_BROKER_SEED = int(os.getenv('FAKE_BROKER_SEED', '0'))
+
+ERROR_RESPONSE = {"error": "injected failure"}
+
+
+def topic_matches(pattern: str, routing_key: str) -> bool:
+    """
+    Correspondance d'un binding d'exchange topic : `*` remplace un mot, `#` zéro ou plusieurs.
+    """
+    def match(words, keys):
+        if not words:
+            return not keys
+        if words[0] == '#':
+            return any(match(words[1:], keys[i:]) for i in range(len(keys) + 1))
+        if not keys:
+            return False
+        return (words[0] == '*' or words[0] == keys[0]) and match(words[1:], keys[1:])
+
+    return match(pattern.split('.'), routing_key.split('.'))
+
+
+class FakeIncomingMessage:
+    def __init__(self, body: bytes, correlation_id: str = None, reply_to: str = None,
+                 routing_key: str = None, headers: dict = None):
+        self.body = body
+        self.correlation_id = correlation_id
+        self.reply_to = reply_to
+        self.routing_key = routing_key
+        self.headers = headers or {}
+        self.acked = False
+
+    async def ack(self):
+        self.acked = True
+
+    async def reject(self, requeue: bool = False):
+        pass
+
+    @asynccontextmanager
+    async def process(self):
+        try:
+            yield self
+        except Exception:
+            await self.reject()
+            raise
+        await self.ack()
+
+
+class FakeQueue:
+    def __init__(self, broker, name: str):
+        self.broker = broker
+        self.name = name
+        self.consumer = None
+
+    async def consume(self, callback, no_ack: bool = False):
+        await self.broker.round_trip()
+        self.consumer = callback
+        return f"ctag-{self.name}"
+
+    async def cancel(self, consumer_tag):
+        await self.broker.round_trip()
+        self.consumer = None
+
+    async def bind(self, exchange, routing_key: str = None, **kwargs):
+        await self.broker.round_trip()
+        self.broker.bindings.append((exchange.name, routing_key or self.name, self))
+
+    async def delete(self, if_unused: bool = True, if_empty: bool = True):
+        await self.broker.round_trip()
+        self.broker.queues.pop(self.name, None)
+
+
+class FakeExchange:
+    def __init__(self, broker, name: str = ''):
+        self.broker = broker
+        self.name = name
+
+    async def publish(self, message, routing_key: str, **kwargs):
+        self.broker.published += 1
+        asyncio.get_running_loop().create_task(self.broker.deliver(message, routing_key, self.name))
+
+
+class FakeChannel:
+    def __init__(self, broker, connection=None):
+        self.broker = broker
+        self.connection = connection
+        self.is_closed = False
+        self.default_exchange = FakeExchange(broker)
+
+    async def declare_queue(self, name: str = '', exclusive: bool = False, auto_delete: bool = False, **kwargs):
+        await self.broker.round_trip()
+        name = name or f"amq.gen-{next(self.broker.queue_ids)}"
+        queue = self.broker.queues.setdefault(name, FakeQueue(self.broker, name))
+        if exclusive and self.connection is not None:
+            self.connection.exclusive_queues.append(queue)
+        return queue
+
+    async def get_queue(self, name: str):
+        return await self.declare_queue(name)
+
+    async def declare_exchange(self, name: str, type=None, durable: bool = False, **kwargs):
+        await self.broker.round_trip()
+        return self.broker.exchanges.setdefault(name, FakeExchange(self.broker, name))
+
+    async def get_exchange(self, name: str):
+        return self.broker.exchanges.setdefault(name, FakeExchange(self.broker, name))
+
+    async def close(self):
+        self.is_closed = True
+
+
+class FakeConnection:
+    def __init__(self, broker):
+        self.broker = broker
+        self.is_closed = False
+        self.exclusive_queues = []
+
+    async def channel(self):
+        await self.broker.round_trip()
+        self.broker.channels_opened += 1
+        return FakeChannel(self.broker, self)
+
+    async def close(self):
+        await self.broker.round_trip()
+        self.drop()
+
+    def drop(self):
+        """
+        Perte de la connexion (réseau, redémarrage du broker) : ses files exclusives disparaissent.
+        """
+        self.is_closed = True
+        for queue in self.exclusive_queues:
+            self.broker.queues.pop(queue.name, None)
+            self.broker.bindings = [binding for binding in self.broker.bindings if binding[2] is not queue]
+            queue.consumer = None
+        self.exclusive_queues = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class FakeService:
+    """
+    Service simulé derrière une routing key : `respond(body)` construit la réponse.
+    Latence et taux de pannes propres au service ; None reprend ceux du broker.
+    """
+
+    def __init__(self, respond, latency: float = None, failure_rate: float = None, error_rate: float = None):
+        self.respond = respond
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.error_rate = error_rate
+
+
+class FakeBroker:
+    def __init__(self, responders: dict, connect_latency: float = 0.005, rtt: float = 0.0005,
+                 service_latency: float = 0.001, jitter: float = 0.0, failure_rate: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.services = {
+            routing_key: service if isinstance(service, FakeService) else FakeService(service)
+            for routing_key, service in responders.items()
+        }
+        self.connect_latency = connect_latency
+        self.rtt = rtt
+        self.service_latency = service_latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self.queues = {}
+        self.exchanges = {}
+        self.bindings = []
+        self.queue_ids = itertools.count(1)
+        self.connections = 0
+        self.channels_opened = 0
+        self.published = 0
+        self.requests = 0
+        self.dropped = 0
+        self.errors = 0
+
+    async def round_trip(self):
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+
+    async def connect(self):
+        await asyncio.sleep(self.connect_latency)
+        self.connections += 1
+        return FakeConnection(self)
+
+    async def deliver(self, message, routing_key: str, exchange: str = ''):
+        incoming = FakeIncomingMessage(
+            message.body, correlation_id=message.correlation_id, reply_to=message.reply_to,
+            routing_key=routing_key, headers=getattr(message, 'headers', None),
+        )
+        if exchange:
+            # Exchange nommé (topic) : une copie par file liée
+            queues = [queue for name, pattern, queue in self.bindings
+                      if name == exchange and topic_matches(pattern, routing_key)]
+            await self.round_trip()
+            for queue in queues:
+                if queue.consumer is not None:
+                    await queue.consumer(incoming)
+            return
+
+        service = self.services.get(routing_key)
+        if service is None or not message.reply_to:
+            queue = self.queues.get(routing_key)
+            if queue is not None and queue.consumer is not None:
+                await self.round_trip()
+                await queue.consumer(incoming)
+            return
+
+        # Tirages faits avant toute attente, dans l'ordre des publications : résultat reproductible
+        self.requests += 1
+        latency = (self.service_latency if service.latency is None else service.latency)
+        latency += self.jitter * self._random.random()
+        failure_rate = self.failure_rate if service.failure_rate is None else service.failure_rate
+        error_rate = self.error_rate if service.error_rate is None else service.error_rate
+        roll = self._random.random()
+
+        await asyncio.sleep(self.rtt + latency)
+        if roll < failure_rate:
+            self.dropped += 1
+            return
+        if roll < failure_rate + error_rate:
+            self.errors += 1
+            response = ERROR_RESPONSE
+        else:
+            response = service.respond(json.loads(message.body))
+        queue = self.queues.get(message.reply_to)
+        if queue is not None and queue.consumer is not None:
+            await queue.consumer(FakeIncomingMessage(
+                json.dumps(response).encode(), correlation_id=message.correlation_id,
+                routing_key=message.reply_to, headers=incoming.headers,
+            ))
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "channels_opened": self.channels_opened,
+            "published": self.published,
+            "requests": self.requests,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+
+
+def order_service_responders(orders_per_customer: int = 3, products_per_order: int = 4) -> dict:
+    """Réponses des services Order et Product, au format attendu par app.messaging."""
+    return {
+        'customer.orders.request': lambda body: {
+            'orders': [{'id_order': body['customer_id'] * 100 + i} for i in range(orders_per_customer)]
+        },
+        'order.products.request': lambda body: {
+            'products': [body['order_id'] * 10 + i for i in range(products_per_order)]
+        },
+        'product_details_queue': lambda body: [
+            {'id_product': product_id, 'name': f"Product {product_id}"} for product_id in body['product_ids']
+        ],
+    }
+
+
+def build_fake_broker() -> FakeBroker:
+    """
+    Broker en mémoire configuré par les variables FAKE_BROKER_*.
+    """
+    return FakeBroker(
+        order_service_responders(), connect_latency=0, rtt=FAKE_BROKER_RTT_MS / 1000,
+        service_latency=FAKE_BROKER_LATENCY_MS / 1000, jitter=FAKE_BROKER_JITTER_MS / 1000,
+        failure_rate=FAKE_BROKER_FAILURE_RATE, error_rate=FAKE_BROKER_ERROR_RATE, seed=FAKE_BROKER_SEED,
+    )
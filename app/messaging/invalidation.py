@@ -0,0 +1,72 @@
+import json
+import logging
+import os
+
+import aio_pika
+from dotenv import load_dotenv
+
+from ..tracing import consume_span
+from .cache import response_cache, orders_key, product_key
+from .connection import broker
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Exchange topic sur lequel les services Order / Product annoncent leurs modifications
+CACHE_INVALIDATION_EXCHANGE = os.getenv('CACHE_INVALIDATION_EXCHANGE', 'cache_invalidation_exchange')
+CACHE_INVALIDATION_BINDINGS = ('product.#', 'order.#')
+
+
+def invalidated_keys(routing_key: str, data: dict) -> list:
+    """
+    Clés de cache touchées par un message :
+    product.* {"product_ids": [...]} ou {"product_id": ...}, order.* {"customer_id": ...}.
+    """
+    if routing_key.startswith('product.'):
+        product_ids = data.get('product_ids') or [data.get('product_id')]
+        return [product_key(product_id) for product_id in product_ids if product_id is not None]
+    if routing_key.startswith('order.') and data.get('customer_id') is not None:
+        return [orders_key(data['customer_id'])]
+    return []
+
+
+async def handle_invalidation_message(message: aio_pika.IncomingMessage):
+    async with message.process():
+        with consume_span(message, message.routing_key):
+            try:
+                data = json.loads(message.body)
+            except json.JSONDecodeError as e:
+                logger.error("Invalid cache invalidation message: %s", e)
+                return
+            keys = invalidated_keys(message.routing_key, data if isinstance(data, dict) else {})
+            if keys:
+                await response_cache.delete_many(keys)
+                logger.debug("Cache invalidated by %s: %s", message.routing_key, keys)
+
+
+async def start_cache_invalidation_listener(broker=broker):
+    """
+    Abonne le processus aux messages d'invalidation : une file exclusive par
+    réplique, pour que chaque cache mémoire reçoive sa copie.
+    La file disparaît avec la connexion : l'abonnement est refait à chaque reconnexion.
+    """
+    async def subscribe():
+        connection = await broker.get_connection()
+        channel = await connection.channel()
+        exchange = await channel.declare_exchange(CACHE_INVALIDATION_EXCHANGE, aio_pika.ExchangeType.TOPIC, durable=True)
+        queue = await channel.declare_queue('', exclusive=True, auto_delete=True)
+        for pattern in CACHE_INVALIDATION_BINDINGS:
+            await queue.bind(exchange, routing_key=pattern)
+        await queue.consume(handle_invalidation_message)
+        logger.info("Listening for cache invalidations on %s", CACHE_INVALIDATION_EXCHANGE)
+
+    broker.on_connect(subscribe)
+    if not broker.is_connected:
+        # Broker injoignable au démarrage : abonnement à la première connexion
+        logger.warning("Cache invalidation listener waiting for RabbitMQ, cached entries expire by TTL meanwhile")
+        return
+    try:
+        await subscribe()
+    except Exception as e:
+        logger.warning("Cache invalidation listener not started, cached entries will expire by TTL only: %s", e)
@@ -9,6 +9,8 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 BROKER_USER = os.getenv("BROKER_USER")
 BROKER_PASSWORD = os.getenv('BROKER_PASSWORD')
 BROKER_HOST = os.getenv('BROKER_HOST')
@@ -29,7 +31,7 @@ async def fetch_customer_orders(customer_id: int):
             async def on_response(message: aio_pika.IncomingMessage):
                 if message.correlation_id == correlation_id:
                     response_data = json.loads(message.body)
-                    print(response_data)
+                    logger.debug("Order service response: %s", response_data)
                     response_future.set_result(response_data['orders'])
                     await message.ack()
 
@@ -48,14 +50,14 @@ async def fetch_customer_orders(customer_id: int):
                 orders_data = await asyncio.wait_for(response_future, timeout=10)
                 return orders_data
             except asyncio.TimeoutError:
-                logging.error(f"Timeout while waiting for order service response for customer {customer_id}")
+                logger.error("Timeout while waiting for order service response for customer %s", customer_id)
                 raise TimeoutError("Request to order service timed out")
 
     except Exception as e:
-        logging.error(f"Error in fetching customer orders: {str(e)}")
+        logger.error("Error in fetching customer orders: %s", e)
         raise
 
     finally:
         if 'connection' in locals() and not connection.is_closed:
             await connection.close()
-            logging.info("RabbitMQ connection closed.")
\ No newline at end of file
+            logger.info("RabbitMQ connection closed.")
\ No newline at end of file
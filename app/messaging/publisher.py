@@ -4,9 +4,13 @@ import os
 import logging
 
 from dotenv import load_dotenv
+from ..tracing import publish_span
+from .connection import broker
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 BROKER_USER = os.getenv("BROKER_USER")
 BROKER_PASSWORD = os.getenv('BROKER_PASSWORD')
 BROKER_HOST = os.getenv('BROKER_HOST')
@@ -15,51 +19,56 @@ BROKER_VIRTUAL_HOST = os.getenv('BROKER_VIRTUAL_HOST')
 
 async def send_order_request(channel, customer_id, callback_queue, correlation_id):
     try:
-        message = aio_pika.Message(
-            body=json.dumps({'customer_id': customer_id}).encode(),
-            reply_to=callback_queue,
-            correlation_id=correlation_id,
-        )
-        await channel.default_exchange.publish(
-            message, routing_key='customer.orders.request'
-        )
-        logging.info(f"Sent order request for customer_id: {customer_id}, correlation_id: {correlation_id}")
+        with publish_span('customer.orders.request', correlation_id) as headers:
+            message = aio_pika.Message(
+                body=json.dumps({'customer_id': customer_id}).encode(),
+                reply_to=callback_queue,
+                correlation_id=correlation_id,
+                headers=headers,
+            )
+            await channel.default_exchange.publish(
+                message, routing_key='customer.orders.request'
+            )
+        logger.debug("Sent order request for customer_id: %s, correlation_id: %s", customer_id, correlation_id)
     except Exception as e:
-        logging.error(f"Failed to send order request: {str(e)}")
+        logger.error("Failed to send order request: %s", e)
         raise
 
 
 async def send_message_to_service(channel, routing_key, message, reply_to, correlation_id):
     try:
-        await channel.default_exchange.publish(
-            aio_pika.Message(
-                body=json.dumps(message).encode(),
-                reply_to=reply_to,
-                correlation_id=correlation_id,
-            ),
-            routing_key=routing_key
-        )
-        logging.info(f"Sent message to {routing_key} with correlation_id: {correlation_id}")
+        # Le contexte de trace voyage dans les en-têtes, à côté du correlation_id
+        with publish_span(routing_key, correlation_id) as headers:
+            await channel.default_exchange.publish(
+                aio_pika.Message(
+                    body=json.dumps(message).encode(),
+                    reply_to=reply_to,
+                    correlation_id=correlation_id,
+                    headers=headers,
+                ),
+                routing_key=routing_key
+            )
+        logger.debug("Sent message to %s with correlation_id: %s", routing_key, correlation_id)
     except Exception as e:
-        logging.error(f"Failed to send message to {routing_key}: {str(e)}")
+        logger.error("Failed to send message to %s: %s", routing_key, e)
         raise
 
 
 async def publish_notification(customer_id, message_text):
-    connection = await aio_pika.connect_robust(f"amqp://{BROKER_USER}:{BROKER_PASSWORD}@{BROKER_HOST}/")
-    async with connection:
-        channel = await connection.channel()
-        notifications_exchange = await channel.get_exchange('notifications_exchange')
+    async with broker.channel() as channel:
+        with publish_span('customers.notification') as headers:
+            notifications_exchange = await channel.get_exchange('notifications_exchange')
         
-        notification_message = aio_pika.Message(
-            body=json.dumps({
-                "event": "notification_created",
-                "customer_id": customer_id,
-                "message": message_text,
-                "notification_type": "order_confirmation",
-                "date_created": "2024-09-24T10:22:00Z"
-            }).encode(),
-            delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-        )
+            notification_message = aio_pika.Message(
+                body=json.dumps({
+                    "event": "notification_created",
+                    "customer_id": customer_id,
+                    "message": message_text,
+                    "notification_type": "order_confirmation",
+                    "date_created": "2024-09-24T10:22:00Z"
+                }).encode(),
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                headers=headers,
+            )
         
-        await notifications_exchange.publish(notification_message, routing_key='customers.notification')
\ No newline at end of file
+            await notifications_exchange.publish(notification_message, routing_key='customers.notification')
\ No newline at end of file
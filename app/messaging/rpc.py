@@ -0,0 +1,155 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+
+from dotenv import load_dotenv
+
+from opentelemetry.trace import SpanKind
+
+from ..metrics import RPC_DURATION
+from ..tracing import start_span
+from .connection import broker
+from .consumer import decode_response
+from .publisher import send_message_to_service
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Délai d'attente par défaut d'une réponse RPC (secondes)
+RPC_TIMEOUT = float(os.getenv('RPC_TIMEOUT', '10'))
+# Fusionne les appels identiques (même routing key, même message) déjà en cours
+RPC_COALESCE = os.getenv('RPC_COALESCE', 'true').lower() in ('1', 'true', 'yes')
+
+
+class RpcClient:
+    """
+    Client RPC multiplexé : une seule file de réponse exclusive par processus,
+    un seul consommateur, et une table correlation_id -> future pour rendre
+    chaque réponse à l'appel qui l'attend.
+    """
+
+    def __init__(self, broker=broker, timeout: float = RPC_TIMEOUT, coalesce: bool = RPC_COALESCE):
+        self.broker = broker
+        self.timeout = timeout
+        self.coalesce = coalesce
+        self._in_flight = {}
+        self.reply_queue = None
+        self._reply_channel = None
+        self._pending = {}
+        self._lock = asyncio.Lock()
+        self.calls = 0
+        self.timeouts = 0
+        self.orphaned = 0
+        self.coalesced = 0
+
+    async def start(self):
+        """
+        Déclare la file de réponse au démarrage ; retentée au premier appel en cas d'échec.
+        """
+        try:
+            await self._ensure_reply_queue()
+        except Exception as e:
+            logger.warning("RPC reply queue not ready at startup, will retry on demand: %s", e)
+
+    async def _ensure_reply_queue(self):
+        if self._reply_channel is not None and not self._reply_channel.is_closed:
+            return self.reply_queue
+
+        async with self._lock:
+            if self._reply_channel is None or self._reply_channel.is_closed:
+                # Canal dédié : le consommateur vit aussi longtemps que le processus
+                connection = await self.broker.get_connection()
+                channel = await connection.channel()
+                queue = await channel.declare_queue('', exclusive=True, auto_delete=True)
+                await queue.consume(self._on_response)
+                self._reply_channel, self.reply_queue = channel, queue
+                logger.info("RPC reply queue declared: %s", queue.name)
+        return self.reply_queue
+
+    async def _on_response(self, message):
+        future = self._pending.pop(message.correlation_id, None)
+        if future is None or future.done():
+            # Réponse arrivée après le timeout de l'appelant, ou inconnue
+            self.orphaned += 1
+            logger.warning("Dropping orphaned RPC response, correlation_id: %s", message.correlation_id)
+        else:
+            future.set_result(message.body)
+        await message.ack()
+
+    async def call(self, routing_key: str, message: dict, expected_key: str = None, timeout: float = None):
+        """
+        Publie `message` sur `routing_key` et attend la réponse décodée.
+        Lève TimeoutError si elle n'arrive pas dans `timeout` secondes.
+        Un appel identique déjà en cours est rejoint au lieu d'être republié (single-flight).
+        """
+        if not self.coalesce:
+            return await self._call(routing_key, message, expected_key, timeout)
+
+        key = (routing_key, json.dumps(message, sort_keys=True), expected_key)
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._call(routing_key, message, expected_key, timeout))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # shield : l'annulation d'un appelant n'annule pas la requête des autres
+        return await asyncio.shield(task)
+
+    async def _call(self, routing_key: str, message: dict, expected_key: str = None, timeout: float = None):
+        reply_queue = await self._ensure_reply_queue()
+        correlation_id = str(uuid.uuid4())
+        future = asyncio.get_running_loop().create_future()
+        self._pending[correlation_id] = future
+        self.calls += 1
+        start = time.perf_counter()
+        outcome = "error"
+
+        # Span de l'aller-retour complet : publication (span enfant) puis attente de la réponse
+        with start_span(f"rpc {routing_key}", SpanKind.CLIENT, attributes={
+            "messaging.system": "rabbitmq",
+            "messaging.destination.name": routing_key,
+            "messaging.message.conversation_id": correlation_id,
+        }) as span:
+            try:
+                async with self.broker.channel() as channel:
+                    await send_message_to_service(
+                        channel=channel,
+                        routing_key=routing_key,
+                        message=message,
+                        reply_to=reply_queue.name,
+                        correlation_id=correlation_id,
+                    )
+                body = await asyncio.wait_for(future, timeout=timeout or self.timeout)
+                # Réponse d'erreur du service : ServiceError, comptée en "error" et non en "ok"
+                response = decode_response(body, expected_key)
+                outcome = "ok"
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                outcome = "timeout"
+                raise TimeoutError(f"RPC to {routing_key} timed out")
+            finally:
+                # Timeout, annulation ou erreur de publication : pas d'entrée orpheline
+                self._pending.pop(correlation_id, None)
+                RPC_DURATION.observe(time.perf_counter() - start, routing_key, outcome)
+                span.set_attribute("rpc.outcome", outcome)
+
+        return response
+
+    def stats(self) -> dict:
+        return {
+            "reply_queue": self.reply_queue.name if self.reply_queue is not None else None,
+            "pending": len(self._pending),
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "orphaned": self.orphaned,
+            "coalesced": self.coalesced,
+            "in_flight_requests": len(self._in_flight),
+        }
+
+
+rpc_client = RpcClient()
@@ -1,142 +1,141 @@
 import asyncio
 import aio_pika
 import logging
-import uuid
 import json
-from .config import establish_rabbitmq_connection
-from .publisher import send_order_request
-from .consumer import handle_order_response, handle_response
-from .publisher import send_message_to_service
+import os
+from ..tracing import consume_span
+from .rpc import rpc_client
+from .cache import response_cache, orders_key, product_key, product_id_of, ORDERS_CACHE_TTL, PRODUCTS_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+# Nombre max. de requêtes order.products.request simultanées pour un appel groupé
+ORDER_FANOUT_CONCURRENCY = int(os.getenv('ORDER_FANOUT_CONCURRENCY', '10'))
+# Nombre max. de commandes acceptées par /customers/{id}/orders/products
+MAX_BATCH_ORDERS = int(os.getenv('MAX_BATCH_ORDERS', '50'))
 
 async def fetch_customer_orders(customer_id: int):
     """Fetch orders for a given customer ID by communicating with the Order service via RabbitMQ."""
     try:
-        # Establish connection to RabbitMQ
-        connection = await establish_rabbitmq_connection()
-        async with connection:
-            channel = await connection.channel()
-
-            result_queue = await channel.declare_queue('', exclusive=True, auto_delete=True)
-            callback_queue = result_queue.name
-            logging.info(f"Temporary callback queue declared: {callback_queue}")
-            response_future = asyncio.Future()
-            correlation_id = str(uuid.uuid4())
+        cached = await response_cache.get_many([orders_key(customer_id)])
+        if cached:
+            return cached[orders_key(customer_id)]
 
-            await result_queue.consume(lambda message: handle_order_response(message, response_future, correlation_id))
-            await send_order_request(channel, customer_id, callback_queue, correlation_id)
+        orders = await rpc_client.call('customer.orders.request', {'customer_id': customer_id}, expected_key='orders')
+        if orders:
+            await response_cache.set_many({orders_key(customer_id): orders}, ORDERS_CACHE_TTL)
+        return orders
 
-            try:
-                orders_data = await asyncio.wait_for(response_future, timeout=10)
-                return orders_data
-
-            except asyncio.TimeoutError:
-                logging.error(f"Timeout while waiting for order service response for customer {customer_id}")
-                raise TimeoutError("Request to order service timed out")
+    except TimeoutError:
+        logger.error("Timeout while waiting for order service response for customer %s", customer_id)
+        raise TimeoutError("Request to order service timed out")
 
     except Exception as e:
-        logging.error(f"Error in fetching customer orders: {str(e)}")
+        logger.error("Error in fetching customer orders: %s", e)
         raise
 
-    finally:
-        if connection and not connection.is_closed:
-            await connection.close()
-            logging.info("RabbitMQ connection closed.")
-
 async def fetch_order_products(customer_id: int, order_id: int):
     """Fetch products for a given customer order by communicating with the Order and Product services."""
     try:
         order_service_response = await fetch_order_details(customer_id, order_id)
-        print(f"Order service response: {order_service_response}")
+        logger.debug("Order service response: %s", order_service_response)
         
         product_ids = order_service_response.get('products', [])
-        print(f"product IDs: {product_ids}")
+        logger.debug("Product IDs: %s", product_ids)
         if not isinstance(product_ids, list):
             raise ValueError(f"Expected a list of product IDs, got {type(product_ids)}")
 
         product_details = await fetch_product_details(product_ids)
-        print(f"product details from service: {product_details}")
+        logger.debug("Product details from service: %s", product_details)
 
         return product_details
 
     except Exception as e:
-        logging.error(f"Error in fetching order products for customer {customer_id}, order {order_id}: {str(e)}")
+        logger.error("Error in fetching order products for customer %s, order %s: %s", customer_id, order_id, e)
+        raise
+
+async def fetch_orders_products(customer_id: int, order_ids: list, concurrency: int = ORDER_FANOUT_CONCURRENCY):
+    """Fetch products for several orders: order lookups run concurrently, then one product lookup for all IDs."""
+    try:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def order_product_ids(order_id):
+            async with semaphore:
+                response = await fetch_order_details(customer_id, order_id)
+            return {'order_id': order_id, 'product_ids': response.get('products', [])}
+
+        orders = await asyncio.gather(*(order_product_ids(order_id) for order_id in order_ids))
+
+        # Union dédoublonnée, dans l'ordre d'apparition
+        product_ids = list(dict.fromkeys(
+            product_id for order in orders for product_id in order['product_ids']
+        ))
+        products = await fetch_product_details(product_ids) if product_ids else []
+
+        return {'orders': orders, 'products': products}
+
+    except Exception as e:
+        logger.error("Error in fetching products for customer %s, orders %s: %s", customer_id, order_ids, e)
         raise
 
 async def fetch_order_details(customer_id: int, order_id: int):
     """Fetch product IDs from the Order service."""
     try:
-        connection = await establish_rabbitmq_connection()
-        async with connection:
-            channel = await connection.channel()
-            result_queue = await channel.declare_queue('', exclusive=True, auto_delete=True)
-            correlation_id = str(uuid.uuid4())
-            response_future = asyncio.Future()
-
-            await result_queue.consume(lambda message: handle_response(message, response_future, correlation_id, 'products'))
-
-            await send_message_to_service(
-                channel=channel,
-                routing_key='order.products.request',
-                message={'order_id': order_id},
-                reply_to=result_queue.name,
-                correlation_id=correlation_id
-            )
-
-            try:
-                product_ids = await asyncio.wait_for(response_future, timeout=10)
-                logging.info(f"Product IDs received: {product_ids}")
-
-                if isinstance(product_ids, list):
-                    return {'products': product_ids}
-                else:
-                    raise ValueError("Unexpected response format from order service")
-
-            except asyncio.TimeoutError:
-                logging.error(f"Timeout while waiting for order service response for order {order_id}")
-                raise TimeoutError("Request to order service timed out")
+        product_ids = await rpc_client.call('order.products.request', {'order_id': order_id}, expected_key='products')
+        logger.debug("Product IDs received: %s", product_ids)
+
+        if isinstance(product_ids, list):
+            return {'products': product_ids}
+        else:
+            raise ValueError("Unexpected response format from order service")
+
+    except TimeoutError:
+        logger.error("Timeout while waiting for order service response for order %s", order_id)
+        raise TimeoutError("Request to order service timed out")
 
     except Exception as e:
-        logging.error(f"Error in fetching order details: {str(e)}")
+        logger.error("Error in fetching order details: %s", e)
         raise
 
 async def fetch_product_details(product_ids: list):
-    """Fetch product details from the Product service."""
-    connection = await establish_rabbitmq_connection()
-    async with connection:
-        channel = await connection.channel()
-        result_queue = await channel.declare_queue('', exclusive=True, auto_delete=True)
-        correlation_id = str(uuid.uuid4())
-        response_future = asyncio.Future()
-
-        await result_queue.consume(lambda message: handle_response(message, response_future, correlation_id, 'list'))
-        await send_message_to_service(
-            channel=channel,
-            routing_key='product_details_queue',
-            message={'product_ids': product_ids},
-            reply_to=result_queue.name,
-            correlation_id=correlation_id
-        )
-
-        try:
-            product_details = await asyncio.wait_for(response_future, timeout=10)
-
-            if isinstance(product_details, list):
-                return product_details  
+    """Fetch product details from the Product service, asking only for the IDs missing from the cache."""
+    try:
+        cached = await response_cache.get_many([product_key(product_id) for product_id in product_ids])
+        missing_ids = [product_id for product_id in product_ids if product_key(product_id) not in cached]
+        if not missing_ids:
+            return [cached[product_key(product_id)] for product_id in product_ids]
+
+        product_details = await rpc_client.call('product_details_queue', {'product_ids': missing_ids}, expected_key='list')
+
+        if not isinstance(product_details, list):
+            logger.error("Unexpected response format: %s", product_details)
+            return [] 
+
+        fetched = {}
+        unkeyed = []
+        for product in product_details:
+            product_id = product_id_of(product)
+            if product_id is None:
+                unkeyed.append(product)
             else:
-                logging.error(f"Unexpected response format: {product_details}")
-                return [] 
+                fetched[product_key(product_id)] = product
+        await response_cache.set_many(fetched, PRODUCTS_CACHE_TTL)
 
-        except asyncio.TimeoutError:
-            logging.error(f"Timeout waiting for Product Service response for product IDs {product_ids}")
-            raise TimeoutError("Product Service request timed out.")
-        
+        # Réponse dans l'ordre demandé ; les fiches sans identifiant reconnu (non cachables) en fin de liste
+        by_key = {**cached, **fetched}
+        return [by_key[product_key(product_id)] for product_id in product_ids if product_key(product_id) in by_key] + unkeyed
+
+    except TimeoutError:
+        logger.error("Timeout waiting for Product Service response for product IDs %s", product_ids)
+        raise TimeoutError("Product Service request timed out.")
 
 
 async def process_notification_message(message: aio_pika.IncomingMessage):
     async with message.process():
-        notification_data = json.loads(message.body)
-        
-        print(f"Sending notification to customer {notification_data['customer_id']}: {notification_data['message']}")
+        with consume_span(message, 'notifications'):
+            notification_data = json.loads(message.body)
+
+            logger.info("Sending notification to customer %s: %s", notification_data['customer_id'], notification_data['message'])
 
 
 async def start_notification_consumer():
@@ -145,5 +144,5 @@ async def start_notification_consumer():
         channel = await connection.channel()
         queue = await channel.get_queue('notifications')
         await queue.consume(process_notification_message)
-        print("Notification consumer started. Waiting for messages...")
+        logger.info("Notification consumer started. Waiting for messages...")
         await asyncio.Future()
\ No newline at end of file
@@ -0,0 +1,252 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Charger les variables d'environnement
+load_dotenv()
+
+# Middleware de métriques et GET /metrics (format texte Prometheus)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+# Jeton Bearer du scraper Prometheus (bearer_token) ; vide : GET /metrics réservé aux admins
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Requêtes qui ne correspondent à aucune route (404) : un seul libellé plutôt qu'un par URL
+UNMATCHED_ROUTE = "<unmatched>"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+BCRYPT_BUCKETS = (0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0)
+
+REGISTRY: List["Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """
+    Métrique nommée, une série par combinaison de valeurs de labels (passées dans l'ordre de `labelnames`).
+    Sûre entre threads : les contrôleurs synchrones tournent dans le threadpool.
+    """
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], Tuple[str, ...], float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for suffix, names, values, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._series.get(labels, 0.0)
+
+    def samples(self):
+        with self._lock:
+            return [("", self.labelnames, labels, value) for labels, value in sorted(self._series.items())]
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels: str) -> float:
+        return self._series.get(labels, 0.0)
+
+    def samples(self):
+        with self._lock:
+            return [("", self.labelnames, labels, value) for labels, value in sorted(self._series.items())]
+
+
+class Histogram(Metric):
+    """
+    Histogramme à buckets fixes : compteurs par bucket (non cumulés en mémoire), somme et nombre.
+    """
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [compteurs par bucket (+Inf en dernier), somme]
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def sum(self, *labels: str) -> float:
+        series = self._series.get(labels)
+        return series[1] if series else 0.0
+
+    def samples(self):
+        names = self.labelnames + ("le",)
+        samples = []
+        with self._lock:
+            for labels, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    samples.append(("_bucket", names, labels + (le,), cumulative))
+                samples.append(("_sum", self.labelnames, labels, total))
+                samples.append(("_count", self.labelnames, labels, cumulative))
+        return samples
+
+
+def render() -> str:
+    """
+    Toutes les métriques au format texte Prometheus (exposition 0.0.4).
+    """
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled, by route template and status code.",
+    ("method", "route", "status"))
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request duration, by route template.", ("method", "route"))
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being handled (the route is only known after routing).",
+    ("method",))
+HTTP_REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds", "Time spent running SQL statements per HTTP request, by route template.",
+    ("method", "route"), buckets=DB_BUCKETS)
+RPC_DURATION = Histogram(
+    "rpc_request_duration_seconds", "RabbitMQ RPC duration from publish to reply, by routing key and outcome.",
+    ("routing_key", "outcome"))
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds", "bcrypt computation time, by operation (hash or verify).",
+    ("operation",), buckets=BCRYPT_BUCKETS)
+
+
+class _DbTime:
+    __slots__ = ("seconds",)
+
+    def __init__(self):
+        self.seconds = 0.0
+
+
+# Temps SQL de la requête HTTP en cours ; le threadpool de run_db copie le contexte
+_current_db_time: ContextVar[Optional[_DbTime]] = ContextVar("metrics_db_time", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    db_time = _current_db_time.get()
+    start = getattr(context, "_metrics_start", None)
+    if db_time is not None and start is not None:
+        db_time.seconds += time.perf_counter() - start
+
+
+def enable_db_timing():
+    """
+    Mesure le temps des requêtes SQL sur tous les engines (synchrones et asynchrones).
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def disable_db_timing():
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI : nombre, durée et temps SQL des requêtes par route (gabarit, ex.
+    /customers/{customer_id}, jamais l'URL brute), et requêtes en cours.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        db_time = _DbTime()
+        token = _current_db_time.set(db_time)
+        HTTP_REQUESTS_IN_PROGRESS.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_PROGRESS.dec(method)
+            _current_db_time.reset(token)
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            HTTP_REQUESTS.inc(method, route, str(status))
+            HTTP_REQUEST_DURATION.observe(elapsed, method, route)
+            HTTP_REQUEST_DB_DURATION.observe(db_time.seconds, method, route)
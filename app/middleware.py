@@ -1,34 +1,142 @@
 import os
+import asyncio
+import logging
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import FastAPI, Depends, HTTPException, status
 from dotenv import load_dotenv
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
+from .metrics import PASSWORD_HASH_DURATION
 
 load_dotenv()
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+logger = logging.getLogger(__name__)
 
 # Load secret key, algorithm, and token expiry from environment
 SECRET_KEY = os.getenv('SECRET_KEY')
 ALGORITHM = os.getenv('ALGORITHM')
 ACCESS_TOKEN_EXPIRE_MINUTES = os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES')
 
+# Nombre de jetons vérifiés gardés en mémoire (0 désactive le cache)
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', '1024'))
+
 
 def hash_password(password: str) -> str:
     """
     Hash a plaintext password.
     """
-    return pwd_context.hash(password)
+    start = time.perf_counter()
+    try:
+        return pwd_context.hash(password)
+    finally:
+        PASSWORD_HASH_DURATION.observe(time.perf_counter() - start, "hash")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plaintext password against a hashed password.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    start = time.perf_counter()
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    finally:
+        PASSWORD_HASH_DURATION.observe(time.perf_counter() - start, "verify")
+
+
+# bcrypt coûte 100 à 300 ms de CPU par appel : on l'exécute sur un pool dédié
+# et borné plutôt que sur la boucle d'événements ou le threadpool partagé.
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 2)))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', '64'))
+
+
+class PasswordHashPool:
+    """
+    Pool de threads borné pour bcrypt (qui relâche le GIL).
+    Au-delà de `workers` calculs en cours + `queue_size` en attente, les appels
+    sont refusés en 503 au lieu de s'accumuler.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _acquire(self):
+        with self._lock:
+            if self.pending >= self.workers + self.queue_size:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent password operations, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self.pending += 1
+
+    def _release(self):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    async def run(self, func, *args):
+        """
+        Exécute func(*args) sur le pool depuis la boucle d'événements.
+        """
+        self._acquire()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self._release()
+
+    def run_sync(self, func, *args):
+        """
+        Exécute func(*args) sur le pool depuis un thread (contrôleurs synchrones).
+        """
+        self._acquire()
+        try:
+            return self.executor.submit(func, *args).result()
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = self.pending
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": min(pending, self.workers),
+                "queued": max(pending - self.workers, 0),
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+password_pool = PasswordHashPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_SIZE)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a plaintext password on the password pool.
+    """
+    return await password_pool.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the password pool.
+    """
+    return await password_pool.run(verify_password, plain_password, hashed_password)
 
 
 def create_access_token(data: dict) -> str:
@@ -53,17 +161,88 @@ def verify_access_token(token: str) -> dict:
         return None
 
 
+class TokenCache:
+    """
+    Cache LRU des jetons déjà vérifiés, indexé par empreinte SHA-256 du jeton.
+    Une entrée est valable jusqu'au `exp` du jeton : un client qui réutilise
+    son jeton évite le décodage et la vérification de signature.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str):
+        """
+        Renvoie une copie du payload en cache, ou None s'il est absent ou expiré.
+        Copie : un appelant qui modifie le dict ne change pas l'identité vue par les requêtes suivantes.
+        """
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                payload, expires_at = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(payload)
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, token: str, payload: dict):
+        """
+        Met en cache un payload vérifié jusqu'à son `exp`.
+        """
+        if self.maxsize <= 0 or "exp" not in payload:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (dict(payload), float(payload["exp"]))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE)
+
+
 def get_current_customer(token: str = Depends(oauth2_scheme)):
-    # Verify JWT Token
-    payload = verify_access_token(token)
+    # Verify JWT Token (cache first, signature check on miss only)
+    payload = token_cache.get(token)
     if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    # Print the payload for debugging purposes
-    print(f"Decoded token payload: {payload}")
+        payload = verify_access_token(token)
+        if payload is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        token_cache.set(token, payload)
 
     if 'customer_type' not in payload:
         raise HTTPException(
@@ -79,8 +258,8 @@ def is_admin(current_customer: dict):
     Check if the current customer has admin privileges.
     Admin is represented by customer_type = 1.
     """
-    print(f"Checking admin access: customer_type={current_customer['customer_type']}")
-    
+    logger.debug("Checking admin access: customer_type=%s", current_customer["customer_type"])
+
     if current_customer["customer_type"] != 1:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -1,11 +1,11 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 
 class Customer(Base):
     __tablename__ = "Customers"
 
-    id_customer = Column(Integer, primary_key=True, index=True)
+    id_customer = Column(Integer, primary_key=True)
     name = Column(String(80), nullable=False)
     created_at = Column(DateTime, nullable=False)
     updated_at = Column(DateTime)
@@ -31,7 +31,7 @@ class Customer(Base):
 class Company(Base):
     __tablename__ = "Companies"
 
-    id_company = Column(Integer, primary_key=True, index=True)
+    id_company = Column(Integer, primary_key=True)
     company_name = Column(String(80), nullable=False)
     siret = Column(String(15), nullable=False, unique=True)
     address = Column(String(255), nullable=False)
@@ -44,8 +44,12 @@ class Company(Base):
 
 class Feedback(Base):
     __tablename__ = "Customer_Feedback"
+    __table_args__ = (
+        Index("ix_Customer_Feedback_product_id_created_at", "product_id", "created_at"),
+        Index("ix_Customer_Feedback_id_customer", "id_customer"),
+    )
 
-    id_feedback = Column(Integer, primary_key=True, index=True)
+    id_feedback = Column(Integer, primary_key=True)
     product_id = Column(Integer, nullable=False)
     rating = Column(Integer)
     comment = Column(String(50))
@@ -56,11 +60,14 @@ class Feedback(Base):
 
 class Notification(Base):
     __tablename__ = "Notifications"
+    # Notifications d'un client, et compte des non lues, sans parcourir la table
+    __table_args__ = (Index("ix_Notifications_id_customer_is_read", "id_customer", "is_read"),)
 
-    id_notification = Column(Integer, primary_key=True, index=True)
+    id_notification = Column(Integer, primary_key=True)
     message = Column(String(255), nullable=False)
     date_created = Column(DateTime)
-    is_read = Column(Boolean, default=False)
+    # Jamais NULL : « non lue » = is_read = false, lu dans l'index (id_customer, is_read)
+    is_read = Column(Boolean, nullable=False, default=False)
     type = Column(Integer, nullable=False)
     id_customer = Column(Integer, ForeignKey("Customers.id_customer"), nullable=False)
 
@@ -68,8 +75,9 @@ class Notification(Base):
 
 class Address(Base):
     __tablename__ = "Addresses"
+    __table_args__ = (Index("ix_Addresses_id_customer", "id_customer"),)
 
-    id_address = Column(Integer, primary_key=True, index=True)
+    id_address = Column(Integer, primary_key=True)
     address_line1 = Column(String(255), nullable=False)
     address_line2 = Column(String(255))
     city = Column(String(100), nullable=False)
@@ -85,8 +93,10 @@ class Address(Base):
 
 class LoginLog(Base):
     __tablename__ = "Login_Logs"
+    # Historique de connexion d'un client trié par date
+    __table_args__ = (Index("ix_Login_Logs_id_customer_login_time", "id_customer", "login_time"),)
 
-    id_log = Column(Integer, primary_key=True, index=True)
+    id_log = Column(Integer, primary_key=True)
     login_time = Column(DateTime, nullable=False)
     ip_address = Column(String(45))
     user_agent = Column(String(255))
@@ -0,0 +1,96 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, DateTime
+
+# Pagination par clé (keyset) : au lieu de OFFSET n, qui oblige la base à lire
+# puis jeter n lignes, on repart de la dernière clé vue (WHERE pk > :cursor).
+# Le coût d'une page reste constant quelle que soit sa profondeur.
+
+# Taille de page max. de toutes les listes paginées (skip/limit ou curseur)
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(values: list) -> str:
+    """
+    Encode les valeurs de clé de la dernière ligne en curseur opaque.
+    """
+    raw = json.dumps(values, separators=(",", ":"), default=_encode_value).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Unsupported cursor value: {value!r}")
+
+
+def _decode_value(column, value):
+    # Les dates voyagent en ISO 8601 dans le curseur
+    if isinstance(column.type, DateTime) and isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return value
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """
+    Décode un curseur produit par encode_cursor ; 400 s'il est invalide.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    # Valeurs de clé uniquement : un objet ou une liste ferait échouer la comparaison SQL
+    if not all(value is None or isinstance(value, (str, int, float)) for value in values):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return values
+
+
+def after_key(key_columns: list, values: list, descending: bool = False):
+    """
+    Condition « clé > valeurs » (« < » en ordre décroissant) en ordre lexicographique,
+    écrite en OR/AND plutôt qu'en (a, b) > (x, y) pour que MySQL utilise l'index.
+    """
+    conditions = []
+    for index, column in enumerate(key_columns):
+        equal_prefix = [key_columns[i] == values[i] for i in range(index)]
+        beyond = column < values[index] if descending else column > values[index]
+        conditions.append(and_(*equal_prefix, beyond))
+    return or_(*conditions)
+
+
+def keyset(query, key_columns: list, cursor: str = None, limit: int = 10, descending: bool = False):
+    """
+    Applique la pagination keyset à une Query (sync) ou un select() (async).
+    Une ligne de plus que `limit` est demandée pour savoir s'il reste une page.
+    """
+    if limit < 1:
+        # LIMIT négatif : SQLite renverrait toute la table
+        raise HTTPException(status_code=400, detail="Invalid page size")
+    if cursor:
+        values = decode_cursor(cursor, len(key_columns))
+        values = [_decode_value(column, value) for column, value in zip(key_columns, values)]
+        query = query.filter(after_key(key_columns, values, descending))
+    order = [column.desc() for column in key_columns] if descending else key_columns
+    return query.order_by(*order).limit(limit + 1)
+
+
+def build_page(rows: list, key_columns: list, limit: int = 10) -> dict:
+    """
+    Construit la page renvoyée par l'API : éléments + curseur de la page suivante.
+    """
+    items = rows[:limit]
+    next_cursor = None
+    if items and len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in key_columns])
+    return {"items": items, "next_cursor": next_cursor}
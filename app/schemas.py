@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, Optional, List
 from datetime import datetime
 
 # Schéma de base pour Customer
@@ -30,6 +30,20 @@ class Customer(CustomerBase):
     class Config:
         orm_mode = True
 
+class CustomerPage(BaseModel):
+    items: List[Customer]
+    next_cursor: Optional[str] = None
+
+# Résultat d'un import groupé de clients (POST /customers/bulk)
+class BulkImportError(BaseModel):
+    index: int
+    detail: Any
+
+class BulkImportResult(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[BulkImportError]
+
 # Schéma pour la mise à jour d'un Customer
 class CustomerUpdate(BaseModel):
     created_at: Optional[datetime] = None
@@ -74,6 +88,10 @@ class Company(CompanyBase):
     class Config:
         orm_mode = True
 
+class CompanyPage(BaseModel):
+    items: List[Company]
+    next_cursor: Optional[str] = None
+
 # Schéma de base pour Feedback
 class FeedbackBase(BaseModel):
     product_id: int
@@ -114,11 +132,16 @@ class Feedback(FeedbackBase):
     class Config:
         orm_mode = True
 
+# Page de feedbacks (pagination par curseur)
+class FeedbackPage(BaseModel):
+    items: List[Feedback]
+    next_cursor: Optional[str] = None
+
 # Schéma pour Notification
 class NotificationBase(BaseModel):
     message: str
     date_created: Optional[datetime] = None
-    is_read: Optional[bool] = False
+    is_read: bool = False
     type: int
     id_customer: int
 
@@ -138,6 +161,34 @@ class Notification(NotificationBase):
     class Config:
         orm_mode = True
 
+class NotificationPage(BaseModel):
+    items: List[Notification]
+    next_cursor: Optional[str] = None
+
+# Page des notifications d'un client, avec le nombre de non lues (compté en SQL)
+class CustomerNotificationPage(NotificationPage):
+    unread_count: int
+
+class UnreadCount(BaseModel):
+    unread_count: int
+
+# Opérations groupées sur les notifications (une requête SQL par opération)
+class NotificationBulkCreate(BaseModel):
+    notifications: List[NotificationCreate]
+
+class NotificationCampaign(BaseModel):
+    message: str
+    type: int
+    date_created: Optional[datetime] = None
+    opted_in_only: Optional[bool] = True
+
+class NotificationMarkRead(BaseModel):
+    notification_ids: Optional[List[int]] = None
+    id_customer: Optional[int] = None
+
+class NotificationIds(BaseModel):
+    notification_ids: List[int]
+
 class AddressBase(BaseModel):
     address_line1: str
     address_line2: Optional[str] = None
@@ -169,6 +220,10 @@ class Address(AddressBase):
     class Config:
         orm_mode = True
 
+class AddressPage(BaseModel):
+    items: List[Address]
+    next_cursor: Optional[str] = None
+
 
 class LoginLogBase(BaseModel):
     login_time: datetime
@@ -190,6 +245,10 @@ class LoginLog(LoginLogBase):
     class Config:
         orm_mode = True
 
+class LoginLogPage(BaseModel):
+    items: List[LoginLog]
+    next_cursor: Optional[str] = None
+
 
 # Schéma pour Login
 class LoginRequest(BaseModel):
@@ -216,6 +275,18 @@ class CustomerCompany(CustomerCompanyBase):
     class Config:
         orm_mode = True
 
+class CustomerCompanyPage(BaseModel):
+    items: List[CustomerCompany]
+    next_cursor: Optional[str] = None
+
+# Profil d'un client (GET /customers/{id}/profile) : un appel au lieu de cinq
+class CustomerProfile(BaseModel):
+    customer: Customer
+    addresses: List[Address]
+    companies: List[Company]
+    recent_notifications: List[Notification]
+    recent_feedbacks: List[Feedback]
+
 
 # Define the schema for an order product
 class OrderProductSchema(BaseModel):
@@ -0,0 +1,182 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, List, Optional
+import logging
+import os
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, raiseload
+
+# Charger les variables d'environnement
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, 'false').lower() in ('1', 'true', 'yes')
+
+
+# Comptage des requêtes SQL par requête HTTP (désactivé par défaut)
+SQL_STATEMENT_COUNTING = _env_flag('SQL_STATEMENT_COUNTING')
+# Au-delà, l'endpoint est journalisé comme suspect (N+1)
+SQL_STATEMENT_THRESHOLD = int(os.getenv('SQL_STATEMENT_THRESHOLD', '20'))
+# En-tête X-SQL-Statement-Count sur les réponses : à réserver au développement
+SQL_STATEMENT_HEADER = _env_flag('SQL_STATEMENT_HEADER')
+# Toute relation non chargée d'avance lève une erreur au lieu d'un SELECT paresseux
+SQL_LAZYLOAD_GUARD = _env_flag('SQL_LAZYLOAD_GUARD')
+
+STATEMENT_COUNT_HEADER = "x-sql-statement-count"
+
+
+class StatementCounter:
+    """
+    Requêtes SQL exécutées pendant le traitement d'une requête HTTP.
+    """
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+class RequestStatements:
+    """
+    Bilan d'une requête HTTP : route (gabarit, ex. /customers/{customer_id}) et requêtes SQL.
+    """
+
+    def __init__(self, method: str, route: str, statements: List[str]):
+        self.method = method
+        self.route = route
+        self.statements = statements
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+# Compteur de la requête HTTP en cours ; le threadpool de run_db copie le contexte
+_current_counter: ContextVar[Optional[StatementCounter]] = ContextVar("sql_statement_counter", default=None)
+# Observateurs appelés à la fin de chaque requête HTTP comptée (tests, benchmarks)
+_request_listeners: List[Callable[[RequestStatements], None]] = []
+_counting_enabled = False
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.statements.append(statement)
+
+
+def counting_enabled() -> bool:
+    return _counting_enabled
+
+
+def enable_statement_counting():
+    """
+    Branche le compteur sur tous les engines (synchrones et asynchrones).
+    """
+    global _counting_enabled
+    if not _counting_enabled:
+        event.listen(Engine, "before_cursor_execute", _count_statement)
+        _counting_enabled = True
+
+
+def disable_statement_counting():
+    global _counting_enabled
+    if _counting_enabled:
+        event.remove(Engine, "before_cursor_execute", _count_statement)
+        _counting_enabled = False
+
+
+@contextmanager
+def track_statements():
+    """
+    Compte les requêtes SQL exécutées dans le bloc (et dans les threads lancés depuis lui).
+    """
+    counter = StatementCounter()
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
+
+
+@contextmanager
+def record_requests():
+    """
+    Active le comptage le temps du bloc et collecte le bilan de chaque requête HTTP traitée.
+    """
+    was_enabled = counting_enabled()
+    requests: List[RequestStatements] = []
+    enable_statement_counting()
+    _request_listeners.append(requests.append)
+    try:
+        yield requests
+    finally:
+        _request_listeners.remove(requests.append)
+        if not was_enabled:
+            disable_statement_counting()
+
+
+def _raise_on_lazy_load(orm_execute_state):
+    # Les chargements de relations ou de colonnes sont eux-mêmes issus d'une requête déjà gardée
+    if orm_execute_state.is_select and not orm_execute_state.is_relationship_load and not orm_execute_state.is_column_load:
+        orm_execute_state.statement = orm_execute_state.statement.options(raiseload("*"))
+
+
+def enable_lazyload_guard():
+    """
+    Interdit le chargement paresseux des relations : les options explicites (selectinload,
+    joinedload) restent permises, tout autre accès lève sqlalchemy.exc.InvalidRequestError.
+    """
+    if not event.contains(Session, "do_orm_execute", _raise_on_lazy_load):
+        event.listen(Session, "do_orm_execute", _raise_on_lazy_load)
+
+
+def disable_lazyload_guard():
+    if event.contains(Session, "do_orm_execute", _raise_on_lazy_load):
+        event.remove(Session, "do_orm_execute", _raise_on_lazy_load)
+
+
+class SQLStatementCountMiddleware:
+    """
+    Middleware ASGI : compte les requêtes SQL de chaque requête HTTP, journalise les
+    endpoints au-delà du seuil et, si demandé, expose le compte dans un en-tête.
+    Simple passe-plat tant que le comptage n'est pas activé.
+    """
+
+    def __init__(self, app, threshold: int = SQL_STATEMENT_THRESHOLD, header: bool = SQL_STATEMENT_HEADER):
+        self.app = app
+        self.threshold = threshold
+        self.header = header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not counting_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        with track_statements() as counter:
+            async def send_with_count(message):
+                if self.header and message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((STATEMENT_COUNT_HEADER.encode(), str(counter.count).encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_count)
+            finally:
+                self.report(scope, counter)
+
+    def report(self, scope, counter: StatementCounter):
+        route = getattr(scope.get("route"), "path", scope["path"])
+        if counter.count > self.threshold:
+            logger.warning("%s %s ran %d SQL statements (threshold %d)",
+                           scope["method"], route, counter.count, self.threshold)
+        request = RequestStatements(scope["method"], route, counter.statements)
+        for listener in list(_request_listeners):
+            listener(request)
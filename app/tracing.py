@@ -0,0 +1,180 @@
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from typing import Optional
+
+from dotenv import load_dotenv
+from opentelemetry import propagate, trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Charger les variables d'environnement
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Spans par requête HTTP, requête SQL et message AMQP (opt-in, export par opentelemetry-sdk)
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+# Fichier où écrire les spans (une ligne JSON par span) ; vide : sortie standard
+TRACING_FILE = os.getenv('TRACING_FILE', '')
+TRACING_SERVICE_NAME = os.getenv('TRACING_SERVICE_NAME', 'api-clients')
+# Requêtes SQL tronquées dans l'attribut db.statement
+MAX_STATEMENT_LENGTH = 1000
+
+# Tracer du fournisseur global ; remplacé par configure_tracing()
+_tracer = trace.get_tracer(__name__)
+
+
+def configure_tracing(provider: Optional["trace.TracerProvider"] = None) -> bool:
+    """
+    Installe le fournisseur de spans : celui passé en argument, ou un TracerProvider
+    opentelemetry-sdk qui exporte en JSON vers TRACING_FILE ou la sortie standard.
+    Dépendance optionnelle : `opentelemetry-sdk`, dans requirements-optional.txt ; sans elle les spans restent des no-op.
+    """
+    global _tracer
+    if provider is None:
+        try:
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+        except ImportError:
+            logger.warning("TRACING_ENABLED is set but opentelemetry-sdk is not installed, spans are not exported")
+            return False
+
+        out = open(TRACING_FILE, "a") if TRACING_FILE else sys.stdout
+        provider = TracerProvider(resource=Resource.create({"service.name": TRACING_SERVICE_NAME}))
+        # Export par lots dans un thread dédié : la requête n'attend pas l'écriture
+        provider.add_span_processor(BatchSpanProcessor(
+            ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")))
+        trace.set_tracer_provider(provider)
+    _tracer = provider.get_tracer(__name__)
+    return True
+
+
+def start_span(name: str, kind: SpanKind = SpanKind.INTERNAL, context=None, attributes: dict = None):
+    return _tracer.start_as_current_span(name, context=context, kind=kind, attributes=attributes)
+
+
+def inject_headers(headers: Optional[dict] = None) -> dict:
+    """
+    Ajoute le contexte de trace courant (en-tête W3C `traceparent`) aux en-têtes d'un message.
+    """
+    headers = {} if headers is None else headers
+    propagate.inject(headers)
+    return headers
+
+
+@contextmanager
+def publish_span(destination: str, correlation_id: str = None):
+    """
+    Span PRODUCER d'une publication AMQP ; fournit les en-têtes qui portent son contexte.
+    """
+    attributes = {"messaging.system": "rabbitmq", "messaging.destination.name": destination}
+    if correlation_id:
+        attributes["messaging.message.conversation_id"] = correlation_id
+    with start_span(f"publish {destination}", SpanKind.PRODUCER, attributes=attributes):
+        yield inject_headers()
+
+
+@contextmanager
+def consume_span(message, destination: str):
+    """
+    Span CONSUMER du traitement d'un message reçu, enfant du span de l'émetteur
+    quand ses en-têtes portent un contexte de trace.
+    """
+    context = propagate.extract(getattr(message, "headers", None) or {})
+    attributes = {"messaging.system": "rabbitmq", "messaging.destination.name": destination}
+    correlation_id = getattr(message, "correlation_id", None)
+    if isinstance(correlation_id, str):
+        attributes["messaging.message.conversation_id"] = correlation_id
+    with start_span(f"process {destination}", SpanKind.CONSUMER, context=context, attributes=attributes) as span:
+        yield span
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is None:
+        return
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+    context._tracing_span = _tracer.start_span(operation, kind=SpanKind.CLIENT, attributes={
+        "db.system": conn.dialect.name,
+        "db.operation": operation,
+        "db.statement": statement[:MAX_STATEMENT_LENGTH],
+    })
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = getattr(context, "_tracing_span", None)
+    if span is not None:
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            span.set_attribute("db.rowcount", cursor.rowcount)
+        span.end()
+        context._tracing_span = None
+
+
+def _handle_error(exception_context):
+    span = getattr(exception_context.execution_context, "_tracing_span", None)
+    if span is not None:
+        span.record_exception(exception_context.original_exception)
+        span.set_status(Status(StatusCode.ERROR, str(exception_context.original_exception)))
+        span.end()
+        exception_context.execution_context._tracing_span = None
+
+
+def enable_sql_tracing():
+    """
+    Un span par requête SQL sur tous les engines, enfant du span de la requête HTTP
+    (le threadpool de run_db copie le contexte).
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+def disable_sql_tracing():
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.remove(Engine, "handle_error", _handle_error)
+
+
+class TracingMiddleware:
+    """
+    Middleware ASGI : un span SERVER par requête HTTP, enfant du `traceparent` reçu s'il y en a un,
+    nommé d'après la route (gabarit) une fois connue.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope.get("headers", [])}
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with start_span(method, SpanKind.SERVER, context=propagate.extract(headers), attributes={
+            "http.request.method": method,
+            "url.path": scope["path"],
+        }) as span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route is not None:
+                    span.update_name(f"{method} {route}")
+                    span.set_attribute("http.route", route)
+                span.set_attribute("http.response.status_code", status)
+                if status >= 500:
+                    span.set_status(Status(StatusCode.ERROR))
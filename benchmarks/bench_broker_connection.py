@@ -0,0 +1,116 @@
+"""
+Latence de GET /customers/{id}/orders côté messagerie : une connexion AMQP et une
+file de réponse par requête (comportement initial) vs connexion partagée, pool de
+canaux et RpcClient (une file de réponse par processus).
+
+    python -m benchmarks.bench_broker_connection --requests 2000 --concurrency 50
+
+Le broker est simulé en mémoire (app/messaging/fake_broker.py) avec une poignée de main
+de `--connect-ms` et un aller-retour de `--rtt-ms` par commande AMQP.
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import aio_pika
+
+from .common import configure_env, summarize
+from app.messaging.fake_broker import FakeBroker, order_service_responders
+
+
+async def fetch_orders_per_request(fake: FakeBroker, customer_id: int):
+    """Chemin d'origine : connexion, canal et file exclusive ouverts puis fermés à chaque appel."""
+    connection = await fake.connect()
+    async with connection:
+        channel = await connection.channel()
+        result_queue = await channel.declare_queue('', exclusive=True, auto_delete=True)
+        correlation_id = str(uuid.uuid4())
+        response_future = asyncio.get_running_loop().create_future()
+
+        async def on_response(message):
+            if message.correlation_id == correlation_id:
+                response_future.set_result(json.loads(message.body)['orders'])
+
+        await result_queue.consume(on_response)
+        await channel.default_exchange.publish(
+            aio_pika.Message(
+                body=json.dumps({'customer_id': customer_id}).encode(),
+                reply_to=result_queue.name,
+                correlation_id=correlation_id,
+            ),
+            routing_key='customer.orders.request',
+        )
+        return await asyncio.wait_for(response_future, timeout=10)
+
+
+async def measure(fetch, requests: int, concurrency: int) -> dict:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(customer_id: int):
+        async with semaphore:
+            start = time.perf_counter()
+            orders = await fetch(customer_id)
+            latencies.append(time.perf_counter() - start)
+            assert orders, "empty response"
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i % 1000 + 1) for i in range(requests)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def run(args):
+    from unittest.mock import patch
+
+    from app.messaging import service
+    from app.messaging.cache import NullCache
+    from app.messaging.connection import BrokerConnection
+    from app.messaging.rpc import RpcClient
+
+    def new_broker():
+        return FakeBroker(
+            order_service_responders(), connect_latency=args.connect_ms / 1000,
+            rtt=args.rtt_ms / 1000, service_latency=args.service_ms / 1000,
+        )
+
+    fake = new_broker()
+    per_request = await measure(lambda customer_id: fetch_orders_per_request(fake, customer_id),
+                                args.requests, args.concurrency)
+    per_request["connections"] = fake.connections
+    per_request["reply_queues"] = args.requests
+
+    fake = new_broker()
+    pooled_broker = BrokerConnection(connect=fake.connect, pool_size=args.channels, healthcheck_interval=0)
+    await pooled_broker.start()
+    client = RpcClient(broker=pooled_broker)
+    await client.start()
+    # Sans cache de réponses : on mesure le transport seul
+    with patch.object(service, "rpc_client", client), patch.object(service, "response_cache", NullCache()):
+        pooled = await measure(service.fetch_customer_orders, args.requests, args.concurrency)
+    pooled["connections"] = fake.connections
+    pooled["channels_opened"] = pooled_broker.channels_opened
+    pooled["reply_queues"] = 1
+    await pooled_broker.close()
+
+    return {"per_request": per_request, "pooled": pooled}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--channels", type=int, default=10, help="taille du pool de canaux")
+    parser.add_argument("--connect-ms", type=float, default=5.0, help="poignée de main TCP + AMQP simulée")
+    parser.add_argument("--rtt-ms", type=float, default=0.5, help="aller-retour simulé par commande AMQP")
+    parser.add_argument("--service-ms", type=float, default=1.0, help="temps de traitement du service Order")
+    args = parser.parse_args()
+
+    configure_env("sqlite://")
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Débit d'import de clients (lignes/s) : POST /customers/ ligne par ligne vs
+POST /customers/bulk (tableau JSON et NDJSON).
+
+    python -m benchmarks.bench_bulk_import --rows 5000 --bcrypt-rounds 12
+
+Les lignes sont générées à partir de database/data/data.json (66 fiches)
+répétées jusqu'à `--rows`, avec des emails uniques. bcrypt domine le coût :
+`--bcrypt-rounds` (12 par défaut dans passlib) permet d'isoler la part SQL.
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from .common import configure_env, sqlite_url, admin_token
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), "..", "database", "data", "data.json")
+
+
+def load_rows(count: int, offset: int = 0) -> list:
+    """Convertit les fiches de data.json au format CustomerCreate, `count` lignes uniques."""
+    with open(DATA_FILE) as f:
+        source = json.load(f)
+    rows = []
+    for i in range(offset, offset + count):
+        record = source[i % len(source)]
+        rows.append({
+            "created_at": record["createdAt"],
+            "name": record["name"],
+            "username": f"{record['username']}.{i}",
+            "first_name": record["firstName"],
+            "last_name": record["lastName"],
+            "email": f"{record['username'].lower()}.{i}@bench.local",
+            "last_login": record["createdAt"],
+            "password_hash": f"password-{i}",
+        })
+    return rows
+
+
+async def run(args) -> dict:
+    import httpx
+    from app.database import Base, engine
+    from app.main import app
+
+    Base.metadata.create_all(engine)
+    headers = {"Authorization": f"Bearer {admin_token()}"}
+    report = {}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        # Référence : une requête, un INSERT et un commit par client
+        rows = load_rows(args.single_rows, offset=0)
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def post_one(row):
+            async with semaphore:
+                response = await client.post("/customers/", json=row)
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(post_one(row) for row in rows))
+        elapsed = time.perf_counter() - start
+        report["single"] = {"rows": len(rows), "seconds": round(elapsed, 2), "rows_per_s": round(len(rows) / elapsed, 1)}
+
+        for name, offset in (("bulk_json", 1_000_000), ("bulk_ndjson", 2_000_000)):
+            rows = load_rows(args.rows, offset=offset)
+            if name == "bulk_json":
+                request = {"json": rows}
+            else:
+                request = {
+                    "content": "".join(json.dumps(row) + "\n" for row in rows).encode(),
+                    "headers": {"Content-Type": "application/x-ndjson"},
+                }
+            start = time.perf_counter()
+            response = await client.post("/customers/bulk", headers={**headers, **request.pop("headers", {})}, **request)
+            elapsed = time.perf_counter() - start
+            result = response.json()
+            assert response.status_code == 200 and result["failed"] == 0, response.text[:500]
+            report[name] = {"rows": result["inserted"], "seconds": round(elapsed, 2),
+                            "rows_per_s": round(result["inserted"] / elapsed, 1)}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000, help="lignes par import groupé")
+    parser.add_argument("--single-rows", type=int, default=500, help="lignes importées une à une (référence)")
+    parser.add_argument("--concurrency", type=int, default=16, help="requêtes simultanées pour la référence")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--bcrypt-rounds", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_env(sqlite_url(os.path.join(tmp, "bench.db")), BULK_INSERT_BATCH_SIZE=args.batch_size,
+                      PASSWORD_HASH_QUEUE_SIZE=max(args.concurrency, 64))
+        if args.bcrypt_rounds:
+            from app.middleware import pwd_context
+            pwd_context.update(bcrypt__rounds=args.bcrypt_rounds)
+        print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compare la latence de GET /customers/{id} entre DB_MODE=sync et DB_MODE=async.
+
+Chaque mode tourne dans son propre processus (le mode est lu à l'import de
+app.database) contre une base SQLite locale, avec N clients concurrents :
+
+    python -m benchmarks.bench_db_modes --clients 200 --requests 4000
+
+Pour viser un MySQL local, passer --database-url mysql+mysqlconnector://...
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from .common import configure_env, sqlite_url, seed_customers, admin_token, summarize, Timer
+
+
+async def _run_clients(app, clients: int, total: int, customers: int) -> dict:
+    import httpx
+
+    headers = {"Authorization": f"Bearer {admin_token()}"}
+    latencies = []
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i % customers + 1)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            while not queue.empty():
+                customer_id = queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(f"/customers/{customer_id}", headers=headers)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+
+        with Timer() as timer:
+            await asyncio.gather(*(worker() for _ in range(clients)))
+
+    return summarize(latencies, timer.elapsed)
+
+
+def run_worker(args):
+    configure_env(args.database_url, DB_MODE=args.mode)
+    from app.database import engine
+    from app.main import app
+
+    if args.seed:
+        seed_customers(engine, args.customers)
+    result = asyncio.run(_run_clients(app, args.clients, args.requests, args.customers))
+    result["mode"] = args.mode
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--mode", choices=["sync", "async"], help=argparse.SUPPRESS)
+    parser.add_argument("--seed", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_worker(args)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or sqlite_url(os.path.join(tmp, "bench.db"))
+        results = []
+        for index, mode in enumerate(["sync", "async"]):
+            command = [
+                sys.executable, "-m", "benchmarks.bench_db_modes", "--mode", mode,
+                "--clients", str(args.clients), "--requests", str(args.requests),
+                "--customers", str(args.customers), "--database-url", database_url,
+            ]
+            if index == 0 and args.database_url is None:
+                command.append("--seed")
+            output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    for result in results:
+        print(f"{result['mode']:>5}: p50={result['p50_ms']}ms p95={result['p95_ms']}ms "
+              f"p99={result['p99_ms']}ms rps={result['rps']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Temps passé dans l'appelant (donc dans la boucle d'événements) par ligne de log.
+
+    python -m benchmarks.bench_logging --lines 20000 --write-delay-us 50
+
+Variantes, vers un flux lent (chaque write() attend --write-delay-us, comme un pipe
+ou un collecteur de logs saturé) :
+  print                 print(f"...") sur le flux, comme avant
+  sync handler          logging.StreamHandler classique sur le logger racine
+  queue handler         configure_logging() : file bornée + thread d'écriture (app/logging_config.py)
+  debug off, f-string   logger.debug(f"...") alors que DEBUG est désactivé
+  debug off, lazy       logger.debug("... %s", x) alors que DEBUG est désactivé
+"""
+import argparse
+import contextlib
+import logging
+import time
+
+from .common import configure_env
+
+PAYLOAD = {"orders": [{"id": i, "products": list(range(10))} for i in range(5)]}
+
+
+class SlowStream:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.lines = 0
+
+    def write(self, text):
+        # sleep libère le GIL, comme une vraie écriture bloquée
+        time.sleep(self.delay)
+        self.lines += 1
+
+    def flush(self):
+        pass
+
+
+def per_line(emit, lines: int) -> float:
+    start = time.perf_counter()
+    for i in range(lines):
+        emit(i)
+    return (time.perf_counter() - start) / lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=20000)
+    parser.add_argument("--write-delay-us", type=float, default=50)
+    args = parser.parse_args()
+
+    configure_env("sqlite://")
+    from app.logging_config import configure_logging, shutdown_logging, stats
+
+    logger = logging.getLogger("bench")
+    root = logging.getLogger()
+    stream = SlowStream(args.write_delay_us / 1e6)
+    results = {}
+
+    with contextlib.redirect_stdout(stream):
+        results["print"] = per_line(lambda i: print(f"Order service response {i}: {PAYLOAD}"), args.lines)
+
+    handler = logging.StreamHandler(stream)
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    results["sync handler"] = per_line(lambda i: logger.info("Order service response %s: %s", i, PAYLOAD), args.lines)
+    root.removeHandler(handler)
+
+    handler = logging.StreamHandler(stream)
+    configure_logging(level="INFO", handler=handler, queue_size=args.lines)
+    results["queue handler"] = per_line(lambda i: logger.info("Order service response %s: %s", i, PAYLOAD), args.lines)
+    dropped = stats()["dropped"]
+    start = time.perf_counter()
+    shutdown_logging()
+    drain = time.perf_counter() - start
+
+    results["debug off, f-string"] = per_line(lambda i: logger.debug(f"Order service response {i}: {PAYLOAD}"), args.lines)
+    results["debug off, lazy"] = per_line(lambda i: logger.debug("Order service response %s: %s", i, PAYLOAD), args.lines)
+
+    print(f"{'variant':<22} {'µs/line in caller':>18}")
+    for name, seconds in results.items():
+        print(f"{name:<22} {seconds * 1e6:>18.2f}")
+    print(f"\nqueue handler: {dropped} lignes perdues, file vidée en {drain * 1000:.0f} ms par le thread d'écriture")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Logins/s de POST /login selon la façon de lire le client et d'écrire le login.
+
+    python -m benchmarks.bench_login --logins 4000 --clients 50
+
+Variantes, rejouées sur la même base SQLite :
+  entity              entité Customer complète, aucune écriture (comportement d'origine)
+  entity+inline       entité complète, Login_Logs + last_login écrits pendant la requête
+  projection+batched  4 colonnes lues, écritures regroupées en tâche de fond (write-behind)
+
+bcrypt (100 à 300 ms par appel) écraserait tout le reste : il est remplacé par une
+vérification triviale, sauf avec --bcrypt.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from unittest.mock import AsyncMock, patch
+
+from .common import configure_env, sqlite_url, seed_customers, summarize, Timer
+
+VARIANTS = ["entity", "entity+inline", "projection+batched"]
+
+
+async def _run_logins(app, logins: int, clients: int, customers: int) -> dict:
+    import httpx
+
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for i in range(logins):
+        queue.put_nowait(i % customers + 1)
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                customer_id = queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.post("/login", json={"email": f"user{customer_id}@bench.local", "password": "password"})
+                latencies.append(time.perf_counter() - start)
+                # SQLite sérialise les écritures : en inline, un verrou trop long fait échouer le login
+                if response.status_code != 200:
+                    errors += 1
+
+        with Timer() as timer:
+            await asyncio.gather(*(worker() for _ in range(clients)))
+
+    return {**summarize(latencies, timer.elapsed), "errors": errors}
+
+
+async def run_variant(variant: str, args) -> dict:
+    from app import controllers
+    from app.database import engine
+    from app.login_events import login_events
+    from app.main import app
+    from app.models import LoginLog
+    from sqlalchemy import func, select
+
+    def get_full_customer(db, email):
+        return controllers.get_customer_by_email(db, email)
+
+    patches = []
+    if variant.startswith("entity"):
+        patches.append(patch("app.main.crud.get_login_credentials", get_full_customer))
+    if variant == "entity":
+        patches.append(patch("app.main.login_events.record", AsyncMock()))
+    login_events.flush_interval = 0 if variant == "entity+inline" else args.flush_interval_ms / 1000
+
+    with engine.begin() as connection:
+        connection.execute(LoginLog.__table__.delete())
+    for p in patches:
+        p.start()
+    try:
+        await login_events.start()
+        result = await _run_logins(app, args.logins, args.clients, args.customers)
+        await login_events.stop()
+    finally:
+        for p in patches:
+            p.stop()
+
+    with engine.connect() as connection:
+        result["login_logs"] = connection.execute(select(func.count()).select_from(LoginLog.__table__)).scalar()
+    result["variant"] = variant
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=4000)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--flush-interval-ms", type=int, default=200)
+    parser.add_argument("--bcrypt", action="store_true", help="garde la vraie vérification bcrypt")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_env(sqlite_url(os.path.join(tmp, "bench.db")))
+        from app.database import engine
+        from app.middleware import hash_password
+
+        seed_customers(engine, args.customers, password_hash=hash_password("password") if args.bcrypt else "not-a-real-hash")
+        # WAL : les lectures des autres requêtes ne bloquent pas les écritures (variante inline)
+        with engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA journal_mode=WAL")
+
+        verify = None if args.bcrypt else patch("app.main.verify_password_async", AsyncMock(return_value=True))
+        if verify:
+            verify.start()
+        try:
+            results = [asyncio.run(run_variant(variant, args)) for variant in VARIANTS]
+        finally:
+            if verify:
+                verify.stop()
+
+    print(f"{'variant':<20} {'logins/s':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'errors':>7} {'Login_Logs':>11}")
+    for result in results:
+        print(f"{result['variant']:<20} {result['rps']:>9} {result['p50_ms']:>9} {result['p95_ms']:>9} "
+              f"{result['p99_ms']:>9} {result['errors']:>7} {result['login_logs']:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Surcoût du middleware de métriques (app/metrics.py) par requête.
+
+    python -m benchmarks.bench_metrics --requests 20000
+
+Une même application FastAPI minimale, sans middleware, avec un middleware ASGI vide
+(coût de la couche elle-même) et avec MetricsMiddleware (et la mesure du temps SQL),
+est appelée directement en ASGI, sans réseau ni client HTTP : c'est le pire cas,
+l'endpoint ne faisant presque rien d'autre qu'une requête SQL triviale.
+Les variantes alternent par tours pour lisser le bruit.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from .common import configure_env
+
+
+class PassThroughMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+
+
+def build_app(middleware=None):
+    from fastapi import FastAPI
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.pool import StaticPool
+    from app.metrics import MetricsMiddleware
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    connection = engine.connect()
+    api = FastAPI()
+
+    @api.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        connection.execute(text("SELECT 1"))
+        return {"item_id": item_id}
+
+    if middleware == "metrics":
+        api.add_middleware(MetricsMiddleware)
+    elif middleware == "pass-through":
+        api.add_middleware(PassThroughMiddleware)
+    return api
+
+
+async def call(app, path: str):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "headers": [], "client": ("127.0.0.1", 1234), "server": ("bench", 80), "root_path": "",
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def run(app, requests: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        await call(app, f"/items/{i}")
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    configure_env("sqlite://")
+    from app.metrics import enable_db_timing, render
+
+    enable_db_timing()
+    apps = {
+        "no middleware": build_app(),
+        "empty middleware": build_app("pass-through"),
+        "metrics": build_app("metrics"),
+    }
+    timings = {name: [] for name in apps}
+
+    async def bench():
+        for app in apps.values():
+            await run(app, 1000)  # préchauffage
+        for _ in range(args.rounds):
+            for name, app in apps.items():
+                timings[name].append(await run(app, args.requests // args.rounds))
+
+    asyncio.run(bench())
+
+    baseline = statistics.median(timings["no middleware"])
+    print(f"{'variant':<18} {'µs/request':>11} {'overhead':>10}")
+    for name, values in timings.items():
+        per_request = statistics.median(values)
+        print(f"{name:<18} {per_request * 1e6:>11.1f} {(per_request - baseline) / baseline:>+10.1%}")
+
+    start = time.perf_counter()
+    body = render()
+    print(f"\nGET /metrics: {len(body.splitlines())} lignes rendues en {(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Coût d'une page de Login_Logs selon sa profondeur : OFFSET/LIMIT vs curseur (keyset).
+
+    python -m benchmarks.bench_pagination --rows 1000000 --limit 50
+
+Avec OFFSET, la base lit et jette `depth` lignes ; avec le curseur elle part
+directement de la clé primaire, le temps reste constant.
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from .common import configure_env, sqlite_url
+
+
+def seed_login_logs(engine, rows: int, chunk: int = 50_000):
+    from app import models
+    from app.database import Base
+
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    table = models.LoginLog.__table__
+    with engine.begin() as conn:
+        for start in range(0, rows, chunk):
+            conn.execute(table.insert(), [
+                {"login_time": now, "ip_address": "127.0.0.1", "user_agent": "bench", "id_customer": i % 1000 + 1}
+                for i in range(start, min(start + chunk, rows))
+            ])
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_env(sqlite_url(os.path.join(tmp, "bench.db")))
+        from app import controllers
+        from app.database import engine, SessionLocal
+        from app.pagination import encode_cursor
+
+        seed_login_logs(engine, args.rows)
+        db = SessionLocal()
+        depths = sorted({0, args.rows // 100, args.rows // 10, args.rows // 2, args.rows - args.limit})
+
+        print(f"{'depth':>10} {'offset (ms)':>12} {'cursor (ms)':>12}")
+        for depth in depths:
+            offset_ms = best_of(args.repeat, lambda: controllers.get_login_logs(db, skip=depth, limit=args.limit))
+            # Le curseur de la page commençant à `depth` encode la dernière clé de la page précédente
+            cursor = encode_cursor([depth]) if depth else None
+            cursor_ms = best_of(args.repeat, lambda: controllers.get_login_logs_page(db, cursor=cursor, limit=args.limit))
+            print(f"{depth:>10} {offset_ms:>12.2f} {cursor_ms:>12.2f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Rafraîchissement de tableau de bord : `--clients` appels simultanés à
+fetch_customer_orders pour le même client, avec et sans fusion des RPC identiques.
+
+    python -m benchmarks.bench_rpc_coalescing --clients 200 --rounds 20
+
+Le cache de réponses est désactivé pour mesurer le single-flight seul.
+"""
+import argparse
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+from .common import configure_env, summarize
+from app.messaging.fake_broker import FakeBroker, order_service_responders
+
+
+async def herd(args, coalesce: bool) -> dict:
+    from app.messaging import service
+    from app.messaging.cache import NullCache
+    from app.messaging.connection import BrokerConnection
+    from app.messaging.rpc import RpcClient
+
+    fake = FakeBroker(order_service_responders(), rtt=args.rtt_ms / 1000, service_latency=args.service_ms / 1000)
+    broker = BrokerConnection(connect=fake.connect, healthcheck_interval=0)
+    client = RpcClient(broker=broker, coalesce=coalesce)
+    await broker.start()
+    await client.start()
+
+    latencies = []
+
+    async def one(customer_id: int):
+        start = time.perf_counter()
+        await service.fetch_customer_orders(customer_id)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with patch.object(service, "rpc_client", client), patch.object(service, "response_cache", NullCache()):
+        for round_ in range(args.rounds):
+            await asyncio.gather(*(one(round_ + 1) for _ in range(args.clients)))
+    result = summarize(latencies, time.perf_counter() - start)
+    result["broker_requests"] = fake.published
+    result["coalesced"] = client.coalesced
+    await broker.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--rtt-ms", type=float, default=0.5)
+    parser.add_argument("--service-ms", type=float, default=5.0, help="temps de traitement du service Order")
+    args = parser.parse_args()
+
+    configure_env("sqlite://")
+    import logging
+    import app.messaging.service  # noqa: F401  (configure le logging racine à l'import)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    report = {
+        "no_coalescing": asyncio.run(herd(args, coalesce=False)),
+        "single_flight": asyncio.run(herd(args, coalesce=True)),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
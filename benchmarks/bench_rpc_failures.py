@@ -0,0 +1,85 @@
+"""
+Débit et latence de fetch_order_products (Order puis Product) quand les services perdent
+une part des requêtes (l'appelant attend alors RPC_TIMEOUT avant d'échouer) ou répondent en erreur
+(ServiceError, 502 côté API : échec immédiat, distinct d'une liste vide).
+
+    python -m benchmarks.bench_rpc_failures --requests 2000 --concurrency 50 --timeout-ms 200 --error-rate 0.01
+
+Services simulés par le broker en mémoire (app/messaging/fake_broker.py), graine fixe :
+deux exécutions perdent exactement les mêmes requêtes. Cache de réponses désactivé.
+"""
+import argparse
+import asyncio
+import time
+from unittest.mock import patch
+
+from .common import configure_env, summarize
+from app.messaging.fake_broker import FakeBroker, order_service_responders
+
+
+async def measure(args, failure_rate: float) -> dict:
+    from app.messaging import service
+    from app.messaging.cache import NullCache
+    from app.messaging.connection import BrokerConnection
+    from app.messaging.consumer import ServiceError
+    from app.messaging.rpc import RpcClient
+
+    fake = FakeBroker(order_service_responders(), connect_latency=0, rtt=args.rtt_ms / 1000,
+                      service_latency=args.service_ms / 1000, jitter=args.jitter_ms / 1000,
+                      failure_rate=failure_rate, error_rate=args.error_rate, seed=args.seed)
+    broker = BrokerConnection(connect=fake.connect, healthcheck_interval=0)
+    client = RpcClient(broker=broker, timeout=args.timeout_ms / 1000, coalesce=False)
+    await client.start()
+    latencies = []
+    timeouts = errors = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(i: int):
+        nonlocal timeouts, errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await service.fetch_order_products(i % 1000 + 1, i)
+            except TimeoutError:
+                timeouts += 1
+            except ServiceError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    with patch.object(service, "rpc_client", client), patch.object(service, "response_cache", NullCache()):
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - start
+    await broker.close()
+
+    return {"failure_rate": failure_rate, **summarize(latencies, elapsed), "timeouts": timeouts, "errors": errors}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--failure-rates", type=float, nargs="+", default=[0, 0.01, 0.05])
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--timeout-ms", type=float, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=0.5)
+    parser.add_argument("--service-ms", type=float, default=1.0)
+    parser.add_argument("--jitter-ms", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    configure_env("sqlite://", LOG_LEVEL="CRITICAL")
+    from app.logging_config import configure_logging
+
+    # Un timeout journalise une erreur par requête perdue
+    configure_logging(level="CRITICAL")
+    results = [asyncio.run(measure(args, rate)) for rate in args.failure_rates]
+
+    print(f"{'lost':>6} {'req/s':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'timeouts':>9} {'errors':>7}")
+    for result in results:
+        print(f"{result['failure_rate']:>6.1%} {result['rps']:>9} {result['p50_ms']:>9} {result['p95_ms']:>9} "
+              f"{result['p99_ms']:>9} {result['timeouts']:>9} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Coût de la dépendance get_current_customer avec et sans cache des jetons vérifiés.
+
+    python -m benchmarks.bench_token_cache --calls 100000 --tokens 100
+
+Sans cache, chaque appel décode le JWT et vérifie sa signature (python-jose) ;
+avec le cache, un jeton déjà vu ne coûte qu'un SHA-256 et une lecture de dict.
+"""
+import argparse
+import time
+
+from .common import configure_env
+
+
+def run(calls: int, tokens: list, get_current_customer) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        get_current_customer(tokens[i % len(tokens)])
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--tokens", type=int, default=100, help="clients distincts (jetons différents)")
+    args = parser.parse_args()
+
+    configure_env("sqlite://")
+    from app import middleware
+
+    tokens = [
+        middleware.create_access_token(data={"id_customer": i, "email": f"user{i}@bench.local", "customer_type": 2})
+        for i in range(1, args.tokens + 1)
+    ]
+
+    middleware.token_cache.maxsize = 0
+    uncached_us = run(args.calls, tokens, middleware.get_current_customer)
+
+    middleware.token_cache.maxsize = max(args.tokens, 1)
+    middleware.token_cache.clear()
+    cached_us = run(args.calls, tokens, middleware.get_current_customer)
+
+    print(f"{'mode':>10} {'µs / appel':>12}")
+    print(f"{'no cache':>10} {uncached_us:>12.2f}")
+    print(f"{'cache':>10} {cached_us:>12.2f}")
+    print(f"speed-up x{uncached_us / cached_us:.1f}, {middleware.token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Requêtes SQL et latence par endpoint d'écriture (création, mise à jour, suppression).
+
+    python -m benchmarks.bench_write_statements --rounds 200
+
+Chaque requête HTTP est rejouée `--rounds` fois ; les requêtes SQL sont comptées
+par verbe via l'événement `before_cursor_execute` (BEGIN / COMMIT exclus).
+Le hachage bcrypt de POST /customers/ est remplacé par une fonction triviale :
+on ne mesure que le chemin SQL.
+"""
+import argparse
+import os
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from unittest.mock import patch
+
+from .common import configure_env, sqlite_url, seed_customers, admin_token, percentile
+
+NOW = datetime(2024, 1, 1).isoformat()
+
+
+def scenario(client, headers):
+    """Une création, une mise à jour et une suppression par ressource ; renvoie (nom, appel) dans l'ordre."""
+    state = {}
+
+    def create(name, url, payload, key):
+        def call():
+            response = client.post(url, json=payload, headers=headers)
+            assert response.status_code == 200, response.text
+            state[name] = response.json()[key]
+        return call
+
+    def patch_(url, payload, name):
+        def call():
+            response = client.patch(url.format(state[name]), json=payload, headers=headers)
+            assert response.status_code == 200, response.text
+        return call
+
+    def delete(url, name):
+        def call():
+            response = client.delete(url.format(state[name]), headers=headers)
+            assert response.status_code == 200, response.text
+        return call
+
+    customer = {
+        "name": "Bench", "created_at": NOW, "username": "bench", "first_name": "Bench", "last_name": "Write",
+        "password_hash": "secret", "last_login": NOW, "customer_type": 2,
+    }
+    counter = iter(range(1, 10**9))
+
+    def create_customer():
+        response = client.post("/customers/", json={**customer, "email": f"write{next(counter)}@bench.local"})
+        assert response.status_code == 200, response.text
+        state["customer"] = response.json()["id_customer"]
+
+    return [
+        ("POST /customers/", create_customer),
+        ("PATCH /customers/{id}", patch_("/customers/{}", {"loyalty_points": 10}, "customer")),
+        ("DELETE /customers/{id}", delete("/customers/{}", "customer")),
+        ("POST /feedbacks/", create("feedback", "/feedbacks/", {"product_id": 1, "rating": 5, "id_customer": 1}, "id_feedback")),
+        ("PATCH /feedbacks/{id}", patch_("/feedbacks/{}", {"rating": 4}, "feedback")),
+        ("DELETE /feedbacks/{id}", delete("/feedbacks/{}", "feedback")),
+        ("POST /notifications/", create("notification", "/notifications/", {"message": "Hello", "type": 1, "id_customer": 1}, "id_notification")),
+        ("PATCH /notifications/{id}", patch_("/notifications/{}", {"is_read": True}, "notification")),
+        ("DELETE /notifications/{id}", delete("/notifications/{}", "notification")),
+        ("POST /addresses/", create("address", "/addresses/", {
+            "address_line1": "1 rue", "city": "Paris", "postal_code": "75000", "country": "France",
+            "address_type": 1, "created_at": NOW, "id_customer": 1}, "id_address")),
+        ("PATCH /addresses/{id}", patch_("/addresses/{}", {"city": "Lyon"}, "address")),
+        ("DELETE /addresses/{id}", delete("/addresses/{}", "address")),
+        ("POST /login-logs/", create("log", "/login-logs/", {"login_time": NOW, "ip_address": "127.0.0.1", "user_agent": "bench", "id_customer": 1}, "id_log")),
+        ("PATCH /login-logs/{id}", patch_("/login-logs/{}", {"ip_address": "10.0.0.1"}, "log")),
+        ("DELETE /login-logs/{id}", delete("/login-logs/{}", "log")),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_env(sqlite_url(os.path.join(tmp, "bench.db")))
+        from fastapi.testclient import TestClient
+        from sqlalchemy import event
+        from app.database import engine
+        from app.main import app
+
+        seed_customers(engine, 1)
+        statements = []
+        event.listen(engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *rest: statements.append(statement.split()[0].upper()))
+
+        counts = {}
+        latencies = {}
+        with patch("app.controllers.hash_password", side_effect=lambda password: "not-a-real-hash"), \
+                TestClient(app) as client:
+            steps = scenario(client, {"Authorization": f"Bearer {admin_token()}"})
+            for _ in range(args.rounds):
+                for name, call in steps:
+                    statements.clear()
+                    start = time.perf_counter()
+                    call()
+                    latencies.setdefault(name, []).append(time.perf_counter() - start)
+                    counts.setdefault(name, Counter()).update(statements)
+
+        print(f"{'endpoint':<28} {'SQL/req':>8} {'SELECT':>7} {'INSERT':>7} {'UPDATE':>7} {'DELETE':>7} {'p50 (ms)':>9}")
+        for name, _ in steps:
+            per_request = {verb: count / args.rounds for verb, count in counts[name].items()}
+            print(f"{name:<28} {sum(per_request.values()):>8.1f} "
+                  + " ".join(f"{per_request.get(verb, 0):>7.1f}" for verb in ("SELECT", "INSERT", "UPDATE", "DELETE"))
+                  + f" {percentile(latencies[name], 50):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Outils partagés par les benchmarks : environnement, base SQLite de test, mesures.
+
+Les modules de l'application lisent leur configuration à l'import ; il faut donc
+appeler `configure_env()` avant d'importer quoi que ce soit depuis `app`.
+"""
+import logging
+import os
+import statistics
+import time
+from datetime import datetime
+
+BENCH_SECRET_KEY = "bench-secret"
+
+
+def configure_env(database_url: str, **overrides):
+    """Positionne les variables d'environnement lues par l'application."""
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SECRET_KEY", BENCH_SECRET_KEY)
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    for key, value in overrides.items():
+        os.environ[key] = str(value)
+    # Une ligne de log par requête httpx fausserait les mesures
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def sqlite_url(path: str) -> str:
+    return f"sqlite:///{path}"
+
+
+def seed_customers(engine, count: int, password_hash: str = "not-a-real-hash"):
+    """Crée le schéma et insère `count` clients avec un seul executemany."""
+    from app import models
+    from app.database import Base
+
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    rows = [
+        {
+            "name": f"Customer {i}",
+            "created_at": now,
+            "username": f"user{i}",
+            "first_name": "Bench",
+            "last_name": f"Customer{i}",
+            "phone": None,
+            "email": f"user{i}@bench.local",
+            "password_hash": password_hash,
+            "last_login": now,
+            "customer_type": 2,
+            "failed_login_attempts": 0,
+            "preferred_contact_method": 1,
+            "opt_in_marketing": False,
+            "loyalty_points": 0,
+        }
+        for i in range(1, count + 1)
+    ]
+    with engine.begin() as conn:
+        conn.execute(models.Customer.__table__.insert(), rows)
+
+
+def admin_token() -> str:
+    from app.middleware import create_access_token
+
+    return create_access_token(data={"id_customer": 1, "email": "admin@bench.local", "customer_type": 1})
+
+
+def percentile(values, pct: float) -> float:
+    """Percentile par rang le plus proche (values en secondes, résultat en ms)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index] * 1000
+
+
+def summarize(latencies, elapsed: float) -> dict:
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+    }
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
@@ -0,0 +1,297 @@
+"""
+Suite de charge reproductible : débit et latence p50/p95/p99 par scénario, dans un rapport JSON
+comparable d'un commit à l'autre.
+
+    python -m benchmarks.run_suite --requests 2000 --concurrency 50
+    python -m benchmarks.run_suite --compare benchmarks/reports/<commit>.json
+
+L'API tourne en mémoire (httpx.ASGITransport, sans réseau) contre une base SQLite temporaire
+ensemencée depuis database/data/data.json (fiches répétées jusqu'à --customers clients, avec
+adresses, notifications, avis et Login_Logs). --database-url vise une autre base, MySQL par
+exemple : elle est VIDÉE puis réensemencée, à réserver aux benchmarks.
+
+Scénarios :
+  login_storm      POST /login sur des clients tirés en boucle (bcrypt à --bcrypt-rounds)
+  profile_reads    GET /customers/{id}/profile
+  paginated_scans  GET /login-logs/?cursor=... en suivant next_cursor, page de --page-size lignes
+  bulk_writes      POST /customers/bulk par lots de --bulk-rows clients
+  order_rpcs       GET /customers/{id}/orders/{order_id}/products, services Order / Product
+                   simulés par le broker en mémoire (app/messaging/fake_broker.py), sans cache de réponses
+
+Le rapport est écrit dans benchmarks/reports/<commit>.json (ou --output) ; --compare affiche
+l'écart de débit et de p95 avec un rapport précédent.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from .common import configure_env, sqlite_url, admin_token, summarize, Timer
+from app.messaging.fake_broker import FakeBroker, order_service_responders
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), "..", "database", "data", "data.json")
+REPORTS_DIR = os.path.join(os.path.dirname(__file__), "reports")
+SCENARIOS = ["login_storm", "profile_reads", "paginated_scans", "bulk_writes", "order_rpcs"]
+PASSWORD = "password"
+
+
+def seed_from_data_json(engine, customers: int, password_hash: str, logs_per_customer: int):
+    """
+    Recrée le schéma et insère `customers` clients tirés de data.json, chacun avec 2 adresses,
+    5 notifications, 3 avis et `logs_per_customer` Login_Logs.
+    """
+    from app import models
+    from app.database import Base
+
+    with open(DATA_FILE) as f:
+        source = json.load(f)
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    rows = {table: [] for table in ("customers", "addresses", "notifications", "feedbacks", "logs")}
+    for customer_id in range(1, customers + 1):
+        record = source[(customer_id - 1) % len(source)]
+        created_at = datetime.fromisoformat(record["createdAt"].replace("Z", ""))
+        rows["customers"].append({
+            "id_customer": customer_id, "name": record["name"], "created_at": created_at,
+            "username": f"{record['username']}.{customer_id}", "first_name": record["firstName"],
+            "last_name": record["lastName"], "email": f"user{customer_id}@bench.local",
+            "password_hash": password_hash, "last_login": now,
+            # Le client 1 est l'administrateur des jetons de admin_token()
+            "customer_type": 1 if customer_id == 1 else 2, "failed_login_attempts": 0, "loyalty_points": 0,
+        })
+        rows["addresses"] += [{
+            "address_line1": f"{n} rue du Café", "city": record["address"]["city"],
+            "postal_code": record["address"]["postalCode"][:20], "country": "France",
+            "address_type": n, "created_at": created_at, "id_customer": customer_id,
+        } for n in (1, 2)]
+        order_ids = [order["id"] for order in record["orders"]] or ["0"]
+        rows["notifications"] += [{
+            "message": f"Commande {order_ids[n % len(order_ids)]} expédiée", "date_created": now - timedelta(days=n),
+            "is_read": n > 1, "type": 1, "id_customer": customer_id,
+        } for n in range(5)]
+        rows["feedbacks"] += [{
+            "product_id": n, "rating": n + 2, "comment": "Très bon café", "created_at": now, "id_customer": customer_id,
+        } for n in (1, 2, 3)]
+        rows["logs"] += [{
+            "login_time": now - timedelta(hours=n), "ip_address": "127.0.0.1", "user_agent": "bench",
+            "id_customer": customer_id,
+        } for n in range(logs_per_customer)]
+
+    tables = {
+        "customers": models.Customer.__table__, "addresses": models.Address.__table__,
+        "notifications": models.Notification.__table__, "feedbacks": models.Feedback.__table__,
+        "logs": models.LoginLog.__table__,
+    }
+    with engine.begin() as connection:
+        for name, table in tables.items():
+            connection.execute(table.insert(), rows[name])
+    return {name: len(values) for name, values in rows.items()}
+
+
+class Scenarios:
+    """
+    Une méthode par scénario : `request(client, i)` envoie la i-ème requête et renvoie la réponse.
+    """
+
+    def __init__(self, args, headers: dict):
+        self.args = args
+        self.headers = headers
+        self.next_cursor = None
+        self.bulk_ids = itertools.count(1)
+
+    def customer_id(self, i: int) -> int:
+        return i % self.args.customers + 1
+
+    async def login_storm(self, client, i):
+        return await client.post("/login", json={"email": f"user{self.customer_id(i)}@bench.local", "password": PASSWORD})
+
+    async def profile_reads(self, client, i):
+        return await client.get(f"/customers/{self.customer_id(i)}/profile", headers=self.headers)
+
+    async def paginated_scans(self, client, i):
+        from app.pagination import encode_cursor
+
+        # Les clients concurrents se partagent le parcours ; arrivé au bout, il reprend au début
+        cursor = self.next_cursor or encode_cursor([0])
+        response = await client.get("/login-logs/", params={"cursor": cursor, "limit": self.args.page_size},
+                                    headers=self.headers)
+        if response.status_code == 200:
+            self.next_cursor = response.json()["next_cursor"]
+        return response
+
+    async def bulk_writes(self, client, i):
+        rows = []
+        for _ in range(self.args.bulk_rows):
+            n = next(self.bulk_ids)
+            rows.append({
+                "created_at": "2024-01-01T00:00:00", "name": f"Bulk {n}", "username": f"bulk{n}",
+                "first_name": "Bulk", "last_name": f"Customer{n}", "email": f"bulk{n}@bench.local",
+                "last_login": "2024-01-01T00:00:00", "password_hash": PASSWORD,
+            })
+        return await client.post("/customers/bulk", json=rows, headers=self.headers)
+
+    async def order_rpcs(self, client, i):
+        customer_id = self.customer_id(i)
+        return await client.get(f"/customers/{customer_id}/orders/{customer_id * 100 + i % 3}/products")
+
+
+async def drive(client, request, requests: int, concurrency: int, warmup: int) -> dict:
+    """
+    `concurrency` clients envoient `requests` requêtes au total ; latences, codes HTTP et erreurs.
+    """
+    for i in range(warmup):
+        await request(client, i)
+
+    latencies = []
+    statuses = {}
+    indexes = iter(range(warmup, warmup + requests))
+
+    async def worker():
+        for i in indexes:
+            start = time.perf_counter()
+            response = await request(client, i)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    with Timer() as timer:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    result = summarize(latencies, timer.elapsed)
+    result["errors"] = sum(count for status, count in statuses.items() if status >= 400)
+    result["statuses"] = {str(status): count for status, count in sorted(statuses.items())}
+    return result
+
+
+async def run(args) -> dict:
+    from unittest.mock import patch
+
+    import httpx
+    from app.login_events import login_events
+    from app.main import app
+    from app.messaging import service
+    from app.messaging.cache import NullCache
+    from app.messaging.connection import BrokerConnection
+    from app.messaging.rpc import RpcClient
+
+    fake = FakeBroker(order_service_responders(), connect_latency=0, rtt=args.rtt_ms / 1000,
+                      service_latency=args.service_ms / 1000)
+    broker = BrokerConnection(connect=fake.connect, healthcheck_interval=0)
+    rpc_client = RpcClient(broker=broker)
+    scenarios = Scenarios(args, {"Authorization": f"Bearer {admin_token()}"})
+    results = {}
+
+    # Pas de lifespan avec ASGITransport : le tampon des logins est démarré ici
+    await login_events.start()
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    try:
+        with patch.object(service, "rpc_client", rpc_client), patch.object(service, "response_cache", NullCache()):
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                for name in args.scenarios:
+                    results[name] = await drive(client, getattr(scenarios, name), args.requests,
+                                                args.concurrency, args.warmup)
+                    print(f"{name:<16} {results[name]['rps']:>9} req/s  p95 {results[name]['p95_ms']} ms",
+                          file=sys.stderr)
+    finally:
+        await login_events.stop()
+        await broker.close()
+    return results
+
+
+def git_commit() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_report(report: dict, baseline: dict = None):
+    header = f"{'scenario':<16} {'req/s':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'errors':>7}"
+    print(header + (f" {'Δ req/s':>9} {'Δ p95':>8}" if baseline else ""))
+    for name, result in report["scenarios"].items():
+        line = (f"{name:<16} {result['rps']:>9} {result['p50_ms']:>9} {result['p95_ms']:>9} "
+                f"{result['p99_ms']:>9} {result['errors']:>7}")
+        previous = (baseline or {}).get("scenarios", {}).get(name)
+        if previous and previous["rps"] and previous["p95_ms"]:
+            line += (f" {(result['rps'] - previous['rps']) / previous['rps']:>+9.1%}"
+                     f" {(result['p95_ms'] - previous['p95_ms']) / previous['p95_ms']:>+8.1%}")
+        print(line)
+    if baseline:
+        print(f"\nréférence : {baseline['meta']['commit']} ({baseline['meta']['date']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--requests", type=int, default=2000, help="requêtes mesurées par scénario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=20, help="requêtes non mesurées avant chaque scénario")
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--logs-per-customer", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--bulk-rows", type=int, default=50, help="clients par POST /customers/bulk")
+    parser.add_argument("--bcrypt-rounds", type=int, default=4, help="4 : minimum bcrypt, pour mesurer l'API")
+    parser.add_argument("--rtt-ms", type=float, default=0.5, help="aller-retour AMQP simulé")
+    parser.add_argument("--service-ms", type=float, default=1.0, help="temps de traitement des services simulés")
+    parser.add_argument("--database-url", help="base dédiée (vidée puis réensemencée) ; défaut : SQLite temporaire")
+    parser.add_argument("--db-mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--output", help="défaut : benchmarks/reports/<commit>.json")
+    parser.add_argument("--compare", help="rapport JSON précédent à comparer")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or sqlite_url(os.path.join(tmp, "bench.db"))
+        configure_env(database_url, DB_MODE=args.db_mode, LOG_LEVEL="WARNING", METRICS_ENABLED="false",
+                      PASSWORD_HASH_QUEUE_SIZE=max(args.concurrency, 64))
+        from app.database import engine
+        from app.middleware import hash_password, pwd_context
+
+        pwd_context.update(bcrypt__rounds=args.bcrypt_rounds)
+        seeded = seed_from_data_json(engine, args.customers, hash_password(PASSWORD), args.logs_per_customer)
+        if engine.dialect.name == "sqlite":
+            # WAL : les lectures ne bloquent pas les écritures groupées des logins
+            with engine.connect() as connection:
+                connection.exec_driver_sql("PRAGMA journal_mode=WAL")
+
+        scenarios = asyncio.run(run(args))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": engine.dialect.name,
+            "db_mode": args.db_mode,
+            "seeded": seeded,
+            "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        },
+        "scenarios": scenarios,
+    }
+    output = args.output or os.path.join(REPORTS_DIR, f"{report['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"\nrapport : {output}")
+
+
+if __name__ == "__main__":
+    main()
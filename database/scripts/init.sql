@@ -48,7 +48,7 @@ CREATE TABLE Notifications(
    id_notification INT AUTO_INCREMENT,
    message VARCHAR(255) NOT NULL,
    date_created DATETIME,
-   is_read BOOLEAN DEFAULT FALSE,
+   is_read BOOLEAN NOT NULL DEFAULT FALSE,
    type INT NOT NULL,
    id_customer INT NOT NULL,
    PRIMARY KEY(id_notification),
@@ -100,6 +100,20 @@ CREATE TABLE Customer_Feedback(
    FOREIGN KEY(id_customer) REFERENCES Customers(id_customer)
 );
 
+-- Index des recherches fréquentes (migration Alembic 0002)
+CREATE INDEX ix_Login_Logs_id_customer_login_time ON Login_Logs (id_customer, login_time);
+CREATE INDEX ix_Notifications_id_customer_is_read ON Notifications (id_customer, is_read);
+CREATE INDEX ix_Customer_Feedback_product_id_created_at ON Customer_Feedback (product_id, created_at);
+CREATE INDEX ix_Customer_Feedback_id_customer ON Customer_Feedback (id_customer);
+CREATE INDEX ix_Addresses_id_customer ON Addresses (id_customer);
+
+-- Schéma à jour : `alembic upgrade head` n'appliquera que les migrations suivantes
+CREATE TABLE alembic_version(
+   version_num VARCHAR(32) NOT NULL,
+   PRIMARY KEY(version_num)
+);
+INSERT INTO alembic_version (version_num) VALUES ('0003');
+
 INSERT INTO Customers (name, created_at, updated_at, username, first_name, last_name, phone, email, password_hash, last_login, customer_type, failed_login_attempts, preferred_contact_method, opt_in_marketing, loyalty_points) 
 VALUES 
 ('CaféLover', NOW(), NULL, 'cafefan123', 'Jean', 'Dupont', '612345678', 'jean.dupont@example.com', '$2b$12$sBu.zaAskPVy8QUUmHUPPu9vi33B0SXLzOe9qO5dJ2G5qQwVDJ4Ve', NOW(), 2, 0, 1, TRUE, 120),
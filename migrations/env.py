@@ -0,0 +1,54 @@
+import os
+from logging.config import fileConfig
+
+from alembic import context
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, pool
+
+load_dotenv()
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+# Une URL passée explicitement (tests, -x url=...) l'emporte sur DATABASE_URL
+DATABASE_URL = (
+    context.get_x_argument(as_dictionary=True).get("url")
+    or config.get_main_option("sqlalchemy.url")
+    or os.getenv("DATABASE_URL")
+)
+if DATABASE_URL:
+    # app.database crée son engine à l'import à partir de DATABASE_URL
+    os.environ.setdefault("DATABASE_URL", DATABASE_URL)
+
+from app import models  # noqa: E402  (enregistre les tables sur Base.metadata)
+from app.database import Base  # noqa: E402
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    """
+    Génère le SQL sans se connecter (`alembic upgrade head --sql`).
+    """
+    context.configure(url=DATABASE_URL, target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connectable = config.attributes.get("connection")
+    if connectable is None:
+        connectable = create_engine(DATABASE_URL, poolclass=pool.NullPool)
+
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
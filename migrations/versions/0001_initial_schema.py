@@ -0,0 +1,104 @@
+"""Schéma initial (tables de database/scripts/init.sql)
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-11-04 10:00:00
+
+Une base déjà créée par init.sql avant l'introduction des migrations se
+marque avec `alembic stamp 0001` puis `alembic upgrade head`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "Customers",
+        sa.Column("id_customer", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(80), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("username", sa.String(80), nullable=False),
+        sa.Column("first_name", sa.String(80), nullable=False),
+        sa.Column("last_name", sa.String(80), nullable=False),
+        sa.Column("phone", sa.String(15)),
+        sa.Column("email", sa.String(100), nullable=False),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("last_login", sa.DateTime(), nullable=False),
+        sa.Column("customer_type", sa.Integer(), nullable=False),
+        sa.Column("failed_login_attempts", sa.Integer()),
+        sa.Column("preferred_contact_method", sa.Integer()),
+        sa.Column("opt_in_marketing", sa.Boolean()),
+        sa.Column("loyalty_points", sa.Integer(), nullable=False),
+        sa.UniqueConstraint("email"),
+    )
+    op.create_table(
+        "Companies",
+        sa.Column("id_company", sa.Integer(), primary_key=True),
+        sa.Column("company_name", sa.String(80), nullable=False),
+        sa.Column("siret", sa.String(15), nullable=False),
+        sa.Column("address", sa.String(255), nullable=False),
+        sa.Column("postal_code", sa.String(10), nullable=False),
+        sa.Column("city", sa.String(90), nullable=False),
+        sa.Column("phone", sa.String(15)),
+        sa.Column("email", sa.String(100)),
+        sa.UniqueConstraint("siret"),
+        sa.UniqueConstraint("email"),
+    )
+    op.create_table(
+        "Notifications",
+        sa.Column("id_notification", sa.Integer(), primary_key=True),
+        sa.Column("message", sa.String(255), nullable=False),
+        sa.Column("date_created", sa.DateTime()),
+        sa.Column("is_read", sa.Boolean()),
+        sa.Column("type", sa.Integer(), nullable=False),
+        sa.Column("id_customer", sa.Integer(), sa.ForeignKey("Customers.id_customer"), nullable=False),
+    )
+    op.create_table(
+        "Addresses",
+        sa.Column("id_address", sa.Integer(), primary_key=True),
+        sa.Column("address_line1", sa.String(255), nullable=False),
+        sa.Column("address_line2", sa.String(255)),
+        sa.Column("city", sa.String(100), nullable=False),
+        sa.Column("state", sa.String(100)),
+        sa.Column("postal_code", sa.String(20), nullable=False),
+        sa.Column("country", sa.String(100), nullable=False),
+        sa.Column("address_type", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("id_customer", sa.Integer(), sa.ForeignKey("Customers.id_customer"), nullable=False),
+    )
+    op.create_table(
+        "Login_Logs",
+        sa.Column("id_log", sa.Integer(), primary_key=True),
+        sa.Column("login_time", sa.DateTime(), nullable=False),
+        sa.Column("ip_address", sa.String(45)),
+        sa.Column("user_agent", sa.String(255)),
+        sa.Column("id_customer", sa.Integer(), sa.ForeignKey("Customers.id_customer"), nullable=False),
+    )
+    op.create_table(
+        "Customer_Companies",
+        sa.Column("id_customer", sa.Integer(), sa.ForeignKey("Customers.id_customer"), primary_key=True),
+        sa.Column("id_company", sa.Integer(), sa.ForeignKey("Companies.id_company"), primary_key=True),
+    )
+    op.create_table(
+        "Customer_Feedback",
+        sa.Column("id_feedback", sa.Integer(), primary_key=True),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("rating", sa.Integer()),
+        sa.Column("comment", sa.String(50)),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("id_customer", sa.Integer(), sa.ForeignKey("Customers.id_customer"), nullable=False),
+    )
+
+
+def downgrade():
+    for table in ("Customer_Feedback", "Customer_Companies", "Login_Logs", "Addresses", "Notifications",
+                  "Companies", "Customers"):
+        op.drop_table(table)
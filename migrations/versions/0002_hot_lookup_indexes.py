@@ -0,0 +1,35 @@
+"""Index des recherches fréquentes (enfants d'un client, feedbacks d'un produit)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-11-04 10:30:00
+
+Les colonnes de tête sont celles des filtres d'égalité, la suivante celle du tri
+ou du second filtre : `WHERE id_customer = ? ORDER BY login_time` se lit dans l'index.
+Sur MySQL, l'index composite remplace l'index implicite de la clé étrangère.
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_Login_Logs_id_customer_login_time", "Login_Logs", ["id_customer", "login_time"]),
+    ("ix_Notifications_id_customer_is_read", "Notifications", ["id_customer", "is_read"]),
+    ("ix_Customer_Feedback_product_id_created_at", "Customer_Feedback", ["product_id", "created_at"]),
+    ("ix_Customer_Feedback_id_customer", "Customer_Feedback", ["id_customer"]),
+    ("ix_Addresses_id_customer", "Addresses", ["id_customer"]),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
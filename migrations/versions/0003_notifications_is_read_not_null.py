@@ -0,0 +1,32 @@
+"""Notifications.is_read NOT NULL
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-11-04 11:00:00
+
+« Non lue » s'écrit `is_read = false` dans les lectures (égalité : la page et le compte
+des non lues se lisent dans l'index (id_customer, is_read)), alors qu'un UPDATE
+`is_read IS NOT TRUE` marquait aussi les lignes NULL. Les NULL existants deviennent
+des notifications non lues, puis la colonne les refuse.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    notifications = sa.table("Notifications", sa.column("is_read", sa.Boolean()))
+    op.execute(notifications.update().where(notifications.c.is_read.is_(None)).values(is_read=False))
+    # batch : SQLite ne sait pas modifier une colonne, la table est recopiée
+    with op.batch_alter_table("Notifications") as batch:
+        batch.alter_column("is_read", existing_type=sa.Boolean(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table("Notifications") as batch:
+        batch.alter_column("is_read", existing_type=sa.Boolean(), nullable=True)
@@ -0,0 +1,144 @@
+import unittest
+from contextlib import contextmanager
+from datetime import datetime
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.database import Base, SessionLocal, get_db
+from app.main import app
+from app.middleware import get_current_customer
+from app.models import Customer
+from app.sql_stats import counting_enabled, disable_statement_counting, enable_lazyload_guard
+from app.sql_stats import enable_statement_counting, record_requests, track_statements
+
+ADMIN = {"id_customer": 1, "customer_type": 1}
+NOW = datetime(2024, 1, 1)
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "max_sql_statements(n): chaque requête HTTP du test exécute au plus n requêtes SQL",
+    )
+    # Un chargement paresseux oublié (N+1) fait échouer le test qui le déclenche
+    enable_lazyload_guard()
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    """
+    Applique @pytest.mark.max_sql_statements(n) : seules les requêtes passées par l'API
+    (TestClient) sont comptées, pas les données insérées par setUp.
+    """
+    marker = item.get_closest_marker("max_sql_statements")
+    if marker is None:
+        return (yield)
+
+    with record_requests() as requests:
+        result = yield
+    over = [request for request in requests if request.count > marker.args[0]]
+    if over:
+        pytest.fail("\n".join(
+            f"{request.method} {request.route}: {request.count} SQL statements (max {marker.args[0]})\n  "
+            + "\n  ".join(request.statements)
+            for request in over
+        ), pytrace=False)
+    return result
+
+
+@pytest.fixture
+def sql_statements():
+    """
+    Bilans (route, requêtes SQL) des requêtes HTTP traitées pendant le test.
+    """
+    with record_requests() as requests:
+        yield requests
+
+
+@contextmanager
+def count_statements():
+    """
+    Requêtes SQL exécutées dans le bloc hors requête HTTP (écritures d'une tâche de fond, contrôleur appelé directement).
+    """
+    was_enabled = counting_enabled()
+    enable_statement_counting()
+    try:
+        with track_statements() as counter:
+            yield counter
+    finally:
+        if not was_enabled:
+            disable_statement_counting()
+
+
+def make_engine():
+    """
+    Base SQLite en mémoire, tables créées, partagée entre threads (threadpool de run_db, streaming).
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def session_factory(engine):
+    """
+    Sessions sur `engine` avec les options de SessionLocal (autoflush, expire_on_commit).
+    """
+    return sessionmaker(**{**SessionLocal.kw, "bind": engine})
+
+
+def make_customer(i: int, **overrides) -> Customer:
+    fields = dict(name=f"Customer {i}", created_at=NOW, username=f"user{i}", first_name="First",
+                  last_name="Last", email=f"user{i}@example.com", password_hash="hash",
+                  last_login=NOW, customer_type=2, loyalty_points=0)
+    return Customer(**{**fields, **overrides})
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """
+    Base SQLite neuve pour chaque test, remplie par `seed(session)`.
+    """
+
+    def setUp(self):
+        self.engine = make_engine()
+        self.Session = session_factory(self.engine)
+        with self.Session() as session:
+            self.seed(session)
+            session.commit()
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def seed(self, session):
+        pass
+
+
+class ApiTestCase(DatabaseTestCase):
+    """
+    TestClient sur l'application, get_db servi par la base de test, authentifié en `current_customer`.
+    Les requêtes SQL de chaque requête HTTP sont collectées dans `sql_requests`.
+    """
+    current_customer = ADMIN
+
+    def setUp(self):
+        super().setUp()
+
+        def override_get_db():
+            with self.Session() as db:
+                yield db
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_customer] = lambda: self.current_customer
+        self.sql_requests = self.enterContext(record_requests())
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        app.dependency_overrides.clear()
+        super().tearDown()
+
+    def last_statements(self) -> list:
+        """
+        Requêtes SQL de la dernière requête HTTP.
+        """
+        return self.sql_requests[-1].statements
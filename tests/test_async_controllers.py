@@ -0,0 +1,143 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from app.async_controllers import (
+    get_customer_by_id, create_customer, update_customer, delete_customer,
+    get_feedbacks, create_notification, delete_login_log, create_customer_company,
+    create_notifications, mark_notifications_read, get_customer_profile
+)
+from app.models import Customer, Feedback, LoginLog, CustomerCompany, Notification
+from app.schemas import CustomerCreate, CustomerUpdate, NotificationCreate, CustomerCompanyCreate
+from datetime import datetime
+
+
+def scalars_result(items):
+    result = MagicMock()
+    result.scalars.return_value.first.return_value = items[0] if items else None
+    result.scalars.return_value.all.return_value = items
+    return result
+
+
+class TestAsyncController(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        # AsyncSession simulée : execute/get/commit/refresh/delete sont des coroutines, add ne l'est pas
+        self.db = MagicMock()
+        self.db.execute = AsyncMock()
+        self.db.get = AsyncMock(return_value=None)
+        self.db.commit = AsyncMock()
+        self.db.rollback = AsyncMock()
+        self.db.refresh = AsyncMock()
+        self.db.delete = AsyncMock()
+
+    async def test_get_customer_profile_fixed_statements(self):
+        customer = Customer(id_customer=1, name="John Doe")
+        notification = Notification(id_notification=3, message="Hello", type=1, id_customer=1)
+        feedback = Feedback(id_feedback=2, product_id=1, id_customer=1)
+        self.db.execute.side_effect = [scalars_result([customer]), scalars_result([notification]), scalars_result([feedback])]
+
+        profile = await get_customer_profile(self.db, 1, recent=1)
+        # Client (relations chargées par selectinload dans la même exécution), puis les deux listes récentes
+        self.assertEqual(self.db.execute.await_count, 3)
+        self.assertIs(profile["customer"], customer)
+        self.assertEqual(profile["recent_notifications"], [notification])
+        self.assertEqual(profile["recent_feedbacks"], [feedback])
+
+    async def test_get_customer_profile_not_found(self):
+        self.db.execute.return_value = scalars_result([])
+
+        self.assertIsNone(await get_customer_profile(self.db, 1))
+        self.db.execute.assert_awaited_once()
+
+    async def test_get_customer_by_id(self):
+        self.db.get.return_value = Customer(id_customer=1, name="John Doe")
+
+        result = await get_customer_by_id(self.db, 1)
+        self.db.get.assert_awaited_once_with(Customer, 1)
+        self.db.execute.assert_not_awaited()
+        self.assertEqual(result.name, "John Doe")
+
+    @patch("app.async_controllers.hash_password_async", new_callable=AsyncMock, return_value="hashed_password")
+    async def test_create_customer(self, mock_hash_password):
+        customer_create = CustomerCreate(
+            name="John Doe", created_at=datetime.now(), username="johndoe", first_name="John",
+            last_name="Doe", email="johndoe@example.com", password_hash="password123",
+            last_login=datetime.now(), customer_type=2
+        )
+
+        result = await create_customer(self.db, customer_create)
+        self.db.add.assert_called_once()
+        self.db.commit.assert_awaited_once()
+        mock_hash_password.assert_awaited_once_with("password123")
+        self.assertEqual(result.password_hash, "hashed_password")
+
+    async def test_update_customer_not_found(self):
+        with self.assertRaises(HTTPException) as context:
+            await update_customer(self.db, 1, CustomerUpdate(first_name="John"))
+        self.assertEqual(context.exception.status_code, 404)
+        self.db.execute.assert_not_awaited()
+
+    async def test_update_customer_merges_in_memory(self):
+        self.db.get.return_value = Customer(id_customer=1, name="John Doe", first_name="John")
+
+        result = await update_customer(self.db, 1, CustomerUpdate(first_name="Johnny"))
+        self.db.execute.assert_awaited_once()
+        self.db.commit.assert_awaited_once()
+        self.db.refresh.assert_not_awaited()
+        self.assertEqual(result.first_name, "Johnny")
+
+    async def test_delete_customer(self):
+        mock_customer = Customer(id_customer=1, name="John Doe")
+        self.db.get.return_value = mock_customer
+
+        result = await delete_customer(self.db, 1)
+        self.db.delete.assert_not_awaited()
+        self.assertEqual(self.db.execute.await_count, 2)
+        self.assertEqual(result, mock_customer)
+
+    async def test_get_feedbacks(self):
+        self.db.execute.return_value = scalars_result([Feedback(id_feedback=1), Feedback(id_feedback=2)])
+
+        result = await get_feedbacks(self.db, skip=0, limit=2)
+        self.assertEqual(len(result), 2)
+
+    async def test_create_notification(self):
+        notification = NotificationCreate(message="Hello", type=1, id_customer=1)
+
+        result = await create_notification(self.db, notification)
+        self.db.add.assert_called_once()
+        self.db.refresh.assert_not_awaited()
+        self.assertEqual(result.message, "Hello")
+
+    async def test_create_notifications_single_statement(self):
+        notifications = [NotificationCreate(message=f"Hello {i}", type=1, id_customer=1) for i in range(3)]
+
+        self.assertEqual(await create_notifications(self.db, notifications), 3)
+        self.db.execute.assert_awaited_once()
+        self.db.add.assert_not_called()
+
+    async def test_mark_notifications_read(self):
+        self.db.execute.return_value = MagicMock(rowcount=4)
+
+        self.assertEqual(await mark_notifications_read(self.db, customer_id=1), 4)
+        self.db.execute.assert_awaited_once()
+        self.db.commit.assert_awaited_once()
+
+    async def test_delete_login_log_not_found(self):
+        self.assertIsNone(await delete_login_log(self.db, 1))
+        self.db.execute.assert_not_awaited()
+        self.db.commit.assert_not_awaited()
+
+    async def test_create_customer_company_existing(self):
+        self.db.commit.side_effect = IntegrityError("INSERT", {}, Exception("Duplicate entry"))
+
+        with self.assertRaises(HTTPException) as context:
+            await create_customer_company(self.db, CustomerCompanyCreate(id_customer=1, id_company=1))
+        self.assertEqual(context.exception.status_code, 400)
+        self.db.rollback.assert_awaited_once()
+        self.db.execute.assert_not_awaited()
+
+
+if __name__ == '__main__':
+    unittest.main()
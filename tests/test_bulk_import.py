@@ -0,0 +1,77 @@
+import json
+import unittest
+from unittest.mock import patch
+from app import controllers
+from app.models import Customer
+from tests.conftest import ApiTestCase
+
+
+def customer_row(i, **overrides):
+    row = {
+        "created_at": "2024-01-01T00:00:00", "name": f"Customer {i}", "username": f"user{i}",
+        "first_name": "First", "last_name": "Last", "email": f"user{i}@example.com",
+        "last_login": "2024-01-01T00:00:00", "password_hash": f"secret{i}",
+    }
+    row.update(overrides)
+    return row
+
+
+@patch("app.bulk_import.hash_password", side_effect=lambda password: f"hashed-{password}")
+@patch("app.bulk_import.BULK_INSERT_BATCH_SIZE", 2)
+class TestBulkImport(ApiTestCase):
+
+    def stored_emails(self):
+        session = self.Session()
+        try:
+            return [email for (email,) in session.query(Customer.email).order_by(Customer.id_customer)]
+        finally:
+            session.close()
+
+    def test_json_array_with_per_row_errors(self, mock_hash):
+        rows = [customer_row(1), customer_row(2, email=None), customer_row(3), customer_row(1, username="dup"), customer_row(4)]
+
+        with patch("app.controllers.bulk_create_customers", wraps=controllers.bulk_create_customers) as mock_bulk:
+            response = self.client.post("/customers/bulk", json=rows)
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["inserted"], 3)
+        self.assertEqual([error["index"] for error in body["errors"]], [1, 3])
+        # Lots de 2 lignes valides : (0, 2) puis (4,)
+        self.assertEqual(mock_bulk.call_count, 2)
+        self.assertEqual(self.stored_emails(), ["user1@example.com", "user3@example.com", "user4@example.com"])
+
+        session = self.Session()
+        self.assertEqual(session.query(Customer).first().password_hash, "hashed-secret1")
+        session.close()
+
+    def test_ndjson_upload(self, mock_hash):
+        lines = [json.dumps(customer_row(i)) for i in range(1, 4)] + ["{not json"]
+        body = ("\n".join(lines) + "\n").encode()
+
+        response = self.client.post("/customers/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+        self.assertEqual(response.json()["inserted"], 3)
+        self.assertEqual(response.json()["errors"][0]["index"], 3)
+        self.assertEqual(len(self.stored_emails()), 3)
+
+    def test_existing_email_is_reported(self, mock_hash):
+        self.client.post("/customers/bulk", json=[customer_row(1)])
+
+        response = self.client.post("/customers/bulk", json=[customer_row(1), customer_row(2)])
+
+        self.assertEqual(response.json()["inserted"], 1)
+        self.assertEqual(response.json()["errors"], [{"index": 0, "detail": "Email already registered"}])
+
+    def test_body_must_be_an_array(self, mock_hash):
+        response = self.client.post("/customers/bulk", json=customer_row(1))
+        self.assertEqual(response.status_code, 400)
+
+    def test_admin_only(self, mock_hash):
+        self.current_customer = {"id_customer": 2, "customer_type": 2}
+        response = self.client.post("/customers/bulk", json=[customer_row(1)])
+        self.assertEqual(response.status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -46,10 +46,10 @@ class TestController(unittest.TestCase):
 
     def test_get_customer_by_id(self):
         mock_customer = Customer(id_customer=1, name="John Doe")
-        self.db.query().filter().first.return_value = mock_customer
+        self.db.get.return_value = mock_customer
 
         result = get_customer_by_id(self.db, 1)
-        self.db.query().filter().first.assert_called_once()
+        self.db.get.assert_called_once()
         self.assertEqual(result.name, "John Doe")
 
     @patch("app.controllers.hash_password")
@@ -76,27 +76,30 @@ class TestController(unittest.TestCase):
         result = create_customer(self.db, customer_create)
         self.db.add.assert_called_once()
         self.db.commit.assert_called_once()
-        self.db.refresh.assert_called_once()
+        self.db.refresh.assert_not_called()
         mock_hash_password.assert_called_once_with("password123")
 
     def test_update_customer(self):
         mock_customer = Customer(id_customer=1, name="John Doe")
-        self.db.query().filter().first.return_value = mock_customer
+        self.db.get.return_value = mock_customer
 
         customer_update = CustomerUpdate(first_name="John Updated", loyalty_points=150)
 
         result = update_customer(self.db, 1, customer_update)
         self.db.commit.assert_called_once()
-        self.db.refresh.assert_called_once()
+        self.db.execute.assert_called_once()
+        self.db.refresh.assert_not_called()
         self.assertEqual(result.first_name, "John Updated")
         self.assertEqual(result.loyalty_points, 150)
 
     def test_delete_customer(self):
         mock_customer = Customer(id_customer=1, name="John Doe")
-        self.db.query().filter().first.return_value = mock_customer
+        self.db.get.return_value = mock_customer
 
         result = delete_customer(self.db, 1)
-        self.db.delete.assert_called_once_with(mock_customer)
+        self.db.delete.assert_not_called()
+        # DELETE des liens Customer_Companies puis DELETE de la ligne
+        self.assertEqual(self.db.execute.call_count, 2)
         self.db.commit.assert_called_once()
         self.assertEqual(result.name, "John Doe")
 
@@ -118,10 +121,10 @@ class TestController(unittest.TestCase):
 
     def test_get_company_by_id(self):
         mock_company = Company(id_company=1, company_name="Company 1")
-        self.db.query().filter().first.return_value = mock_company
+        self.db.get.return_value = mock_company
 
         result = get_company_by_id(self.db, 1)
-        self.db.query().filter().first.assert_called_once()
+        self.db.get.assert_called_once()
         self.assertEqual(result.company_name, "Company 1")
 
     def test_create_company(self):
@@ -138,7 +141,7 @@ class TestController(unittest.TestCase):
         result = create_company(self.db, company_create)
         self.db.add.assert_called_once()
         self.db.commit.assert_called_once()
-        self.db.refresh.assert_called_once()
+        self.db.refresh.assert_not_called()
 
     # def test_update_company(self):
     #     mock_company = Company(id_company=1, company_name="Old Company")
@@ -153,10 +156,12 @@ class TestController(unittest.TestCase):
 
     def test_delete_company(self):
         mock_company = Company(id_company=1, company_name="Company 1")
-        self.db.query().filter().first.return_value = mock_company
+        self.db.get.return_value = mock_company
 
         result = delete_company(self.db, 1)
-        self.db.delete.assert_called_once_with(mock_company)
+        self.db.delete.assert_not_called()
+        # DELETE des liens Customer_Companies puis DELETE de la ligne
+        self.assertEqual(self.db.execute.call_count, 2)
         self.db.commit.assert_called_once()
         self.assertEqual(result.company_name, "Company 1")
 
@@ -182,10 +187,10 @@ class TestController(unittest.TestCase):
 
     def test_get_feedback_by_id(self):
         mock_feedback = Feedback(id_feedback=1, rating=5)
-        self.db.query().filter().first.return_value = mock_feedback
+        self.db.get.return_value = mock_feedback
 
         result = get_feedback_by_id(self.db, 1)
-        self.db.query().filter().first.assert_called_once()
+        self.db.get.assert_called_once()
         self.assertEqual(result.rating, 5)
 
     def test_create_feedback(self):
@@ -194,26 +199,27 @@ class TestController(unittest.TestCase):
         result = create_feedback(self.db, feedback_create)
         self.db.add.assert_called_once()
         self.db.commit.assert_called_once()
-        self.db.refresh.assert_called_once()
+        self.db.refresh.assert_not_called()
 
     def test_update_feedback(self):
         mock_feedback = Feedback(id_feedback=1, rating=5)
-        self.db.query().filter().first.return_value = mock_feedback
+        self.db.get.return_value = mock_feedback
 
         feedback_update = FeedbackUpdate(rating=4, comment="Updated comment")
 
         result = update_feedback(self.db, 1, feedback_update)
         self.db.commit.assert_called_once()
-        self.db.refresh.assert_called_once()
+        self.db.refresh.assert_not_called()
         self.assertEqual(result.rating, 4)
         self.assertEqual(result.comment, "Updated comment")
 
     def test_delete_feedback(self):
         mock_feedback = Feedback(id_feedback=1, rating=5)
-        self.db.query().filter().first.return_value = mock_feedback
+        self.db.get.return_value = mock_feedback
 
         result = delete_feedback(self.db, 1)
-        self.db.delete.assert_called_once_with(mock_feedback)
+        self.db.delete.assert_not_called()
+        self.db.execute.assert_called_once()
         self.db.commit.assert_called_once()
         self.assertEqual(result.rating, 5)
 
@@ -245,10 +251,10 @@ class TestController(unittest.TestCase):
 
     def test_get_notification_by_id(self):
         mock_notification = Notification(id_notification=1, message="Test notification")
-        self.db.query().filter().first.return_value = mock_notification
+        self.db.get.return_value = mock_notification
 
         result = get_notification_by_id(self.db, 1)
-        self.db.query().filter().first.assert_called_once()
+        self.db.get.assert_called_once()
         self.assertEqual(result.message, "Test notification")
 
     def test_create_notification(self):
@@ -263,25 +269,26 @@ class TestController(unittest.TestCase):
         result = create_notification(self.db, notification_create)
         self.db.add.assert_called_once()
         self.db.commit.assert_called_once()
-        self.db.refresh.assert_called_once()
+        self.db.refresh.assert_not_called()
 
     def test_update_notification(self):
         mock_notification = Notification(id_notification=1, message="Old Message")
-        self.db.query().filter().first.return_value = mock_notification
+        self.db.get.return_value = mock_notification
 
         notification_update = NotificationUpdate(message="Updated Message")
 
         result = update_notification(self.db, 1, notification_update)
         self.db.commit.assert_called_once()
-        self.db.refresh.assert_called_once()
+        self.db.refresh.assert_not_called()
         self.assertEqual(result.message, "Updated Message")
 
     def test_delete_notification(self):
         mock_notification = Notification(id_notification=1, message="Message 1")
-        self.db.query().filter().first.return_value = mock_notification
+        self.db.get.return_value = mock_notification
 
         result = delete_notification(self.db, 1)
-        self.db.delete.assert_called_once_with(mock_notification)
+        self.db.delete.assert_not_called()
+        self.db.execute.assert_called_once()
         self.db.commit.assert_called_once()
         self.assertEqual(result.message, "Message 1")
 
@@ -301,10 +308,10 @@ class TestController(unittest.TestCase):
 
     def test_get_address_by_id(self):
         mock_address = Address(id_address=1, address_line1="123 Main St")
-        self.db.query().filter().first.return_value = mock_address
+        self.db.get.return_value = mock_address
 
         result = get_address_by_id(self.db, 1)
-        self.db.query().filter().first.assert_called_once()
+        self.db.get.assert_called_once()
         self.assertEqual(result.address_line1, "123 Main St")
 
     def test_create_address(self):
@@ -321,25 +328,26 @@ class TestController(unittest.TestCase):
         result = create_address(self.db, address_create)
         self.db.add.assert_called_once()
         self.db.commit.assert_called_once()
-        self.db.refresh.assert_called_once()
+        self.db.refresh.assert_not_called()
 
     def test_update_address(self):
         mock_address = Address(id_address=1, address_line1="123 Main St")
-        self.db.query().filter().first.return_value = mock_address
+        self.db.get.return_value = mock_address
 
         address_update = AddressUpdate(address_line1="456 Elm St")
 
         result = update_address(self.db, 1, address_update)
         self.db.commit.assert_called_once()
-        self.db.refresh.assert_called_once()
+        self.db.refresh.assert_not_called()
         self.assertEqual(result.address_line1, "456 Elm St")
 
     def test_delete_address(self):
         mock_address = Address(id_address=1, address_line1="123 Main St")
-        self.db.query().filter().first.return_value = mock_address
+        self.db.get.return_value = mock_address
 
         result = delete_address(self.db, 1)
-        self.db.delete.assert_called_once_with(mock_address)
+        self.db.delete.assert_not_called()
+        self.db.execute.assert_called_once()
         self.db.commit.assert_called_once()
         self.assertEqual(result.address_line1, "123 Main St")
 
@@ -366,10 +374,10 @@ class TestController(unittest.TestCase):
 
     def test_get_login_log_by_id(self):
         mock_log = LoginLog(id_log=1, ip_address="127.0.0.1")
-        self.db.query().filter().first.return_value = mock_log
+        self.db.get.return_value = mock_log
 
         result = get_login_log_by_id(self.db, 1)
-        self.db.query().filter().first.assert_called_once()
+        self.db.get.assert_called_once()
         self.assertEqual(result.ip_address, "127.0.0.1")
 
     def test_create_login_log(self):
@@ -383,25 +391,26 @@ class TestController(unittest.TestCase):
         result = create_login_log(self.db, login_log_create)
         self.db.add.assert_called_once()
         self.db.commit.assert_called_once()
-        self.db.refresh.assert_called_once()
+        self.db.refresh.assert_not_called()
 
     def test_update_login_log(self):
         mock_log = LoginLog(id_log=1, ip_address="127.0.0.1")
-        self.db.query().filter().first.return_value = mock_log
+        self.db.get.return_value = mock_log
 
         login_log_update = LoginLogUpdate(ip_address="192.168.0.1")
 
         result = update_login_log(self.db, 1, login_log_update)
         self.db.commit.assert_called_once()
-        self.db.refresh.assert_called_once()
+        self.db.refresh.assert_not_called()
         self.assertEqual(result.ip_address, "192.168.0.1")
 
     def test_delete_login_log(self):
         mock_log = LoginLog(id_log=1, ip_address="127.0.0.1")
-        self.db.query().filter().first.return_value = mock_log
+        self.db.get.return_value = mock_log
 
         result = delete_login_log(self.db, 1)
-        self.db.delete.assert_called_once_with(mock_log)
+        self.db.delete.assert_not_called()
+        self.db.execute.assert_called_once()
         self.db.commit.assert_called_once()
         self.assertEqual(result.ip_address, "127.0.0.1")
 
@@ -428,10 +437,10 @@ class TestController(unittest.TestCase):
 
     def test_get_customer_company_by_ids(self):
         mock_customer_company = CustomerCompany(id_customer=1, id_company=1)
-        self.db.query().filter().first.return_value = mock_customer_company
+        self.db.get.return_value = mock_customer_company
 
         result = get_customer_company_by_ids(self.db, 1, 1)
-        self.db.query().filter().first.assert_called_once()
+        self.db.get.assert_called_once()
         self.assertEqual(result.id_customer, 1)
         self.assertEqual(result.id_company, 1)
 
@@ -445,20 +454,21 @@ class TestController(unittest.TestCase):
 
     def test_update_customer_company(self):
         mock_customer_company = CustomerCompany(id_customer=1, id_company=1)
-        self.db.query().filter().first.return_value = mock_customer_company
+        self.db.get.return_value = mock_customer_company
 
         customer_company_update = CustomerCompanyUpdate(id_customer=1, id_company=2)
 
         result = update_customer_company(self.db, 1, 1, customer_company_update)
         self.db.commit.assert_called_once()
-        self.db.refresh.assert_called_once()
+        self.db.refresh.assert_not_called()
 
     def test_delete_customer_company(self):
         mock_customer_company = CustomerCompany(id_customer=1, id_company=1)
-        self.db.query().filter().first.return_value = mock_customer_company
+        self.db.get.return_value = mock_customer_company
 
         result = delete_customer_company(self.db, 1, 1)
-        self.db.delete.assert_called_once_with(mock_customer_company)
+        self.db.delete.assert_not_called()
+        self.db.execute.assert_called_once()
         self.db.commit.assert_called_once()
 
 
@@ -0,0 +1,63 @@
+import unittest
+import pytest
+from app.models import Address, Company, CustomerCompany, Feedback, Notification
+from tests.conftest import ADMIN, NOW, ApiTestCase, make_customer
+
+CUSTOMER = {"id_customer": 2, "customer_type": 2}
+# Client + adresses + entreprises (selectinload) + notifications + feedbacks récents
+PROFILE_STATEMENTS = 5
+
+
+class TestCustomerProfile(ApiTestCase):
+    current_customer = CUSTOMER
+
+    def seed(self, session):
+        session.add_all([make_customer(i) for i in (1, 2, 3)])
+        session.add_all([
+            Company(company_name=f"Company {i}", siret=f"{i:014d}", address="1 rue", postal_code="75000", city="Paris")
+            for i in (1, 2, 3)
+        ])
+        session.flush()
+        session.add_all([CustomerCompany(id_customer=2, id_company=1), CustomerCompany(id_customer=2, id_company=3)])
+        # Le client 2 a beaucoup de lignes, le client 3 presque aucune
+        for i in range(20):
+            session.add(Notification(message=f"Message {i}", type=1, is_read=False, id_customer=2))
+            session.add(Feedback(product_id=i, rating=5, created_at=NOW, id_customer=2))
+            session.add(Address(address_line1=f"{i} rue", city="Paris", postal_code="75000", country="France",
+                                address_type=1, created_at=NOW, id_customer=2))
+        session.add(Address(address_line1="1 rue", city="Lyon", postal_code="69000", country="France",
+                            address_type=1, created_at=NOW, id_customer=3))
+
+    @pytest.mark.max_sql_statements(PROFILE_STATEMENTS)
+    def test_profile_aggregates_customer_resources(self):
+        response = self.client.get("/customers/2/profile")
+
+        self.assertEqual(response.status_code, 200, response.text)
+        profile = response.json()
+        self.assertEqual(profile["customer"]["id_customer"], 2)
+        self.assertNotIn("password_hash", profile["customer"])
+        self.assertEqual(len(profile["addresses"]), 20)
+        self.assertEqual(sorted(company["id_company"] for company in profile["companies"]), [1, 3])
+        self.assertEqual([item["product_id"] for item in profile["recent_feedbacks"]], [19, 18, 17, 16, 15])
+        self.assertEqual([item["message"] for item in profile["recent_notifications"]][:2], ["Message 19", "Message 18"])
+
+    # Même nombre de requêtes pour 20 lignes par ressource ou une seule
+    @pytest.mark.max_sql_statements(PROFILE_STATEMENTS)
+    def test_statement_count_does_not_grow_with_rows(self):
+        self.client.get("/customers/2/profile", params={"recent": 20})
+
+        self.current_customer = {"id_customer": 3, "customer_type": 2}
+        response = self.client.get("/customers/3/profile")
+
+        self.assertEqual(len(response.json()["addresses"]), 1)
+        self.assertEqual([request.count for request in self.sql_requests], [PROFILE_STATEMENTS] * 2)
+
+    def test_unknown_customer_and_other_customer(self):
+        self.assertEqual(self.client.get("/customers/3/profile").status_code, 403)
+
+        self.current_customer = ADMIN
+        self.assertEqual(self.client.get("/customers/99/profile").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
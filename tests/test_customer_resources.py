@@ -0,0 +1,107 @@
+import unittest
+import pytest
+from datetime import timedelta
+from app.models import Address, Feedback, LoginLog, Notification
+from tests.conftest import ADMIN, NOW, ApiTestCase, make_customer
+
+CUSTOMER = {"id_customer": 2, "customer_type": 2}
+
+
+class TestCustomerResources(ApiTestCase):
+    current_customer = CUSTOMER
+
+    def seed(self, session):
+        session.add_all([make_customer(i) for i in (1, 2, 3)])
+        # Les lignes des clients 2 et 3 sont entrelacées, comme dans une vraie table
+        for i in range(12):
+            for customer_id in (2, 3):
+                session.add(Notification(message=f"Message {i}", type=1, is_read=i % 3 == 0, id_customer=customer_id))
+                session.add(Feedback(product_id=i, rating=5, id_customer=customer_id))
+                session.add(Address(address_line1=f"{i} rue", city="Paris", postal_code="75000", country="France",
+                                    address_type=1, created_at=NOW, id_customer=customer_id))
+                # Deux connexions à la même seconde : le curseur départage par id_log
+                session.add(LoginLog(login_time=NOW + timedelta(minutes=i // 2), ip_address="127.0.0.1",
+                                     user_agent="test", id_customer=customer_id))
+
+    def walk(self, url, **params):
+        pages, cursor = [], None
+        while True:
+            response = self.client.get(url, params={**params, **({"cursor": cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200, response.text)
+            pages.append(response.json())
+            cursor = pages[-1]["next_cursor"]
+            if cursor is None:
+                return pages
+
+    # Page + compte des non lues
+    @pytest.mark.max_sql_statements(2)
+    def test_notifications_newest_first_with_unread_count(self):
+        pages = self.walk("/customers/2/notifications", limit=5)
+
+        items = [item for page in pages for item in page["items"]]
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(len(items), 12)
+        self.assertTrue(all(item["id_customer"] == 2 for item in items))
+        ids = [item["id_notification"] for item in items]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertEqual({page["unread_count"] for page in pages}, {8})
+
+    def test_unread_only(self):
+        pages = self.walk("/customers/2/notifications", limit=5, unread_only="true")
+
+        items = [item for page in pages for item in page["items"]]
+        self.assertEqual(len(items), 8)
+        self.assertFalse(any(item["is_read"] for item in items))
+
+    def test_unread_count_is_one_sql_count(self):
+        response = self.client.get("/customers/2/notifications/unread-count")
+
+        self.assertEqual(response.json(), {"unread_count": 8})
+        [statement] = self.last_statements()
+        self.assertIn("count(", statement.lower())
+
+    @pytest.mark.max_sql_statements(1)
+    def test_login_logs_newest_first_across_equal_timestamps(self):
+        pages = self.walk("/customers/2/login-logs", limit=5)
+
+        items = [item for page in pages for item in page["items"]]
+        self.assertEqual(len(items), 12)
+        keys = [(item["login_time"], item["id_log"]) for item in items]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+        self.assertEqual(len(set(keys)), 12)
+
+    def test_addresses_and_feedbacks(self):
+        addresses = [item for page in self.walk("/customers/2/addresses", limit=7) for item in page["items"]]
+        feedbacks = [item for page in self.walk("/customers/2/feedbacks", limit=7) for item in page["items"]]
+
+        self.assertEqual(len(addresses), 12)
+        self.assertTrue(all(item["id_customer"] == 2 for item in addresses))
+        self.assertEqual([item["product_id"] for item in feedbacks], list(range(11, -1, -1)))
+
+    def test_other_customer_is_forbidden(self):
+        for path in ("notifications", "notifications/unread-count", "addresses", "feedbacks", "login-logs"):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(f"/customers/3/{path}").status_code, 403)
+
+    def test_admin_can_read_any_customer(self):
+        self.current_customer = ADMIN
+        response = self.client.get("/customers/3/feedbacks")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(all(item["id_customer"] == 3 for item in response.json()["items"]))
+
+    def test_invalid_cursor_and_limit(self):
+        self.assertEqual(self.client.get("/customers/2/login-logs", params={"cursor": "bad!"}).status_code, 400)
+        self.assertEqual(self.client.get("/customers/2/addresses", params={"limit": 1000}).status_code, 422)
+
+    def test_global_listings_reject_out_of_range_limits(self):
+        self.current_customer = ADMIN
+        for path in ("feedbacks", "notifications", "addresses", "login-logs", "customer-companies"):
+            for limit in (0, -3, 1000):
+                with self.subTest(path=path, limit=limit):
+                    response = self.client.get(f"/{path}/", params={"cursor": "", "limit": limit})
+                    self.assertEqual(response.status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import sqlite3
+import threading
+from unittest.mock import MagicMock
+from sqlalchemy import exc
+from fastapi.testclient import TestClient
+from app.database import to_async_url, run_db, engine_options, pool_status, InstrumentedQueuePool
+from app.main import app
+from app.middleware import get_current_customer
+
+
+class TestDatabase(unittest.IsolatedAsyncioTestCase):
+
+    def test_to_async_url_mysql(self):
+        url = to_async_url("mysql+mysqlconnector://customers:pwd@db:3306/customer_db")
+        self.assertEqual(url, "mysql+aiomysql://customers:pwd@db:3306/customer_db")
+
+    def test_to_async_url_sqlite(self):
+        self.assertEqual(to_async_url("sqlite:///./test.db"), "sqlite+aiosqlite:///./test.db")
+
+    def test_to_async_url_already_async(self):
+        self.assertEqual(to_async_url("mysql+aiomysql://u:p@h/db"), "mysql+aiomysql://u:p@h/db")
+
+    async def test_run_db_awaits_async_controller(self):
+        async def controller(db, value):
+            return (db, value)
+
+        result = await run_db(controller, "db", 1)
+        self.assertEqual(result, ("db", 1))
+
+    async def test_run_db_offloads_sync_controller(self):
+        loop_thread = threading.get_ident()
+
+        def controller(db, value=None):
+            return threading.get_ident(), value
+
+        thread_id, value = await run_db(controller, "db", value=2)
+        self.assertNotEqual(thread_id, loop_thread)
+        self.assertEqual(value, 2)
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def test_engine_options_mysql(self):
+        options = engine_options("mysql+mysqlconnector://u:p@db/customer_db")
+        self.assertIs(options["poolclass"], InstrumentedQueuePool)
+        for key in ("pool_size", "max_overflow", "pool_timeout", "pool_recycle", "pool_pre_ping", "pool_use_lifo"):
+            self.assertIn(key, options)
+
+    def test_engine_options_sqlite(self):
+        options = engine_options("sqlite:///./test.db")
+        self.assertNotIn("pool_size", options)
+        self.assertFalse(options["connect_args"]["check_same_thread"])
+
+    def test_pool_counts_waits_and_timeouts(self):
+        pool = InstrumentedQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.01)
+        connection = pool.connect()
+
+        with self.assertRaises(exc.TimeoutError):
+            pool.connect()
+
+        status = pool_status(MagicMock(pool=pool))
+        self.assertEqual(status["checked_out"], 1)
+        self.assertEqual(status["waits"], 1)
+        self.assertEqual(status["timeouts"], 1)
+        connection.close()
+
+    def test_pool_no_wait_when_connections_available(self):
+        pool = InstrumentedQueuePool(lambda: sqlite3.connect(":memory:"), pool_size=2, max_overflow=0)
+        pool.connect().close()
+        pool.connect().close()
+
+        self.assertEqual(pool_status(MagicMock(pool=pool))["waits"], 0)
+
+    def test_pool_endpoint(self):
+        app.dependency_overrides[get_current_customer] = lambda: {"id_customer": 1, "customer_type": 1}
+        self.addCleanup(app.dependency_overrides.clear)
+        response = TestClient(app).get("/internal/pool")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("pool_class", response.json()["sync"])
+
+    def test_internal_endpoints_require_admin(self):
+        client = TestClient(app)
+        paths = [route.path for route in app.routes if route.path.startswith("/internal/")]
+        self.assertEqual(len(paths), 6)
+        for path in paths:
+            with self.subTest(path=path):
+                self.assertEqual(client.get(path).status_code, 401)
+        app.dependency_overrides[get_current_customer] = lambda: {"id_customer": 2, "customer_type": 2}
+        self.addCleanup(app.dependency_overrides.clear)
+        for path in paths:
+            with self.subTest(path=path):
+                self.assertEqual(client.get(path).status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import patch
+
+import aio_pika
+
+from app.messaging import service
+from app.messaging.cache import MemoryCache, NullCache
+from app.messaging.config import establish_rabbitmq_connection
+from app.messaging.consumer import ServiceError
+from app.messaging.connection import BrokerConnection, build_connect
+from app.messaging.fake_broker import FakeBroker, FakeService, order_service_responders, topic_matches
+from app.messaging.invalidation import start_cache_invalidation_listener
+from app.messaging.rpc import RpcClient
+
+
+class FakeBrokerTestCase(unittest.IsolatedAsyncioTestCase):
+
+    def make_client(self, timeout: float = 1, responders: dict = None, **options):
+        self.fake = FakeBroker(responders or order_service_responders(),
+                               **{"connect_latency": 0, "rtt": 0, "service_latency": 0, **options})
+        self.broker = BrokerConnection(connect=self.fake.connect, healthcheck_interval=0)
+        self.addAsyncCleanup(self.broker.close)
+        client = RpcClient(broker=self.broker, timeout=timeout, coalesce=False)
+        # Sans cache de réponses : chaque appel passe par le broker
+        for target, value in (("rpc_client", client), ("response_cache", NullCache())):
+            patcher = patch.object(service, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return client
+
+
+class TestRpcOverFakeBroker(FakeBrokerTestCase):
+
+    async def test_order_and_product_responders(self):
+        self.make_client()
+
+        result = await service.fetch_orders_products(7, [700, 701])
+
+        self.assertEqual(result["orders"][0], {"order_id": 700, "product_ids": [7000, 7001, 7002, 7003]})
+        self.assertEqual(len(result["products"]), 8)
+        self.assertEqual(result["products"][0], {"id_product": 7000, "name": "Product 7000"})
+        self.assertEqual(self.fake.stats()["requests"], 3)
+
+    async def test_failure_injection_is_deterministic(self):
+        async def outcomes(seed):
+            self.make_client(timeout=0.05, failure_rate=0.5, seed=seed)
+
+            async def one(customer_id):
+                try:
+                    await service.fetch_customer_orders(customer_id)
+                    return "ok"
+                except TimeoutError:
+                    return "timeout"
+
+            return await asyncio.gather(*(one(customer_id) for customer_id in range(1, 11))), self.fake.dropped
+
+        first, dropped = await outcomes(seed=1)
+        second, _ = await outcomes(seed=1)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first.count("timeout"), dropped)
+        self.assertTrue(0 < dropped < 10)
+
+    async def test_error_responses(self):
+        cache = MemoryCache(maxsize=10)
+        self.make_client(error_rate=1)
+
+        # Une réponse en erreur n'est pas « aucune commande » : ServiceError, rien en cache
+        with patch.object(service, "response_cache", cache), self.assertRaises(ServiceError):
+            await service.fetch_customer_orders(1)
+        self.assertEqual(self.fake.errors, 1)
+        self.assertEqual(cache.stats()["size"], 0)
+
+    async def test_per_service_latency_and_failures(self):
+        responders = order_service_responders()
+        responders["product_details_queue"] = FakeService(responders["product_details_queue"], failure_rate=1)
+        self.make_client(timeout=0.05, responders=responders)
+
+        self.assertEqual(await service.fetch_order_details(1, 100), {"products": [1000, 1001, 1002, 1003]})
+        with self.assertRaises(TimeoutError):
+            await service.fetch_product_details([1000])
+
+
+class TestTopicExchange(unittest.IsolatedAsyncioTestCase):
+
+    def test_topic_matches(self):
+        self.assertTrue(topic_matches("product.#", "product.updated"))
+        self.assertTrue(topic_matches("product.#", "product"))
+        self.assertTrue(topic_matches("*.updated", "order.updated"))
+        self.assertFalse(topic_matches("*.updated", "order.item.updated"))
+        self.assertFalse(topic_matches("order.#", "product.updated"))
+
+    async def test_cache_invalidation_listener(self):
+        fake = FakeBroker({}, connect_latency=0, rtt=0)
+        broker = BrokerConnection(connect=fake.connect, healthcheck_interval=0)
+        cache = MemoryCache(maxsize=10)
+        await cache.set_many({"product:1": {}, "orders:7": []}, ttl=60)
+
+        with patch("app.messaging.invalidation.response_cache", cache):
+            await start_cache_invalidation_listener(broker)
+            async with broker.channel() as channel:
+                exchange = await channel.get_exchange("cache_invalidation_exchange")
+                await exchange.publish(aio_pika.Message(body=json.dumps({"product_ids": [1]}).encode()),
+                                       routing_key="product.updated")
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(set(await cache.get_many(["product:1", "orders:7"])), {"orders:7"})
+        await broker.close()
+
+    async def test_listener_resubscribes_after_reconnect(self):
+        fake = FakeBroker({}, connect_latency=0, rtt=0)
+        broker = BrokerConnection(connect=fake.connect, healthcheck_interval=0)
+        self.addAsyncCleanup(broker.close)
+        cache = MemoryCache(maxsize=10)
+
+        with patch("app.messaging.invalidation.response_cache", cache):
+            await broker.start()
+            await start_cache_invalidation_listener(broker)
+            # Connexion perdue : la file exclusive et son consommateur disparaissent avec elle
+            broker.connection.drop()
+            await cache.set_many({"product:1": {}}, ttl=60)
+            async with broker.channel() as channel:
+                exchange = await channel.get_exchange("cache_invalidation_exchange")
+                await exchange.publish(aio_pika.Message(body=json.dumps({"product_id": 1}).encode()),
+                                       routing_key="product.updated")
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(broker.reconnects, 1)
+        self.assertEqual(await cache.get_many(["product:1"]), {})
+
+
+class TestBrokerBackend(unittest.TestCase):
+
+    def test_memory_backend(self):
+        connect = build_connect("memory")
+
+        self.assertIsInstance(connect.__self__, FakeBroker)
+
+    def test_unknown_backend_falls_back_to_rabbitmq(self):
+        with self.assertLogs("app.messaging.connection", level="WARNING"):
+            self.assertIs(build_connect("kafka"), establish_rabbitmq_connection)
+
+
+if __name__ == "__main__":
+    unittest.main()
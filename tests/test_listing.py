@@ -0,0 +1,67 @@
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+from app import main
+from app.models import Company
+from tests.conftest import ApiTestCase, make_customer
+
+
+class TestCustomerListing(ApiTestCase):
+
+    def seed(self, session):
+        session.add_all([make_customer(i) for i in range(1, 8)])
+        session.add_all([
+            Company(company_name=f"Company {i}", siret=f"{i:014d}", address="1 rue", postal_code="75001", city="Paris")
+            for i in range(1, 4)
+        ])
+
+    def test_list_customers_unpaginated(self):
+        response = self.client.get("/customers/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 7)
+
+    def test_list_customers_skip_limit(self):
+        response = self.client.get("/customers/", params={"skip": 2, "limit": 3})
+        self.assertEqual([c["id_customer"] for c in response.json()], [3, 4, 5])
+
+    def test_list_customers_cursor(self):
+        first = self.client.get("/customers/", params={"cursor": "", "limit": 5}).json()
+        second = self.client.get("/customers/", params={"cursor": first["next_cursor"], "limit": 5}).json()
+
+        self.assertEqual([c["id_customer"] for c in first["items"]], [1, 2, 3, 4, 5])
+        self.assertEqual([c["id_customer"] for c in second["items"]], [6, 7])
+        self.assertIsNone(second["next_cursor"])
+
+    def test_list_customers_invalid_cursor(self):
+        response = self.client.get("/customers/", params={"cursor": "%%%"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_stream_customers_ndjson(self):
+        with patch("app.main.SessionLocal", self.Session):
+            response = self.client.get("/customers/", params={"stream": True})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([c["id_customer"] for c in lines], list(range(1, 8)))
+        self.assertNotIn("password_hash", lines[0])
+
+    def test_stream_companies_in_small_batches(self):
+        stream = MagicMock(wraps=main.crud.stream_companies)
+        with patch("app.main.SessionLocal", self.Session), patch("app.main.STREAM_BATCH_SIZE", 2), \
+                patch.object(main.crud, "stream_companies", stream):
+            response = self.client.get("/companies/", params={"stream": True})
+
+        self.assertEqual(stream.call_args.args[1], 2)
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([c["company_name"] for c in lines], ["Company 1", "Company 2", "Company 3"])
+
+    def test_list_limit_out_of_range(self):
+        for limit in (0, -1, 1000):
+            with self.subTest(limit=limit):
+                response = self.client.get("/customers/", params={"cursor": "", "limit": limit})
+                self.assertEqual(response.status_code, 422)
+
+
+if __name__ == '__main__':
+    unittest.main()
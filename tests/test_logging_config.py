@@ -0,0 +1,129 @@
+import json
+import logging
+import queue
+import sys
+import unittest
+from app import logging_config
+from app.logging_config import (
+    JsonFormatter, NonBlockingQueueHandler, SamplingFilter, configure_logging, parse_levels, shutdown_logging,
+)
+
+
+class ListHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+def make_record(msg, *args, level=logging.DEBUG, name="app.test", **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestJsonFormatter(unittest.TestCase):
+
+    def test_extra_fields_and_exception(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("app.test", logging.ERROR, __file__, 1, "Failed for %s", (42,), sys.exc_info())
+        record.customer_id = 42
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        self.assertEqual((entry["level"], entry["logger"], entry["message"]), ("ERROR", "app.test", "Failed for 42"))
+        self.assertEqual(entry["customer_id"], 42)
+        self.assertIn("ValueError: boom", entry["exc_info"])
+        self.assertNotIn("args", entry)
+
+
+class TestParseLevels(unittest.TestCase):
+
+    def test_levels_by_module(self):
+        self.assertEqual(parse_levels("app.messaging=debug, sqlalchemy.engine=WARNING,"),
+                         {"app.messaging": logging.DEBUG, "sqlalchemy.engine": logging.WARNING})
+
+    def test_invalid_entry(self):
+        with self.assertRaises(ValueError):
+            parse_levels("app.messaging=LOUD")
+
+
+class TestSamplingFilter(unittest.TestCase):
+
+    def test_one_debug_line_in_ten_per_message(self):
+        sampler = SamplingFilter(0.1)
+
+        kept = [sampler.filter(make_record("Parsed response data: %s", i)) for i in range(25)]
+        other = sampler.filter(make_record("Another message %s", 1))
+
+        self.assertEqual(sum(kept), 3)
+        self.assertTrue(kept[0] and other)
+
+    def test_counters_are_bounded(self):
+        sampler = SamplingFilter(0.1, max_templates=10)
+
+        for i in range(100):
+            sampler.filter(make_record(f"Parsed response data: {i}"))
+
+        self.assertEqual(len(sampler._counts), 10)
+
+    def test_higher_levels_are_never_sampled(self):
+        sampler = SamplingFilter(0)
+
+        self.assertFalse(sampler.filter(make_record("debug")))
+        self.assertTrue(sampler.filter(make_record("error", level=logging.ERROR)))
+
+
+class TestNonBlockingQueueHandler(unittest.TestCase):
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = NonBlockingQueueHandler(queue.Queue(1))
+
+        handler.handle(make_record("first"))
+        handler.handle(make_record("second"))
+
+        self.assertEqual((handler.queue.qsize(), handler.dropped), (1, 1))
+
+    def test_message_is_interpolated_before_enqueue(self):
+        handler = NonBlockingQueueHandler(queue.Queue())
+        payload = {"state": "before"}
+
+        handler.handle(make_record("Payload: %s", payload))
+        payload["state"] = "after"
+
+        record = handler.queue.get_nowait()
+        self.assertEqual((record.getMessage(), record.args), ("Payload: {'state': 'before'}", None))
+
+
+class TestConfigureLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.root_level = logging.getLogger().level
+
+    def tearDown(self):
+        logging.getLogger("app.quiet").setLevel(logging.NOTSET)
+        configure_logging()
+        logging.getLogger().setLevel(self.root_level)
+
+    def test_records_are_written_by_the_listener(self):
+        handler = ListHandler()
+        configure_logging(level="INFO", levels="app.quiet=ERROR", handler=handler)
+
+        logging.getLogger("app.loud").info("Sent message to %s", "orders", extra={"correlation_id": "abc"})
+        logging.getLogger("app.loud").debug("Below the root level")
+        logging.getLogger("app.quiet").warning("Below the module level")
+        shutdown_logging()
+
+        [line] = handler.lines
+        entry = json.loads(line)
+        self.assertEqual((entry["message"], entry["correlation_id"]), ("Sent message to orders", "abc"))
+        self.assertEqual(logging_config.stats(), {"configured": False})
+
+
+if __name__ == "__main__":
+    unittest.main()
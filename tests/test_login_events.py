@@ -0,0 +1,184 @@
+import asyncio
+import unittest
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+import pytest
+from app.login_events import LoginEvent, LoginEventBuffer, write_login_events
+from app.models import Customer, LoginLog
+from tests.conftest import NOW, ApiTestCase, DatabaseTestCase, count_statements, make_customer
+
+
+def seed_customers(session):
+    session.add_all([make_customer(i, failed_login_attempts=2) for i in (1, 2, 3)])
+
+
+class TestWriteLoginEvents(DatabaseTestCase):
+
+    def seed(self, session):
+        seed_customers(session)
+
+    def customer(self, customer_id):
+        with self.Session() as session:
+            return session.get(Customer, customer_id)
+
+    def test_batch_is_written_in_three_statements(self):
+        later = NOW + timedelta(hours=1)
+        events = [
+            LoginEvent(1, success=True, ip_address="10.0.0.1", user_agent="browser", time=later),
+            LoginEvent(1, success=False),
+            LoginEvent(2, success=False),
+            LoginEvent(2, success=False),
+            LoginEvent(3, success=False),
+            LoginEvent(3, success=True, time=later),
+        ] + [LoginEvent(3, success=True, time=later) for _ in range(20)]
+
+        with self.Session() as session, count_statements() as counter:
+            write_login_events(session, events)
+
+        writes = [statement for statement in counter.statements if statement.split()[0] in ("INSERT", "UPDATE")]
+        self.assertEqual(len(writes), 3)
+        # Une seule requête INSERT portant les 22 lignes
+        self.assertEqual(writes[0].count("(?, ?, ?, ?)"), 22)
+        # Succès : last_login à jour et compteur remis à zéro, puis échecs qui suivent le succès
+        self.assertEqual(self.customer(1).last_login, later)
+        self.assertEqual(self.customer(1).failed_login_attempts, 1)
+        # Échecs seuls : ajoutés au compteur existant
+        self.assertEqual(self.customer(2).failed_login_attempts, 4)
+        self.assertEqual(self.customer(2).last_login, NOW)
+        self.assertEqual(self.customer(3).failed_login_attempts, 0)
+        with self.Session() as session:
+            self.assertEqual(session.query(LoginLog).count(), 22)
+            log = session.query(LoginLog).filter(LoginLog.id_customer == 1).one()
+        self.assertEqual((log.ip_address, log.user_agent, log.login_time), ("10.0.0.1", "browser", later))
+
+
+class TestLoginEventBuffer(unittest.IsolatedAsyncioTestCase):
+
+    async def test_record_is_deferred_until_flush(self):
+        writer = AsyncMock()
+        buffer = LoginEventBuffer(flush_interval=60, writer=writer)
+
+        await buffer.record(LoginEvent(1, success=True))
+        await buffer.record(LoginEvent(2, success=False))
+        writer.assert_not_awaited()
+
+        await buffer.flush()
+        writer.assert_awaited_once()
+        self.assertEqual([event.id_customer for event in writer.await_args.args[0]], [1, 2])
+
+    async def test_background_flush_and_stop(self):
+        batches = []
+
+        async def writer(events):
+            batches.append([event.id_customer for event in events])
+
+        buffer = LoginEventBuffer(flush_interval=0.01, writer=writer)
+        await buffer.start()
+        await buffer.record(LoginEvent(1, success=True))
+        await asyncio.sleep(0.05)
+        self.assertEqual(batches, [[1]])
+
+        await buffer.record(LoginEvent(2, success=True))
+        await buffer.stop()
+        self.assertEqual(batches, [[1], [2]])
+
+    async def test_early_flush_at_batch_size(self):
+        batches = []
+
+        async def writer(events):
+            batches.append(len(events))
+
+        buffer = LoginEventBuffer(flush_interval=60, batch_size=3, writer=writer)
+        await buffer.start()
+        for customer_id in range(7):
+            await buffer.record(LoginEvent(customer_id, success=True))
+        await asyncio.sleep(0.01)
+        # 3 événements atteints : vidage sans attendre l'intervalle de 60 s, par lots de 3 au plus
+        self.assertEqual(sum(batches), 7)
+        self.assertTrue(all(size <= 3 for size in batches))
+        self.assertEqual(buffer.stats()["early_flushes"], 1)
+
+        await buffer.stop()
+        self.assertEqual(buffer.stats()["written"], 7)
+
+    async def test_bounded_pending_events_are_dropped(self):
+        buffer = LoginEventBuffer(flush_interval=60, max_pending=2, writer=AsyncMock())
+
+        for customer_id in range(5):
+            await buffer.record(LoginEvent(customer_id, success=True))
+
+        stats = buffer.stats()
+        self.assertEqual((stats["pending"], stats["recorded"], stats["dropped"]), (2, 2, 3))
+
+    async def test_stop_flushes_pending_events(self):
+        writer = AsyncMock()
+        buffer = LoginEventBuffer(flush_interval=60, writer=writer)
+        await buffer.start()
+        await buffer.record(LoginEvent(1, success=True))
+
+        await buffer.stop()
+        writer.assert_awaited_once()
+        self.assertEqual(buffer.stats()["pending"], 0)
+
+    async def test_inline_when_interval_is_zero(self):
+        writer = AsyncMock()
+        buffer = LoginEventBuffer(flush_interval=0, writer=writer)
+
+        await buffer.record(LoginEvent(1, success=True))
+        writer.assert_awaited_once()
+
+    async def test_failed_write_is_logged(self):
+        buffer = LoginEventBuffer(flush_interval=60, writer=AsyncMock(side_effect=RuntimeError("db down")))
+        await buffer.record(LoginEvent(1, success=True))
+
+        with self.assertLogs(level="ERROR") as logs:
+            await buffer.flush()
+        self.assertIn("Failed to write 1 login events: db down", logs.output[0])
+        self.assertEqual((buffer.stats()["failed"], buffer.stats()["written"]), (1, 0))
+
+
+class TestLoginEndpoint(ApiTestCase):
+
+    def seed(self, session):
+        seed_customers(session)
+
+    def setUp(self):
+        super().setUp()
+        self.events = []
+
+    def login(self, password_ok: bool, email="user1@example.com"):
+        record = AsyncMock(side_effect=self.events.append)
+        with patch("app.main.verify_password_async", AsyncMock(return_value=password_ok)), \
+                patch("app.main.login_events.record", record):
+            return self.client.post("/login", json={"email": email, "password": "password"},
+                                    headers={"User-Agent": "unittest"})
+
+    # Une seule lecture ; les écritures partent dans le tampon
+    @pytest.mark.max_sql_statements(1)
+    def test_success_reads_four_columns_and_defers_writes(self):
+        response = self.login(True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access_token", response.json())
+        [statement] = self.last_statements()
+        select_list = statement.split("FROM")[0]
+        self.assertIn("password_hash", select_list)
+        self.assertNotIn("loyalty_points", select_list)
+        [login_event] = self.events
+        self.assertEqual((login_event.id_customer, login_event.success, login_event.user_agent), (1, True, "unittest"))
+
+    def test_wrong_password_records_failure(self):
+        response = self.login(False)
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual([(e.id_customer, e.success) for e in self.events], [(1, False)])
+
+    def test_unknown_email_records_nothing(self):
+        response = self.login(True, email="nobody@example.com")
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.events, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,359 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from app.messaging.connection import BrokerConnection
+from app.messaging.consumer import ServiceError, decode_response
+from app.messaging.rpc import RpcClient
+from app.messaging.service import fetch_orders_products, fetch_product_details, fetch_customer_orders
+from app.messaging.cache import MemoryCache, RedisCache
+from app.messaging.invalidation import invalidated_keys, handle_invalidation_message
+from app.main import app
+from app.metrics import RPC_DURATION
+
+
+def make_connection():
+    connection = MagicMock(is_closed=False)
+    connection.channel = AsyncMock(side_effect=lambda: MagicMock(is_closed=False))
+    connection.close = AsyncMock()
+    return connection
+
+
+def make_reply(correlation_id, payload):
+    message = MagicMock(correlation_id=correlation_id, body=json.dumps(payload).encode())
+    message.ack = AsyncMock()
+    return message
+
+
+class TestBrokerConnection(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.connect = AsyncMock(side_effect=lambda: make_connection())
+        self.broker = BrokerConnection(connect=self.connect, pool_size=2, healthcheck_interval=0)
+
+    async def test_channels_are_reused_across_calls(self):
+        await self.broker.start()
+        async with self.broker.channel() as first:
+            pass
+        async with self.broker.channel() as second:
+            pass
+
+        self.assertIs(first, second)
+        self.connect.assert_awaited_once()
+        self.assertEqual(self.broker.stats()["channels_opened"], 1)
+
+    async def test_closed_channel_is_replaced(self):
+        async with self.broker.channel() as first:
+            first.is_closed = True
+        async with self.broker.channel() as second:
+            pass
+
+        self.assertIsNot(first, second)
+        self.assertEqual(self.broker.stats()["channels_discarded"], 1)
+
+    async def test_reconnects_when_connection_is_closed(self):
+        async with self.broker.channel():
+            pass
+        self.broker.connection.is_closed = True
+
+        async with self.broker.channel():
+            pass
+
+        self.assertEqual(self.connect.await_count, 2)
+        self.assertEqual(self.broker.stats()["reconnects"], 1)
+        self.assertTrue(self.broker.is_connected)
+
+    async def test_on_connect_callbacks_run_for_each_new_connection(self):
+        failing = AsyncMock(side_effect=RuntimeError("channel error"))
+        subscribe = AsyncMock()
+        self.broker.on_connect(failing)
+        self.broker.on_connect(subscribe)
+
+        await self.broker.start()
+        await self.broker.get_connection()
+        self.broker.connection.is_closed = True
+        await self.broker.get_connection()
+
+        # Un callback en échec n'empêche ni la connexion ni les suivants
+        self.assertEqual(subscribe.await_count, 2)
+        self.assertTrue(self.broker.is_connected)
+
+    async def test_start_tolerates_unreachable_broker(self):
+        self.connect.side_effect = ConnectionError("unreachable")
+
+        await self.broker.start()
+
+        self.assertFalse(self.broker.is_connected)
+        self.assertFalse(await self.broker.health_check())
+
+    async def test_close(self):
+        await self.broker.start()
+        connection = self.broker.connection
+
+        await self.broker.close()
+
+        connection.close.assert_awaited_once()
+        self.assertFalse(self.broker.is_connected)
+
+
+class TestRpcClient(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.published = []
+        self.reply_queue = MagicMock()
+        self.reply_queue.name = "amq.gen-reply"
+        self.reply_queue.consume = AsyncMock()
+
+        def make_channel():
+            channel = MagicMock(is_closed=False)
+            channel.declare_queue = AsyncMock(return_value=self.reply_queue)
+            channel.default_exchange.publish = AsyncMock(
+                side_effect=lambda message, routing_key: self.published.append((routing_key, message))
+            )
+            return channel
+
+        def make_connection():
+            connection = MagicMock(is_closed=False)
+            connection.channel = AsyncMock(side_effect=make_channel)
+            return connection
+
+        self.broker = BrokerConnection(connect=AsyncMock(side_effect=make_connection), healthcheck_interval=0)
+        self.client = RpcClient(broker=self.broker, timeout=1)
+
+    async def reply(self, index, payload):
+        on_response = self.reply_queue.consume.call_args.args[0]
+        message = self.published[index][1]
+        await on_response(make_reply(message.correlation_id, payload))
+
+    async def wait_published(self, count):
+        while len(self.published) < count:
+            await asyncio.sleep(0)
+
+    async def test_concurrent_calls_share_one_reply_queue(self):
+        calls = [
+            asyncio.ensure_future(self.client.call("customer.orders.request", {"customer_id": i}, expected_key="orders"))
+            for i in range(3)
+        ]
+        await self.wait_published(3)
+
+        # Réponses dans le désordre : chacune retrouve son appel par correlation_id
+        for index in reversed(range(3)):
+            await self.reply(index, {"orders": [index]})
+
+        self.assertEqual(await asyncio.gather(*calls), [[0], [1], [2]])
+        self.reply_queue.consume.assert_awaited_once()
+        self.assertTrue(all(message.reply_to == "amq.gen-reply" for _, message in self.published))
+        self.assertEqual(self.client.stats()["pending"], 0)
+
+    async def test_identical_concurrent_calls_are_coalesced(self):
+        calls = [
+            asyncio.ensure_future(self.client.call("customer.orders.request", {"customer_id": 7}, expected_key="orders"))
+            for _ in range(5)
+        ]
+        await self.wait_published(1)
+        await asyncio.sleep(0)
+        # Un appelant abandonne : la requête partagée continue pour les autres
+        calls[0].cancel()
+
+        await self.reply(0, {"orders": [1]})
+
+        self.assertEqual(await asyncio.gather(*calls[1:]), [[1]] * 4)
+        self.assertEqual(len(self.published), 1)
+        self.assertEqual(self.client.stats()["coalesced"], 4)
+        self.assertEqual(self.client.stats()["in_flight_requests"], 0)
+
+        # Une fois la réponse reçue, un nouvel appel repart vers le broker
+        next_call = asyncio.ensure_future(self.client.call("customer.orders.request", {"customer_id": 7}, expected_key="orders"))
+        await self.wait_published(2)
+        await self.reply(1, {"orders": [2]})
+        self.assertEqual(await next_call, [2])
+
+    async def test_coalescing_can_be_disabled(self):
+        self.client.coalesce = False
+        calls = [
+            asyncio.ensure_future(self.client.call("customer.orders.request", {"customer_id": 7}, expected_key="orders"))
+            for _ in range(2)
+        ]
+        await self.wait_published(2)
+        await self.reply(0, {"orders": [1]})
+        await self.reply(1, {"orders": [1]})
+
+        await asyncio.gather(*calls)
+        self.assertEqual(self.client.stats()["coalesced"], 0)
+
+    async def test_timeout_cleans_up_pending_entry(self):
+        timeouts = RPC_DURATION.count("order.products.request", "timeout")
+        with self.assertRaises(TimeoutError):
+            await self.client.call("order.products.request", {"order_id": 1}, timeout=0.01)
+
+        self.assertEqual(self.client.stats()["pending"], 0)
+        self.assertEqual(self.client.stats()["timeouts"], 1)
+        self.assertEqual(RPC_DURATION.count("order.products.request", "timeout"), timeouts + 1)
+
+        # Une réponse tardive est ignorée et comptée comme orpheline
+        await self.reply(0, {"products": [1]})
+        self.assertEqual(self.client.stats()["orphaned"], 1)
+
+
+class TestFetchOrdersProducts(unittest.IsolatedAsyncioTestCase):
+
+    async def test_fan_out_then_single_deduplicated_product_lookup(self):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fetch_order_details(customer_id, order_id):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {'products': [order_id, 100]}
+
+        fetch_product_details = AsyncMock(return_value=[{'id_product': 1}])
+        with patch("app.messaging.service.fetch_order_details", side_effect=fetch_order_details), \
+                patch("app.messaging.service.fetch_product_details", fetch_product_details):
+            result = await fetch_orders_products(1, [1, 2, 3, 4], concurrency=2)
+
+        self.assertEqual(max_in_flight, 2)
+        fetch_product_details.assert_awaited_once_with([1, 100, 2, 3, 4])
+        self.assertEqual(result['orders'][1], {'order_id': 2, 'product_ids': [2, 100]})
+        self.assertEqual(result['products'], [{'id_product': 1}])
+
+    async def test_no_product_lookup_without_products(self):
+        fetch_product_details = AsyncMock()
+        with patch("app.messaging.service.fetch_order_details", AsyncMock(return_value={'products': []})), \
+                patch("app.messaging.service.fetch_product_details", fetch_product_details):
+            result = await fetch_orders_products(1, [1])
+
+        fetch_product_details.assert_not_awaited()
+        self.assertEqual(result['products'], [])
+
+
+class TestOrdersProductsEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(app)
+
+    @patch("app.main.fetch_orders_products", new_callable=AsyncMock, return_value={'orders': [], 'products': []})
+    def test_order_ids_comma_separated_or_repeated(self, mock_fetch):
+        response = self.client.get("/customers/1/orders/products?order_ids=3,1,3&order_ids=2")
+
+        self.assertEqual(response.status_code, 200)
+        mock_fetch.assert_awaited_once_with(1, [3, 1, 2])
+
+    @patch("app.main.fetch_orders_products", new_callable=AsyncMock)
+    def test_invalid_order_ids(self, mock_fetch):
+        response = self.client.get("/customers/1/orders/products?order_ids=1,abc")
+
+        self.assertEqual(response.status_code, 400)
+        mock_fetch.assert_not_awaited()
+
+    @patch("app.main.fetch_orders_products", new_callable=AsyncMock, side_effect=TimeoutError)
+    def test_timeout(self, mock_fetch):
+        response = self.client.get("/customers/1/orders/products?order_ids=1")
+
+        self.assertEqual(response.status_code, 504)
+
+    @patch("app.main.fetch_orders_products", new_callable=AsyncMock, side_effect=ServiceError("unavailable"))
+    def test_service_error(self, mock_fetch):
+        response = self.client.get("/customers/1/orders/products?order_ids=1")
+
+        self.assertEqual(response.status_code, 502)
+
+
+class TestResponseCache(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.cache = MemoryCache(maxsize=10)
+        self.cache_patch = patch("app.messaging.service.response_cache", self.cache)
+        self.cache_patch.start()
+        self.addCleanup(self.cache_patch.stop)
+
+    async def test_entries_expire(self):
+        await self.cache.set_many({"a": 1}, ttl=-1)
+        self.assertEqual(await self.cache.get_many(["a"]), {})
+
+    async def test_least_recently_used_is_evicted(self):
+        cache = MemoryCache(maxsize=2)
+        await cache.set_many({"a": 1, "b": 2}, ttl=60)
+        await cache.get_many(["a"])
+        await cache.set_many({"c": 3}, ttl=60)
+
+        self.assertEqual(await cache.get_many(["a", "b", "c"]), {"a": 1, "c": 3})
+
+    @patch("app.messaging.service.rpc_client")
+    async def test_product_details_partial_hit_requests_missing_ids_only(self, mock_rpc):
+        await self.cache.set_many({"product:1": {"id_product": 1, "name": "cached"}}, ttl=60)
+        mock_rpc.call = AsyncMock(return_value=[{"id_product": 2, "name": "fetched"}])
+
+        products = await fetch_product_details([2, 1])
+
+        mock_rpc.call.assert_awaited_once_with('product_details_queue', {'product_ids': [2]}, expected_key='list')
+        self.assertEqual([product["name"] for product in products], ["fetched", "cached"])
+
+        # Second appel : tout vient du cache
+        mock_rpc.call.reset_mock()
+        await fetch_product_details([1, 2])
+        mock_rpc.call.assert_not_awaited()
+
+    @patch("app.messaging.service.rpc_client")
+    async def test_customer_orders_are_cached(self, mock_rpc):
+        mock_rpc.call = AsyncMock(return_value=[{"id_order": 1}])
+
+        self.assertEqual(await fetch_customer_orders(7), [{"id_order": 1}])
+        self.assertEqual(await fetch_customer_orders(7), [{"id_order": 1}])
+        mock_rpc.call.assert_awaited_once()
+
+    async def test_invalidation_message_deletes_keys(self):
+        await self.cache.set_many({"product:1": {}, "product:2": {}, "orders:7": []}, ttl=60)
+        message = MagicMock(routing_key="product.updated", body=json.dumps({"product_ids": [1]}).encode())
+        message.process = MagicMock(return_value=AsyncMock())
+
+        with patch("app.messaging.invalidation.response_cache", self.cache):
+            await handle_invalidation_message(message)
+
+        self.assertEqual(set(await self.cache.get_many(["product:1", "product:2", "orders:7"])), {"product:2", "orders:7"})
+
+    def test_invalidated_keys(self):
+        self.assertEqual(invalidated_keys("product.deleted", {"product_id": 3}), ["product:3"])
+        self.assertEqual(invalidated_keys("order.created", {"customer_id": 7}), ["orders:7"])
+        self.assertEqual(invalidated_keys("other.event", {"customer_id": 7}), [])
+
+    async def test_redis_backend_uses_mget(self):
+        client = MagicMock()
+        client.mget = AsyncMock(return_value=[json.dumps({"id_product": 1}).encode(), None])
+        cache = RedisCache(client=client, prefix="test:")
+
+        found = await cache.get_many(["product:1", "product:2"])
+
+        client.mget.assert_awaited_once_with(["test:product:1", "test:product:2"])
+        self.assertEqual(found, {"product:1": {"id_product": 1}})
+        self.assertEqual(cache.stats()["misses"], 1)
+
+
+class TestDecodeResponse(unittest.TestCase):
+
+    def test_expected_key(self):
+        self.assertEqual(decode_response(b'{"products": [1, 2]}', "products"), [1, 2])
+
+    def test_double_encoded_payload(self):
+        body = json.dumps(json.dumps({"orders": [{"id_order": 1}]})).encode()
+        self.assertEqual(decode_response(body, "orders"), [{"id_order": 1}])
+
+    def test_bare_list(self):
+        self.assertEqual(decode_response(b'[{"id_product": 1}]', "list"), [{"id_product": 1}])
+
+    def test_malformed_payloads(self):
+        self.assertEqual(decode_response(b'not json', "orders"), [])
+        self.assertEqual(decode_response(b'{"other": 1}', "orders"), [])
+
+    def test_error_response(self):
+        with self.assertRaises(ServiceError):
+            decode_response(b'{"error": "order service unavailable"}', "orders")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import unittest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from starlette.concurrency import run_in_threadpool
+from app import metrics
+from app.metrics import Counter, Histogram, MetricsMiddleware, enable_db_timing
+
+
+class TestExposition(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = list(metrics.REGISTRY)
+
+    def tearDown(self):
+        metrics.REGISTRY[:] = self.registry
+
+    def test_counter(self):
+        counter = Counter("test_events_total", "Events.", ("kind",))
+        counter.inc("a")
+        counter.inc("a", amount=2)
+        counter.inc('say "hi"\n')
+
+        self.assertEqual(counter.render().splitlines(), [
+            "# HELP test_events_total Events.",
+            "# TYPE test_events_total counter",
+            'test_events_total{kind="a"} 3',
+            'test_events_total{kind="say \\"hi\\"\\n"} 1',
+        ])
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("test_duration_seconds", "Duration.", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, "/items")
+
+        lines = histogram.render().splitlines()[2:]
+        self.assertEqual(lines, [
+            'test_duration_seconds_bucket{route="/items",le="0.1"} 2',
+            'test_duration_seconds_bucket{route="/items",le="1.0"} 3',
+            'test_duration_seconds_bucket{route="/items",le="+Inf"} 4',
+            'test_duration_seconds_sum{route="/items"} 3.65',
+            'test_duration_seconds_count{route="/items"} 4',
+        ])
+
+
+class TestMetricsMiddleware(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        api = FastAPI()
+
+        def run_statements(n):
+            with self.engine.connect() as connection:
+                for _ in range(n):
+                    connection.execute(text("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 20000) SELECT count(*) FROM c"))
+
+        @api.get("/items/{item_id}")
+        async def read_item(item_id: int):
+            await run_in_threadpool(run_statements, 3)
+            return {"item_id": item_id}
+
+        api.add_middleware(MetricsMiddleware)
+        self.client = TestClient(api)
+        enable_db_timing()
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_requests_are_labelled_by_route_template(self):
+        requests = metrics.HTTP_REQUESTS.value("GET", "/items/{item_id}", "200")
+        db_time = metrics.HTTP_REQUEST_DB_DURATION.sum("GET", "/items/{item_id}")
+        duration = metrics.HTTP_REQUEST_DURATION.sum("GET", "/items/{item_id}")
+
+        self.client.get("/items/1")
+        self.client.get("/items/2")
+
+        self.assertEqual(metrics.HTTP_REQUESTS.value("GET", "/items/{item_id}", "200"), requests + 2)
+        self.assertEqual(metrics.HTTP_REQUESTS_IN_PROGRESS.value("GET"), 0)
+        # Le temps SQL, mesuré dans le threadpool, est compté et reste inférieur à la durée totale
+        spent_in_db = metrics.HTTP_REQUEST_DB_DURATION.sum("GET", "/items/{item_id}") - db_time
+        self.assertGreater(spent_in_db, 0)
+        self.assertLess(spent_in_db, metrics.HTTP_REQUEST_DURATION.sum("GET", "/items/{item_id}") - duration)
+
+    def test_unknown_paths_share_one_label(self):
+        before = metrics.HTTP_REQUESTS.value("GET", metrics.UNMATCHED_ROUTE, "404")
+
+        self.client.get("/nothing/1")
+        self.client.get("/nothing/2")
+
+        self.assertEqual(metrics.HTTP_REQUESTS.value("GET", metrics.UNMATCHED_ROUTE, "404"), before + 2)
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        from app.main import app
+
+        self.client = TestClient(app)
+
+    def admin_headers(self):
+        from app.middleware import create_access_token
+
+        return {"Authorization": f"Bearer {create_access_token({'id_customer': 1, 'customer_type': 1})}"}
+
+    def test_prometheus_text_format(self):
+        headers = self.admin_headers()
+        self.client.get("/metrics", headers=headers)
+        response = self.client.get("/metrics", headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn('http_requests_total{method="GET",route="/metrics",status="200"}', response.text)
+        self.assertIn("# TYPE password_hash_duration_seconds histogram", response.text)
+
+    def test_requires_credentials(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+
+    def test_rejects_non_admin(self):
+        from app.middleware import create_access_token
+
+        token = create_access_token({"id_customer": 2, "customer_type": 2})
+        response = self.client.get("/metrics", headers={"Authorization": f"Bearer {token}"})
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_scrape_token(self):
+        with patch("app.main.METRICS_TOKEN", "scrape-secret"):
+            allowed = self.client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+            rejected = self.client.get("/metrics", headers={"Authorization": "Bearer other"})
+
+        self.assertEqual(allowed.status_code, 200)
+        self.assertEqual(rejected.status_code, 401)
+
+    def test_bcrypt_time_is_recorded(self):
+        from app.middleware import verify_password
+
+        before = metrics.PASSWORD_HASH_DURATION.count("verify")
+        with patch("app.middleware.pwd_context.verify", return_value=True):
+            verify_password("password", "hash")
+
+        self.assertEqual(metrics.PASSWORD_HASH_DURATION.count("verify"), before + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,16 @@
 import unittest
+import asyncio
+import threading
+import time
 from unittest.mock import patch
 from passlib.context import CryptContext
 import os
 from jose import jwt, JWTError
 from app.middleware import (
     hash_password, verify_password, create_access_token,
-    verify_access_token, get_current_customer, is_admin, is_customer_or_admin
+    verify_access_token, get_current_customer, is_admin, is_customer_or_admin,
+    PasswordHashPool, hash_password_async, verify_password_async,
+    TokenCache, token_cache
 )
 from fastapi import HTTPException, status
 
@@ -105,7 +110,7 @@ class TestMiddleware(unittest.TestCase):
         mock_verify_access_token.return_value = None
 
         with self.assertRaises(HTTPException) as context:
-            get_current_customer()
+            get_current_customer("invalid_token")
 
         self.assertEqual(context.exception.status_code, status.HTTP_401_UNAUTHORIZED)
 
@@ -152,5 +157,96 @@ class TestMiddleware(unittest.TestCase):
 
         self.assertEqual(context.exception.status_code, status.HTTP_403_FORBIDDEN)
 
+class TestPasswordHashPool(unittest.IsolatedAsyncioTestCase):
+
+    async def test_async_hash_and_verify(self):
+        hashed = await hash_password_async("my_password")
+        self.assertTrue(await verify_password_async("my_password", hashed))
+        self.assertFalse(await verify_password_async("other_password", hashed))
+
+    async def test_runs_off_the_event_loop(self):
+        pool = PasswordHashPool(workers=1, queue_size=0)
+        loop_thread = threading.get_ident()
+
+        worker_thread = await pool.run(threading.get_ident)
+        self.assertNotEqual(worker_thread, loop_thread)
+        self.assertEqual(pool.stats()["completed"], 1)
+
+    async def test_rejects_with_503_when_queue_full(self):
+        pool = PasswordHashPool(workers=1, queue_size=1)
+        release = threading.Event()
+
+        busy = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        self.assertEqual(pool.stats()["in_flight"], 1)
+        self.assertEqual(pool.stats()["queued"], 1)
+
+        with self.assertRaises(HTTPException) as context:
+            await pool.run(release.wait)
+        self.assertEqual(context.exception.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(pool.stats()["rejected"], 1)
+
+        release.set()
+        await asyncio.gather(*busy)
+        self.assertEqual(pool.stats()["queued"], 0)
+
+    def test_run_sync_from_worker_thread(self):
+        pool = PasswordHashPool(workers=1, queue_size=0)
+        self.assertEqual(pool.run_sync(sum, [1, 2]), 3)
+
+
+class TestTokenCache(unittest.TestCase):
+
+    def setUp(self):
+        token_cache.clear()
+
+    def test_get_current_customer_verifies_once(self):
+        payload = {"id_customer": 1, "customer_type": 2, "exp": time.time() + 60}
+        with patch("app.middleware.verify_access_token", return_value=payload) as mock_verify:
+            first = get_current_customer("token")
+            second = get_current_customer("token")
+
+        mock_verify.assert_called_once_with("token")
+        self.assertEqual(first, payload)
+        self.assertEqual(second, payload)
+        self.assertEqual(token_cache.stats()["hits"], 1)
+        self.assertEqual(token_cache.stats()["misses"], 1)
+
+    def test_cached_payload_cannot_be_mutated_by_callers(self):
+        payload = {"id_customer": 1, "customer_type": 2, "exp": time.time() + 60}
+        with patch("app.middleware.verify_access_token", return_value=payload):
+            first = get_current_customer("token")
+            first["customer_type"] = 1
+            second = get_current_customer("token")
+            second["id_customer"] = 99
+
+        self.assertEqual(get_current_customer("token"), {**payload, "customer_type": 2})
+
+    def test_expired_entry_is_evicted(self):
+        cache = TokenCache(maxsize=10)
+        cache.set("token", {"id_customer": 1, "exp": time.time() - 1})
+
+        self.assertIsNone(cache.get("token"))
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TokenCache(maxsize=2)
+        exp = time.time() + 60
+        cache.set("a", {"exp": exp})
+        cache.set("b", {"exp": exp})
+        cache.get("a")
+        cache.set("c", {"exp": exp})
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_disabled_when_size_is_zero(self):
+        cache = TokenCache(maxsize=0)
+        cache.set("token", {"exp": time.time() + 60})
+
+        self.assertIsNone(cache.get("token"))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+from app.database import Base
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def alembic_config(url: str) -> Config:
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    config.set_main_option("sqlalchemy.url", url)
+    # Pas de fileConfig : la configuration des logs des tests reste intacte
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def migrated_engine(tmp: str):
+    """Base SQLite vierge montée par `alembic upgrade head`."""
+    url = f"sqlite:///{os.path.join(tmp, 'migrations.db')}"
+    command.upgrade(alembic_config(url), "head")
+    return create_engine(url), url
+
+
+class TestMigrations(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine, self.url = migrated_engine(self.tmp.name)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_head_matches_models(self):
+        # Un écart signifie qu'un changement de app/models.py n'a pas sa migration
+        with self.engine.connect() as connection:
+            diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+        self.assertEqual(diff, [])
+
+    def test_hot_lookup_indexes(self):
+        inspector = inspect(self.engine)
+        indexes = {
+            table: {index["name"]: index["column_names"] for index in inspector.get_indexes(table)}
+            for table in ("Login_Logs", "Notifications", "Customer_Feedback")
+        }
+        self.assertEqual(indexes["Login_Logs"]["ix_Login_Logs_id_customer_login_time"], ["id_customer", "login_time"])
+        self.assertEqual(indexes["Notifications"]["ix_Notifications_id_customer_is_read"], ["id_customer", "is_read"])
+        self.assertEqual(
+            indexes["Customer_Feedback"]["ix_Customer_Feedback_product_id_created_at"], ["product_id", "created_at"]
+        )
+
+    def test_null_is_read_becomes_unread(self):
+        command.downgrade(alembic_config(self.url), "0002")
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO Notifications (message, is_read, type, id_customer) VALUES ('legacy', NULL, 1, 1)"
+            ))
+
+        command.upgrade(alembic_config(self.url), "head")
+
+        with self.engine.connect() as connection:
+            unread = connection.execute(text(
+                "SELECT count(*) FROM Notifications WHERE id_customer = 1 AND is_read = 0"
+            )).scalar()
+        self.assertEqual(unread, 1)
+        [column] = [c for c in inspect(self.engine).get_columns("Notifications") if c["name"] == "is_read"]
+        self.assertFalse(column["nullable"])
+
+    def test_downgrade_to_base(self):
+        config = alembic_config(self.url)
+        command.downgrade(config, "0001")
+        self.assertEqual([index["name"] for index in inspect(self.engine).get_indexes("Login_Logs")], [])
+
+        command.downgrade(config, "base")
+        self.assertEqual(inspect(self.engine).get_table_names(), ["alembic_version"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+from app.models import Notification
+from tests.conftest import ApiTestCase, make_customer
+
+CUSTOMER = {"id_customer": 2, "customer_type": 2}
+
+
+class TestNotificationsBulk(ApiTestCase):
+
+    def seed(self, session):
+        session.add_all([make_customer(i, opt_in_marketing=i % 2 == 0) for i in range(1, 5)])
+
+    def notifications(self, size, id_customer=2):
+        return [{"message": f"Message {i}", "type": 1, "id_customer": id_customer} for i in range(size)]
+
+    def count_notifications(self, **filters):
+        session = self.Session()
+        try:
+            return session.query(Notification).filter_by(**filters).count()
+        finally:
+            session.close()
+
+    def test_bulk_create_uses_one_statement(self):
+        for size in (3, 50):
+            response = self.client.post("/notifications/bulk", json={"notifications": self.notifications(size)})
+
+            self.assertEqual(response.json(), {"created": size})
+            self.assertEqual(len(self.last_statements()), 1)
+        self.assertEqual(self.count_notifications(), 53)
+
+    def test_campaign_notifies_opted_in_customers(self):
+        response = self.client.post("/notifications/campaign", json={"message": "Promo", "type": 2})
+
+        self.assertEqual(response.json(), {"created": 2})
+        self.assertEqual(len(self.last_statements()), 1)
+        self.assertEqual(self.count_notifications(id_customer=2), 1)
+        self.assertEqual(self.count_notifications(id_customer=1), 0)
+
+    def test_mark_read_by_ids_and_by_customer(self):
+        self.client.post("/notifications/bulk", json={"notifications": self.notifications(5) + self.notifications(2, id_customer=3)})
+
+        response = self.client.post("/notifications/mark-read", json={"notification_ids": [1, 2]})
+        self.assertEqual(response.json(), {"updated": 2})
+        self.assertEqual(len(self.last_statements()), 1)
+
+        response = self.client.post("/notifications/mark-read", json={"id_customer": 2})
+        self.assertEqual(response.json(), {"updated": 3})
+        self.assertEqual(self.count_notifications(is_read=True), 5)
+
+    def test_customer_marks_only_own_notifications(self):
+        self.client.post("/notifications/bulk", json={"notifications": self.notifications(2) + self.notifications(2, id_customer=3)})
+        self.current_customer = CUSTOMER
+
+        response = self.client.post("/notifications/mark-read", json={"notification_ids": [1, 2, 3, 4]})
+        self.assertEqual(response.json(), {"updated": 2})
+
+        response = self.client.post("/notifications/mark-read", json={"id_customer": 3})
+        self.assertEqual(response.status_code, 403)
+
+    def test_bulk_delete_uses_one_statement(self):
+        self.client.post("/notifications/bulk", json={"notifications": self.notifications(10)})
+
+        response = self.client.post("/notifications/bulk-delete", json={"notification_ids": list(range(1, 8))})
+
+        self.assertEqual(response.json(), {"deleted": 7})
+        self.assertEqual(len(self.last_statements()), 1)
+        self.assertEqual(self.count_notifications(), 3)
+
+    def test_bulk_operations_are_admin_only(self):
+        self.current_customer = CUSTOMER
+
+        self.assertEqual(self.client.post("/notifications/bulk", json={"notifications": self.notifications(1)}).status_code, 403)
+        self.assertEqual(self.client.post("/notifications/bulk-delete", json={"notification_ids": [1]}).status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
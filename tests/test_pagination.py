@@ -0,0 +1,84 @@
+import unittest
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from app.models import LoginLog, CustomerCompany
+from app.pagination import encode_cursor, decode_cursor
+from app.controllers import get_login_logs_page, get_customer_companies_page
+
+
+class TestCursor(unittest.TestCase):
+
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor([42, 7])
+        self.assertEqual(decode_cursor(cursor, 2), [42, 7])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(HTTPException) as context:
+            decode_cursor("not a cursor!", 1)
+        self.assertEqual(context.exception.status_code, 400)
+
+    def test_cursor_with_wrong_key_size(self):
+        with self.assertRaises(HTTPException):
+            decode_cursor(encode_cursor([1, 2]), 1)
+
+    def test_cursor_with_non_scalar_value(self):
+        with self.assertRaises(HTTPException) as context:
+            decode_cursor(encode_cursor([{"a": 1}]), 1)
+        self.assertEqual(context.exception.status_code, 400)
+
+
+class TestKeysetPagination(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine("sqlite://")
+        Base.metadata.create_all(cls.engine)
+        cls.Session = sessionmaker(bind=cls.engine)
+        session = cls.Session()
+        session.add_all([LoginLog(login_time=datetime(2024, 1, 1), id_customer=i % 3 + 1) for i in range(25)])
+        session.add_all([CustomerCompany(id_customer=c, id_company=co) for c in (1, 2, 3) for co in (1, 2)])
+        session.commit()
+        session.close()
+
+    def setUp(self):
+        self.db = self.Session()
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_walks_all_pages_in_key_order(self):
+        seen, cursor = [], None
+        while True:
+            page = get_login_logs_page(self.db, cursor=cursor, limit=10)
+            seen.extend(log.id_log for log in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, list(range(1, 26)))
+
+    def test_last_page_has_no_cursor(self):
+        page = get_login_logs_page(self.db, cursor=encode_cursor([20]), limit=10)
+        self.assertEqual([log.id_log for log in page["items"]], [21, 22, 23, 24, 25])
+        self.assertIsNone(page["next_cursor"])
+
+    def test_page_size_below_one(self):
+        for limit in (0, -3):
+            with self.assertRaises(HTTPException) as context:
+                get_login_logs_page(self.db, cursor=encode_cursor([20]), limit=limit)
+            self.assertEqual(context.exception.status_code, 400)
+
+    def test_composite_key(self):
+        first = get_customer_companies_page(self.db, limit=3)
+        second = get_customer_companies_page(self.db, cursor=first["next_cursor"], limit=3)
+
+        pairs = [(cc.id_customer, cc.id_company) for cc in first["items"] + second["items"]]
+        self.assertEqual(pairs, [(1, 1), (1, 2), (2, 1), (2, 2), (3, 1), (3, 2)])
+        self.assertIsNone(second["next_cursor"])
+
+
+if __name__ == '__main__':
+    unittest.main()
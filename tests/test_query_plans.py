@@ -0,0 +1,68 @@
+import unittest
+from sqlalchemy import create_engine, false, func, select, text
+from app.database import Base
+from app.models import Address, Customer, Feedback, LoginLog, Notification
+from app.pagination import encode_cursor, keyset
+
+# Requêtes fréquentes de l'API ; chacune doit se résoudre par un index (SEARCH),
+# jamais par un parcours complet de table (SCAN), et sans tri en mémoire.
+HOT_QUERIES = {
+    "login by email": select(Customer).where(Customer.email == "user@example.com"),
+    "login logs of a customer, latest first": select(LoginLog)
+        .where(LoginLog.id_customer == 1).order_by(LoginLog.login_time.desc()).limit(20),
+    "login logs of a customer since a date": select(LoginLog)
+        .where(LoginLog.id_customer == 1, LoginLog.login_time >= "2024-01-01"),
+    "notifications of a customer": select(Notification).where(Notification.id_customer == 1),
+    "unread notifications count": select(func.count()).select_from(Notification)
+        .where(Notification.id_customer == 1, Notification.is_read == false()),
+    "feedbacks of a product, latest first": select(Feedback)
+        .where(Feedback.product_id == 1).order_by(Feedback.created_at.desc()).limit(20),
+    "feedbacks of a customer": select(Feedback).where(Feedback.id_customer == 1),
+    "addresses of a customer": select(Address).where(Address.id_customer == 1),
+    # Pages de /customers/{id}/... au-delà de la première (curseur)
+    "customer login logs page": keyset(
+        select(LoginLog).where(LoginLog.id_customer == 1), [LoginLog.login_time, LoginLog.id_log],
+        encode_cursor(["2024-01-01T00:00:00", 50]), 10, descending=True),
+    "customer unread notifications page": keyset(
+        select(Notification).where(Notification.id_customer == 1, Notification.is_read == false()),
+        [Notification.id_notification], encode_cursor([50]), 10, descending=True),
+    "customer feedbacks page": keyset(
+        select(Feedback).where(Feedback.id_customer == 1), [Feedback.id_feedback], encode_cursor([50]), 10, descending=True),
+    "customer addresses page": keyset(
+        select(Address).where(Address.id_customer == 1), [Address.id_address], encode_cursor([50]), 10),
+}
+
+
+class TestQueryPlans(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = create_engine("sqlite://")
+        Base.metadata.create_all(cls.engine)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.engine.dispose()
+
+    def query_plan(self, stmt) -> list:
+        sql = str(stmt.compile(self.engine, compile_kwargs={"literal_binds": True}))
+        with self.engine.connect() as connection:
+            return [row.detail for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+    def test_hot_queries_use_an_index(self):
+        for name, stmt in HOT_QUERIES.items():
+            with self.subTest(query=name):
+                plan = self.query_plan(stmt)
+                self.assertTrue(plan)
+                for step in plan:
+                    self.assertFalse(step.startswith("SCAN"), f"full scan in plan: {plan}")
+                    self.assertNotIn("TEMP B-TREE", step, f"in-memory sort in plan: {plan}")
+
+    def test_detects_full_scan(self):
+        # Garde-fou du test lui-même : une colonne non indexée doit bien donner un SCAN
+        plan = self.query_plan(select(Customer).where(Customer.last_name == "Doe"))
+        self.assertTrue(any(step.startswith("SCAN") for step in plan), plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -113,6 +113,10 @@ class TestSchemas(unittest.TestCase):
         self.assertEqual(notification.message, "Your order has been shipped")
         self.assertFalse(notification.is_read)
 
+    def test_notification_is_read_cannot_be_null(self):
+        with self.assertRaises(ValidationError):
+            NotificationCreate(**{**self.valid_notification_data, "is_read": None})
+
     def test_update_notification_optional_fields(self):
         notification_update = NotificationUpdate(is_read=True)
         self.assertTrue(notification_update.is_read)
@@ -0,0 +1,102 @@
+import unittest
+from datetime import datetime
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import selectinload, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.concurrency import run_in_threadpool
+from app.database import Base
+from app.models import Address, Customer
+from app.sql_stats import (
+    SQLStatementCountMiddleware, disable_statement_counting, enable_statement_counting, record_requests,
+)
+
+
+class TestStatementCountMiddleware(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        api = FastAPI()
+
+        def run_statements(n):
+            with self.engine.connect() as connection:
+                for _ in range(n):
+                    connection.execute(text("SELECT 1"))
+
+        @api.get("/items/{n}")
+        async def read_items(n: int):
+            # Comme run_db : la requête SQL s'exécute dans le threadpool
+            await run_in_threadpool(run_statements, n)
+            return {"n": n}
+
+        api.add_middleware(SQLStatementCountMiddleware, threshold=3, header=True)
+        self.client = TestClient(api)
+        enable_statement_counting()
+
+    def tearDown(self):
+        disable_statement_counting()
+        self.engine.dispose()
+
+    def test_header_counts_statements_of_the_request(self):
+        self.assertEqual(self.client.get("/items/2").headers["x-sql-statement-count"], "2")
+        self.assertEqual(self.client.get("/items/0").headers["x-sql-statement-count"], "0")
+
+    def test_logs_route_over_threshold(self):
+        with self.assertLogs("app.sql_stats", level="WARNING") as logs:
+            self.client.get("/items/5")
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("GET /items/{n} ran 5 SQL statements (threshold 3)", logs.output[0])
+
+    def test_record_requests(self):
+        with record_requests() as requests:
+            self.client.get("/items/1")
+            self.client.get("/items/4")
+
+        self.assertEqual([(request.route, request.count) for request in requests], [("/items/{n}", 1), ("/items/{n}", 4)])
+
+    def test_pass_through_when_disabled(self):
+        disable_statement_counting()
+        response = self.client.get("/items/2")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("x-sql-statement-count", response.headers)
+
+
+class TestLazyLoadGuard(unittest.TestCase):
+    # Le garde est activé pour toute la suite par tests/conftest.py
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        now = datetime(2024, 1, 1)
+        customer = Customer(name="Customer", created_at=now, username="user", first_name="First", last_name="Last",
+                            email="user@example.com", password_hash="hash", last_login=now, customer_type=2,
+                            loyalty_points=0)
+        customer.addresses.append(Address(address_line1="1 rue", city="Paris", postal_code="75000",
+                                          country="France", address_type=1, created_at=now))
+        self.session.add(customer)
+        self.session.commit()
+        self.session.expunge_all()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def test_lazy_load_raises(self):
+        customer = self.session.query(Customer).first()
+
+        with self.assertRaises(InvalidRequestError):
+            customer.addresses
+
+    def test_eager_load_is_allowed(self):
+        customer = self.session.query(Customer).options(selectinload(Customer.addresses)).first()
+
+        self.assertEqual([address.city for address in customer.addresses], ["Paris"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+import asyncio
+import importlib.util
+import json
+import random
+import unittest
+from contextlib import contextmanager
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry import trace
+from opentelemetry.trace import NonRecordingSpan, SpanContext, SpanKind, StatusCode, TraceFlags
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import StaticPool
+from starlette.concurrency import run_in_threadpool
+from app import tracing
+from app.messaging.connection import BrokerConnection
+from app.messaging.rpc import RpcClient
+from app.tracing import TracingMiddleware, configure_tracing, consume_span, disable_sql_tracing, enable_sql_tracing
+
+REMOTE_TRACE_ID = 0x0af7651916cd43dd8448eb211c80319c
+TRACEPARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+class RecordedSpan(NonRecordingSpan):
+    """
+    Span minimal gardé en mémoire (opentelemetry-sdk n'est pas requis pour les tests).
+    """
+
+    def __init__(self, name, context, parent, kind, attributes):
+        super().__init__(context)
+        self.name = name
+        self.parent = parent
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.status = StatusCode.UNSET
+        self.ended = False
+
+    def is_recording(self):
+        return True
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def update_name(self, name):
+        self.name = name
+
+    def set_status(self, status, description=None):
+        self.status = getattr(status, "status_code", status)
+
+    def record_exception(self, exception, *args, **kwargs):
+        self.attributes["exception"] = repr(exception)
+
+    def end(self, end_time=None):
+        self.ended = True
+
+
+class RecordingTracer(trace.Tracer):
+
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name, context=None, kind=SpanKind.INTERNAL, attributes=None, links=None,
+                   start_time=None, record_exception=True, set_status_on_exception=True):
+        parent = trace.get_current_span(context).get_span_context()
+        trace_id = parent.trace_id if parent.is_valid else random.getrandbits(128)
+        span_context = SpanContext(trace_id, random.getrandbits(64), is_remote=False,
+                                   trace_flags=TraceFlags(TraceFlags.SAMPLED))
+        span = RecordedSpan(name, span_context, parent if parent.is_valid else None, kind, attributes)
+        self.spans.append(span)
+        return span
+
+    @contextmanager
+    def start_as_current_span(self, name, context=None, kind=SpanKind.INTERNAL, attributes=None, links=None,
+                              start_time=None, record_exception=True, set_status_on_exception=True,
+                              end_on_exit=True):
+        span = self.start_span(name, context, kind, attributes)
+        with trace.use_span(span, end_on_exit=end_on_exit, record_exception=record_exception,
+                            set_status_on_exception=set_status_on_exception):
+            yield span
+
+
+class RecordingTracerProvider(trace.TracerProvider):
+
+    def __init__(self):
+        self.tracer = RecordingTracer()
+
+    def get_tracer(self, *args, **kwargs):
+        return self.tracer
+
+
+class TracingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.previous_tracer = tracing._tracer
+        provider = RecordingTracerProvider()
+        configure_tracing(provider)
+        self.spans = provider.tracer.spans
+
+    def tearDown(self):
+        tracing._tracer = self.previous_tracer
+
+    def span(self, name):
+        [span] = [span for span in self.spans if span.name == name]
+        return span
+
+
+class TestHttpAndSqlSpans(TracingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        api = FastAPI()
+
+        def run_statement(statement):
+            with self.engine.connect() as connection:
+                connection.execute(text(statement))
+
+        @api.get("/items/{item_id}")
+        async def read_item(item_id: int, statement: str = "SELECT 1"):
+            # Comme run_db : la requête SQL s'exécute dans le threadpool
+            await run_in_threadpool(run_statement, statement)
+            return {"item_id": item_id}
+
+        api.add_middleware(TracingMiddleware)
+        self.client = TestClient(api, raise_server_exceptions=False)
+        enable_sql_tracing()
+
+    def tearDown(self):
+        disable_sql_tracing()
+        self.engine.dispose()
+        super().tearDown()
+
+    def test_sql_span_is_child_of_request_span(self):
+        response = self.client.get("/items/1", headers={"traceparent": TRACEPARENT})
+
+        self.assertEqual(response.status_code, 200)
+        server = self.span("GET /items/{item_id}")
+        self.assertEqual(server.kind, SpanKind.SERVER)
+        self.assertEqual(server.get_span_context().trace_id, REMOTE_TRACE_ID)
+        self.assertEqual((server.attributes["http.route"], server.attributes["http.response.status_code"]),
+                         ("/items/{item_id}", 200))
+        select = self.span("SELECT")
+        self.assertEqual(select.parent.span_id, server.get_span_context().span_id)
+        self.assertEqual((select.kind, select.attributes["db.statement"]), (SpanKind.CLIENT, "SELECT 1"))
+        self.assertTrue(select.ended and server.ended)
+
+    def test_failed_statement(self):
+        response = self.client.get("/items/1", params={"statement": "SELECT * FROM missing"})
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(self.span("SELECT").status, StatusCode.ERROR)
+        self.assertIn(OperationalError.__name__, self.span("SELECT").attributes["exception"])
+        self.assertEqual(self.span("GET /items/{item_id}").status, StatusCode.ERROR)
+
+
+class TestAmqpSpans(TracingTestCase):
+
+    def test_rpc_publishes_trace_context_with_correlation_id(self):
+        published = []
+        reply_queue = MagicMock()
+        reply_queue.name = "amq.gen-reply"
+        reply_queue.consume = AsyncMock()
+
+        def make_channel():
+            channel = MagicMock(is_closed=False)
+            channel.declare_queue = AsyncMock(return_value=reply_queue)
+            channel.default_exchange.publish = AsyncMock(side_effect=lambda message, routing_key: published.append(message))
+            return channel
+
+        connection = MagicMock(is_closed=False)
+        connection.channel = AsyncMock(side_effect=make_channel)
+        client = RpcClient(broker=BrokerConnection(connect=AsyncMock(return_value=connection), healthcheck_interval=0))
+
+        async def call():
+            task = asyncio.ensure_future(client.call("order.products.request", {"order_id": 1}, expected_key="products"))
+            while not published:
+                await asyncio.sleep(0)
+            on_response = reply_queue.consume.call_args.args[0]
+            reply = MagicMock(correlation_id=published[0].correlation_id, body=json.dumps({"products": [1]}).encode())
+            reply.ack = AsyncMock()
+            await on_response(reply)
+            return await task
+
+        self.assertEqual(asyncio.run(call()), [1])
+
+        rpc = self.span("rpc order.products.request")
+        publish = self.span("publish order.products.request")
+        self.assertEqual(publish.parent.span_id, rpc.get_span_context().span_id)
+        self.assertEqual(rpc.attributes["rpc.outcome"], "ok")
+        [message] = published
+        trace_id, span_id = message.headers["traceparent"].split("-")[1:3]
+        self.assertEqual((int(trace_id, 16), int(span_id, 16)),
+                         (rpc.get_span_context().trace_id, publish.get_span_context().span_id))
+        self.assertEqual(publish.attributes["messaging.message.conversation_id"], message.correlation_id)
+
+    def test_consumer_span_continues_the_publisher_trace(self):
+        message = MagicMock(headers={"traceparent": TRACEPARENT}, correlation_id="abc")
+
+        with consume_span(message, "product.updated"):
+            pass
+
+        span = self.span("process product.updated")
+        self.assertEqual((span.kind, span.get_span_context().trace_id), (SpanKind.CONSUMER, REMOTE_TRACE_ID))
+        self.assertEqual(span.attributes["messaging.message.conversation_id"], "abc")
+
+
+@unittest.skipIf(importlib.util.find_spec("opentelemetry.sdk"), "opentelemetry-sdk is installed")
+class TestWithoutSdk(unittest.TestCase):
+
+    def test_tracing_stays_disabled(self):
+        with self.assertLogs("app.tracing", level="WARNING"):
+            self.assertFalse(configure_tracing())
+        # L'instrumentation reste appelable : spans no-op
+        with tracing.start_span("noop") as span:
+            self.assertFalse(span.is_recording())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import patch
+from app.models import Customer, CustomerCompany, Company, Feedback
+from tests.conftest import ApiTestCase, make_customer
+
+
+class TestWriteStatements(ApiTestCase):
+    """
+    Nombre de requêtes SQL par écriture : pas de SELECT de relecture après commit.
+    """
+
+    def seed(self, session):
+        session.add_all([make_customer(i) for i in range(1, 3)])
+        session.add(Company(company_name="Company", siret="123", address="1 rue", postal_code="75000", city="Paris"))
+        session.add(Feedback(product_id=1, rating=5, comment="Great", id_customer=1))
+        session.add(CustomerCompany(id_customer=2, id_company=1))
+
+    def verbs(self) -> list:
+        """
+        Verbes des requêtes SQL de la dernière requête HTTP (hors BEGIN / COMMIT).
+        """
+        return [statement.split()[0].upper() for statement in self.last_statements()]
+
+    @patch("app.controllers.hash_password", side_effect=lambda password: "hashed")
+    def test_create_is_a_single_insert(self, _):
+        response = self.client.post("/customers/", json={
+            "name": "New", "created_at": "2024-01-01T00:00:00", "username": "new", "first_name": "New",
+            "last_name": "Customer", "email": "new@example.com", "password_hash": "secret",
+            "last_login": "2024-01-01T00:00:00", "customer_type": 2,
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id_customer"], 3)
+        self.assertEqual(self.verbs(), ["INSERT"])
+
+    def test_update_reuses_the_existence_check(self):
+        response = self.client.patch("/feedbacks/1", json={"rating": 3})
+
+        self.assertEqual(response.json()["rating"], 3)
+        self.assertEqual(response.json()["comment"], "Great")
+        # SELECT du contrôle d'autorisation, puis UPDATE ; l'objet est relu dans la session
+        self.assertEqual(self.verbs(), ["SELECT", "UPDATE"])
+
+    def test_update_without_prior_lookup(self):
+        response = self.client.patch("/customers/2", json={"loyalty_points": 42})
+
+        self.assertEqual(response.json()["loyalty_points"], 42)
+        self.assertEqual(self.verbs(), ["SELECT", "UPDATE"])
+
+    def test_update_unknown_row_skips_the_update(self):
+        response = self.client.patch("/customers/99", json={"loyalty_points": 42})
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.verbs(), ["SELECT"])
+
+    def test_delete_reuses_the_existence_check(self):
+        response = self.client.delete("/feedbacks/1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.verbs(), ["SELECT", "DELETE"])
+
+    def test_delete_customer_removes_company_links(self):
+        response = self.client.delete("/customers/2")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.verbs(), ["DELETE", "SELECT", "DELETE"])
+        session = self.Session()
+        try:
+            self.assertEqual(session.query(CustomerCompany).count(), 0)
+            self.assertIsNone(session.get(Customer, 2))
+        finally:
+            session.close()
+
+    def test_duplicate_customer_company_is_rejected_by_the_constraint(self):
+        response = self.client.post("/customer-companies/", json={"id_customer": 2, "id_company": 1})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.verbs(), ["INSERT"])
+
+
+if __name__ == "__main__":
+    unittest.main()